@@ -52,15 +52,12 @@ def runExample():
 	myIsm.begin()
 	# Reset the device to default settings. This if helpful is you're doing multiple
 	# uploads testing different settings. 
-	myIsm.device_reset()
-
-	# Wait for it to finish resetting
-	while myIsm.get_device_reset() == False:
-		time.sleep(1)
+	if myIsm.reset_and_wait() is None:
+		print("The device didn't come back after the reset", file=sys.stderr)
+		return
 
 	print("Reset.")
 	print("Applying settings.")
-	time.sleep(0.100)
 
 	myIsm.set_device_config()
 	myIsm.set_block_data_update()
@@ -82,13 +79,14 @@ def runExample():
 	myIsm.set_gyro_lp1_bandwidth(myIsm.kBwMedium)
 
 	while True:
-		if myIsm.check_status():
+		# Sleep until the next sample is due, then poll briefly until it's ready
+		if myIsm.wait_for_data(timeout=1.0):
 			# Get the accelerometer data
 			accelData = myIsm.get_accel()
 			print("Accel X: %f, Y: %f, Z: %f " % (accelData.xData, accelData.yData, accelData.zData), end='')
 			gyroData = myIsm.get_gyro()
 			print("Gyro X: %f, Y: %f, Z: %f" % (gyroData.xData, gyroData.yData, gyroData.zData))
-		
+
 		time.sleep(0.100) # Delay so that we don't spam user console or I2C bus
 
 if __name__ == '__main__':
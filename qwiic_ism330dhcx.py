@@ -45,6 +45,125 @@ New to Qwiic? Take a look at the entire [SparkFun Qwiic ecosystem](https://www.s
 # The Qwiic_I2C_Py platform driver is designed to work on almost any Python
 # platform, check it out here: https://github.com/sparkfun/Qwiic_I2C_Py
 import qwiic_i2c
+import math
+import time
+
+# NumPy is optional. It isn't available on most MicroPython and CircuitPython
+# ports, so it's only imported the first time a vectorized path needs it
+_np = None
+
+def _numpy():
+    """!
+    Import NumPy on first use
+
+    @return **module** The numpy module, or `None` if it isn't installed
+    """
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np if _np else None
+
+_fifoDtype = None
+
+def _fifo_dtype():
+    """!
+    The NumPy structured type of a FIFO word: the tag byte followed by three little endian
+    int16 values, packed into 7 bytes
+
+    @return **dtype** The FIFO word type
+    """
+    global _fifoDtype
+    if _fifoDtype is None:
+        _fifoDtype = _numpy().dtype([("tag", "u1"), ("x", "<i2"), ("y", "<i2"), ("z", "<i2")])
+    return _fifoDtype
+
+def _fifo_columns(words, dtype, width):
+    """!
+    A strided view over the data bytes of FIFO words
+
+    @param words: The structured array of FIFO words
+    @param str dtype: The type of each column
+    @param int width: The number of columns
+
+    @return **ndarray** An N x width view sharing memory with the words
+    """
+    np = _numpy()
+    if len(words) == 0:
+        return np.zeros((0, width), dtype = dtype)
+
+    return np.ndarray((len(words), width), dtype = dtype, buffer = words, offset = 1,
+                      strides = (words.itemsize, np.dtype(dtype).itemsize))
+
+# MicroPython and CircuitPython don't provide time.monotonic() on every port
+if hasattr(time, "monotonic"):
+    _monotonic = time.monotonic
+else:
+    def _monotonic():
+        return time.ticks_ms() / 1000.0
+
+# Most MicroPython and CircuitPython ports have no threads, so locking is a no-op there
+try:
+    import threading
+    _RLock = threading.RLock
+    _Lock = threading.Lock
+except ImportError:
+    class _NullLock:
+        def acquire(self, *args):
+            return True
+
+        def release(self):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, excType, excVal, excTb):
+            return False
+
+    _RLock = _NullLock
+    _Lock = _NullLock
+
+def _locked(method):
+    """!
+    Decorator for device methods that access the bus or the cached device state, so that
+    they run with the device lock held
+
+    @param method: The method to wrap
+
+    @return The wrapped method
+    """
+    def locked(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    locked.__name__ = method.__name__
+    locked.__doc__ = method.__doc__
+    return locked
+
+# Devices sharing a driver object share its lock, since the drivers themselves aren't
+# thread-safe (the Linux driver selects the target address and transfers in separate calls).
+# The driver is kept alongside its lock so that its id can't be reused by another driver
+_busLocks = {}
+_busLocksGuard = _Lock()
+
+def _bus_lock(driver):
+    """!
+    Get the lock shared by every device using a bus driver object
+
+    @param driver: The bus driver object
+
+    @return The lock for the driver
+    """
+    with _busLocksGuard:
+        entry = _busLocks.get(id(driver))
+        if entry is None or entry[0] is not driver:
+            entry = (driver, _Lock())
+            _busLocks[id(driver)] = entry
+        return entry[1]
 
 # Define the device name and I2C addresses. These are set in the class defintion
 # as class variables, making them avilable without having to create a class
@@ -64,6 +183,589 @@ class IsmData:
         self.yData = 0
         self.zData = 0
 
+class IsmEventSource:
+    # Contains the event source registers of the ISM330DHCX along with the decoded event flags
+    def __init__(self):
+        self.allIntSrc = 0
+        self.wakeUpSrc = 0
+        self.tapSrc = 0
+        self.d6dSrc = 0
+
+        self.wakeUp = False
+        self.freeFall = False
+        self.sleepChange = False
+        self.sleepState = False
+        self.singleTap = False
+        self.doubleTap = False
+        self.sixD = False
+        self.orientation = 0
+
+    def any(self):
+        """!
+        @return **bool** `True` if any event was flagged
+        """
+        return self.wakeUp or self.freeFall or self.sleepChange or self.singleTap \
+            or self.doubleTap or self.sixD
+
+class IsmFifoData:
+    """!
+    FIFO samples demultiplexed by QwiicISM330DHCX.decode_fifo()
+
+    accel and gyro are Nx3 int16 arrays of raw samples and temp an array of raw temperatures,
+    each in FIFO order. The matching accelTime, gyroTime and tempTime arrays hold the timestamp
+    counter value of each sample, or -1 if not yet known. timestamps holds the decoded
+    TIMESTAMP words and other every remaining word, such as sensor hub data.
+    """
+    def __init__(self):
+        self.accel = None
+        self.accelTime = None
+        self.gyro = None
+        self.gyroTime = None
+        self.temp = None
+        self.tempTime = None
+        self.timestamps = None
+        self.other = None
+
+class IsmConfigSnapshot:
+    """!
+    An immutable copy of the device's configuration registers, as returned by
+    QwiicISM330DHCX.snapshot_config(). Register values are keyed by (bank, address)
+    """
+    def __init__(self, regs):
+        self._regs = dict(regs)
+
+    def get(self, bank, reg):
+        """!
+        @param int bank: The memory bank of the register (kUserBank, kSensorHubBank or kEmbeddedFuncBank)
+        @param int reg: The register address
+
+        @return **int** The register value, or `None` if it isn't part of the snapshot
+        """
+        return self._regs.get((bank, reg))
+
+    def banks(self):
+        """!
+        @return **list of int** The memory banks included in the snapshot
+        """
+        return sorted(set(bank for bank, reg in self._regs))
+
+    def registers(self, bank):
+        """!
+        @param int bank: The memory bank
+
+        @return **dict** A copy of the register values of the bank keyed by address
+        """
+        return dict((reg, val) for (regBank, reg), val in self._regs.items() if regBank == bank)
+
+    def items(self):
+        """!
+        @return **list of tuple** ((bank, address), value) pairs sorted by bank and address
+        """
+        return sorted(self._regs.items())
+
+    def diff(self, other):
+        """!
+        Compare this snapshot with another
+
+        @param IsmConfigSnapshot other: The snapshot to compare with
+
+        @return **dict** (this value, other value) keyed by (bank, address) for every register
+            that differs. A value is `None` if the register is only in one snapshot
+        """
+        changes = {}
+        for key in set(self._regs) | set(other._regs):
+            mine = self._regs.get(key)
+            theirs = other._regs.get(key)
+            if mine != theirs:
+                changes[key] = (mine, theirs)
+        return changes
+
+    def __eq__(self, other):
+        return isinstance(other, IsmConfigSnapshot) and self._regs == other._regs
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(tuple(self.items()))
+
+    def __len__(self):
+        return len(self._regs)
+
+class IsmTransaction:
+    """!
+    Context manager returned by QwiicISM330DHCX.transaction()
+    """
+    def __init__(self, device):
+        self._device = device
+
+    def __enter__(self):
+        self._device._txn_begin()
+        return self
+
+    def __exit__(self, excType, excVal, excTb):
+        self._device._txn_end(excType is None)
+        return False
+
+class IsmRegisterView:
+    """!
+    The fields of one register as attributes, e.g. device.fields.CTRL1_XL.ODR. Reading an
+    attribute reads the field and assigning one sets it
+    """
+    def __init__(self, device, register):
+        object.__setattr__(self, "_device", device)
+        object.__setattr__(self, "_register", register)
+
+    def _name(self, field):
+        name = self._register + "." + field
+        if name not in self._device._fields:
+            raise AttributeError("%s has no field %s" % (self._register, field))
+        return name
+
+    def __getattr__(self, field):
+        return self._device.get_field(self._name(field))
+
+    def __setattr__(self, field, val):
+        self._device.set_field(self._name(field), val)
+
+    def __dir__(self):
+        return list(self._device._registers[self._register][3])
+
+    def __repr__(self):
+        names = [self._register + "." + field for field in self.__dir__()]
+        values = self._device.read_fields(names)
+        return "%s(%s)" % (self._register, ", ".join("%s=%d" % (name.split(".")[1], values[name]) for name in names))
+
+class IsmFieldView:
+    """!
+    The registers of QwiicISM330DHCX.kRegisterMap as attributes, see IsmRegisterView
+    """
+    def __init__(self, device):
+        self._device = device
+
+    def __getattr__(self, register):
+        if register.startswith("_") or register not in self._device._registers:
+            raise AttributeError("unknown register %s" % register)
+        return IsmRegisterView(self._device, register)
+
+    def __dir__(self):
+        return [entry[0] for entry in self._device.kRegisterMap]
+
+class IsmFakeRegisters:
+    """!
+    Register file standing in for an ISM330DHCX, for exercising the bus transports without hardware
+
+    Models the three memory banks, auto-increment, software reset and the FIFO output
+    registers. Records queued in `fifo` (7 bytes each, tag first) are returned from
+    FIFO_DATA_OUT_TAG onwards and counted in FIFO_STATUS1/2.
+    """
+    def __init__(self):
+        self.banks = [bytearray(128) for _ in range(3)]
+        self.fifo = []
+        self.reset()
+
+    def reset(self):
+        """!
+        Return the registers to their power-on values
+        """
+        for regs in self.banks:
+            regs[:] = bytes(128)
+        self.banks[0][0x0F] = 0x6B # WHO_AM_I
+        self.banks[0][0x12] = 0x04 # CTRL3_C: IF_INC
+        self._bank = 0
+        self._word = bytes(7)
+
+    def _address(self, reg, offset):
+        # With auto-increment the FIFO output registers roll over onto the next record
+        if not self.banks[0][0x12] & 0x04:
+            return reg
+        if reg >= 0x78 and self._bank == 0:
+            return 0x78 + (reg - 0x78 + offset) % 7
+        return (reg + offset) & 0x7F
+
+    def read(self, reg, length):
+        """!
+        Read consecutive registers
+
+        @param int reg: The first register
+        @param int length: The number of bytes
+
+        @return **bytearray** The register values
+        """
+        data = bytearray(length)
+        for i in range(length):
+            addr = self._address(reg, i)
+            if self._bank == 0 and 0x78 <= addr <= 0x7E:
+                if addr == 0x78:
+                    self._word = self.fifo.pop(0) if self.fifo else bytes(7)
+                data[i] = self._word[addr - 0x78]
+            elif self._bank == 0 and addr == 0x3A:
+                data[i] = len(self.fifo) & 0xFF
+            elif self._bank == 0 and addr == 0x3B:
+                data[i] = (len(self.fifo) >> 8) & 0x03
+            else:
+                data[i] = self.banks[self._bank][addr]
+        return data
+
+    def write(self, reg, data):
+        """!
+        Write consecutive registers
+
+        @param int reg: The first register
+        @param data: The values to write
+        """
+        for i in range(len(data)):
+            addr = self._address(reg, i)
+            val = data[i] & 0xFF
+            if addr == 0x01:
+                self._bank = min(val >> 6, 2)
+            elif self._bank == 0 and addr == 0x12 and val & 0x81:
+                self.reset() # SW_RESET and BOOT complete instantly
+                continue
+            self.banks[self._bank][addr] = val
+
+class IsmFakeSpiDev:
+    """!
+    Stand-in for spidev.SpiDev backed by an IsmFakeRegisters, for use with IsmSpiTransport
+    """
+    def __init__(self, regs=None):
+        self.regs = IsmFakeRegisters() if regs is None else regs
+        self.mode = 0
+        self.max_speed_hz = 0
+        self.bits_per_word = 8
+        self.transfers = 0
+
+    def open(self, bus, device):
+        pass
+
+    def close(self):
+        pass
+
+    def xfer2(self, data):
+        """!
+        Full-duplex transfer with the chip select held for the whole message
+
+        @param list data: The bytes to send, starting with the register address
+
+        @return **list** The bytes received
+        """
+        self.transfers += 1
+        reg = data[0] & 0x7F
+        if data[0] & 0x80:
+            return [0] + list(self.regs.read(reg, len(data) - 1))
+        self.regs.write(reg, data[1:])
+        return [0] * len(data)
+
+def _next_register(reg, offset):
+    """!
+    The register a split transfer continues from. Auto-increment wraps within the FIFO output registers
+
+    @param int reg: The first register of the transfer
+    @param int offset: The number of bytes already transferred
+
+    @return **int** The register to continue from
+    """
+    tag = QwiicISM330DHCX.kRegFifoDataOutTag
+    if reg >= tag:
+        return tag + (reg - tag + offset) % QwiicISM330DHCX.kFifoWordSize
+    return reg + offset
+
+class IsmSpiTransport:
+    """!
+    SPI bus transport using Linux spidev, with the same interface as the qwiic_i2c drivers so
+    it can be passed to QwiicISM330DHCX as its driver. The I2C address arguments are ignored.
+
+    Register auto-increment (IF_INC, on by default) lets multi-byte reads and writes go in
+    a single transfer. Transfers larger than spidev's buffer are split, continuing from the
+    right address.
+    """
+    kReadBit = 0x80
+    kMaxSpeedHz = 10000000
+    kMaxTransfer = 4095 # whole FIFO records, and within spidev's default 4096 byte buffer
+
+    def __init__(self, bus=0, device=0, max_speed_hz=kMaxSpeedHz, spi=None):
+        """!
+        Constructor
+
+        @param int bus: The SPI bus number
+        @param int device: The chip select number
+        @param int max_speed_hz: The SPI clock, up to 10 MHz
+        @param spi: An open spidev.SpiDev compatible object, such as IsmFakeSpiDev. If not
+            provided, /dev/spidev<bus>.<device> is opened
+        """
+        if spi is None:
+            import spidev
+            spi = spidev.SpiDev()
+            spi.open(bus, device)
+
+        spi.mode = 3
+        spi.max_speed_hz = max_speed_hz
+        self._spi = spi
+
+    def close(self):
+        """!
+        Close the SPI device
+        """
+        self._spi.close()
+
+    def isDeviceConnected(self, address):
+        """!
+        Determines if a device answers on the bus. A missing device reads back as all zeros or all ones
+
+        @param int address: Ignored
+
+        @return **bool** `True` if a device answers
+        """
+        try:
+            return self.readByte(address, QwiicISM330DHCX.kRegWhoAmI) not in (0x00, 0xFF)
+        except (IOError, OSError):
+            return False
+
+    def readByte(self, address, commandCode):
+        return self._spi.xfer2([commandCode | self.kReadBit, 0])[1]
+
+    def read_block(self, address, commandCode, nBytes):
+        data = []
+        while len(data) < nBytes:
+            count = min(nBytes - len(data), self.kMaxTransfer)
+            reg = _next_register(commandCode, len(data))
+            data += self._spi.xfer2([reg | self.kReadBit] + [0] * count)[1:]
+        return data
+
+    def writeByte(self, address, commandCode, value):
+        self._spi.xfer2([commandCode & ~self.kReadBit, value & 0xFF])
+
+    def write_block(self, address, commandCode, value):
+        value = list(value)
+        for i in range(0, len(value), self.kMaxTransfer):
+            reg = _next_register(commandCode, i)
+            self._spi.xfer2([reg & ~self.kReadBit] + value[i:i + self.kMaxTransfer])
+
+# ctypes isn't available on MicroPython, so the i2c-dev message structures are built on first use
+_i2cMsgTypes = None
+
+def _i2c_msg_types():
+    """!
+    Build the ctypes layouts of the kernel's struct i2c_msg and struct i2c_rdwr_ioctl_data
+
+    @return **tuple** The ctypes module, the message type and the ioctl data type
+    """
+    global _i2cMsgTypes
+    if _i2cMsgTypes is None:
+        import ctypes
+
+        class I2cMsg(ctypes.Structure):
+            _fields_ = [("addr", ctypes.c_uint16), ("flags", ctypes.c_uint16),
+                        ("len", ctypes.c_uint16), ("buf", ctypes.POINTER(ctypes.c_uint8))]
+
+        class I2cRdwrIoctlData(ctypes.Structure):
+            _fields_ = [("msgs", ctypes.POINTER(I2cMsg)), ("nmsgs", ctypes.c_uint32)]
+
+        _i2cMsgTypes = (ctypes, I2cMsg, I2cRdwrIoctlData)
+    return _i2cMsgTypes
+
+class _I2cDevBackend:
+    # Opens and drives the real /dev/i2c-N character devices
+    def open(self, path):
+        import os
+        return os.open(path, os.O_RDWR)
+
+    def ioctl(self, fd, request, arg):
+        import fcntl
+        fcntl.ioctl(fd, request, arg)
+
+    def close(self, fd):
+        import os
+        os.close(fd)
+
+class IsmFakeI2cDev:
+    """!
+    Stand-in for the /dev/i2c-N file operations backed by an IsmFakeRegisters, for use as the
+    backend of IsmI2cDevTransport
+    """
+    def __init__(self, regs=None, address=0x6B):
+        self.regs = IsmFakeRegisters() if regs is None else regs
+        self.address = address
+        self.path = None
+        self.transfers = 0
+        self._reg = 0
+
+    def open(self, path):
+        self.path = path
+        return 3
+
+    def close(self, fd):
+        self.path = None
+
+    def ioctl(self, fd, request, arg):
+        """!
+        Carry out an I2C_RDWR request
+
+        @param int fd: The file descriptor returned by open()
+        @param int request: The ioctl request, which must be I2C_RDWR
+        @param arg: The struct i2c_rdwr_ioctl_data
+        """
+        ctypes = _i2c_msg_types()[0]
+        if request != IsmI2cDevTransport.kI2cRdwr:
+            raise OSError(22, "Invalid argument")
+
+        self.transfers += 1
+        for i in range(arg.nmsgs):
+            msg = arg.msgs[i]
+            if msg.addr != self.address:
+                raise OSError(121, "Remote I/O error")
+
+            if msg.flags & IsmI2cDevTransport.kI2cMRd:
+                data = bytes(self.regs.read(self._reg, msg.len))
+                ctypes.memmove(msg.buf, data, msg.len)
+            else:
+                data = ctypes.string_at(msg.buf, msg.len)
+                self._reg = data[0]
+                if msg.len > 1:
+                    self.regs.write(data[0], data[1:])
+
+class IsmI2cDevTransport:
+    """!
+    I2C bus transport talking to a Linux /dev/i2c-N device directly with I2C_RDWR ioctls, with
+    the same interface as the qwiic_i2c drivers so it can be passed to QwiicISM330DHCX as its driver
+
+    Each read is a single combined transfer (register address write, repeated start, read),
+    and blocks of any length are read into preallocated buffers, so large FIFO drains need
+    only one ioctl per 8 kB. read_block_into() reads straight into a caller's buffer.
+    """
+    kI2cRdwr = 0x0707
+    kI2cMRd = 0x0001
+    kMaxTransfer = 8190 # the kernel caps each message at 8192 bytes, this is whole FIFO records
+
+    def __init__(self, bus=1, backend=None):
+        """!
+        Constructor
+
+        @param int bus: The I2C bus number
+        @param backend: Object providing open(path), ioctl(fd, request, arg) and close(fd),
+            such as IsmFakeI2cDev. If not provided, the real device is used
+        """
+        ctypes, msgType, dataType = _i2c_msg_types()
+        self._ctypes = ctypes
+
+        self._backend = _I2cDevBackend() if backend is None else backend
+        self._fd = self._backend.open("/dev/i2c-%d" % bus)
+
+        # The messages, ioctl argument and buffers are reused for every transfer
+        self._msgs = (msgType * 2)()
+        self._ioctlData = dataType(self._msgs, 0)
+        self._regBuf = (ctypes.c_uint8 * 1)()
+        self._rxBuf = (ctypes.c_uint8 * 32)()
+        self._txBuf = (ctypes.c_uint8 * 33)()
+
+    def close(self):
+        """!
+        Close the I2C device
+        """
+        if self._fd is not None:
+            self._backend.close(self._fd)
+            self._fd = None
+
+    def _transfer(self, address, reg, buf, length):
+        """!
+        Combined register address write and read into a ctypes buffer
+
+        @param int address: The device address
+        @param int reg: The register to read from
+        @param buf: The ctypes buffer to read into
+        @param int length: The number of bytes to read
+        """
+        self._regBuf[0] = reg
+        write, read = self._msgs[0], self._msgs[1]
+        write.addr, write.flags, write.len = address, 0, 1
+        write.buf = self._regBuf
+        read.addr, read.flags, read.len = address, self.kI2cMRd, length
+        read.buf = self._ctypes.cast(buf, self._ctypes.POINTER(self._ctypes.c_uint8))
+        self._ioctlData.nmsgs = 2
+        self._backend.ioctl(self._fd, self.kI2cRdwr, self._ioctlData)
+
+    def _write(self, address, reg, data):
+        """!
+        Single message register write
+
+        @param int address: The device address
+        @param int reg: The first register to write
+        @param data: The values to write
+        """
+        length = len(data) + 1
+        if len(self._txBuf) < length:
+            self._txBuf = (self._ctypes.c_uint8 * length)()
+        self._txBuf[0] = reg
+        self._txBuf[1:length] = data
+
+        msg = self._msgs[0]
+        msg.addr, msg.flags, msg.len = address, 0, length
+        msg.buf = self._txBuf
+        self._ioctlData.nmsgs = 1
+        self._backend.ioctl(self._fd, self.kI2cRdwr, self._ioctlData)
+
+    def isDeviceConnected(self, address):
+        """!
+        Determines if a device acknowledges its address
+
+        @param int address: The device address
+
+        @return **bool** `True` if the device acknowledges
+        """
+        try:
+            self.readByte(address, QwiicISM330DHCX.kRegWhoAmI)
+            return True
+        except (IOError, OSError):
+            return False
+
+    def readByte(self, address, commandCode):
+        self._transfer(address, commandCode, self._rxBuf, 1)
+        return self._rxBuf[0]
+
+    def read_block(self, address, commandCode, nBytes):
+        if len(self._rxBuf) < nBytes:
+            self._rxBuf = (self._ctypes.c_uint8 * nBytes)()
+
+        offset = 0
+        while offset < nBytes:
+            count = min(nBytes - offset, self.kMaxTransfer)
+            chunk = (self._ctypes.c_uint8 * count).from_buffer(self._rxBuf, offset)
+            self._transfer(address, _next_register(commandCode, offset), chunk, count)
+            offset += count
+
+        return self._rxBuf[:nBytes]
+
+    def read_block_into(self, address, commandCode, buf, nBytes=None):
+        """!
+        Read consecutive registers straight into a writable buffer without copying
+
+        @param int address: The device address
+        @param int commandCode: The first register to read
+        @param buf: A writable buffer such as a bytearray or NumPy array
+        @param int nBytes: The number of bytes to read. Defaults to the size of the buffer
+
+        @return The buffer
+        """
+        if nBytes is None:
+            nBytes = len(memoryview(buf).cast("B"))
+
+        offset = 0
+        while offset < nBytes:
+            count = min(nBytes - offset, self.kMaxTransfer)
+            chunk = (self._ctypes.c_uint8 * count).from_buffer(buf, offset)
+            self._transfer(address, _next_register(commandCode, offset), chunk, count)
+            offset += count
+
+        return buf
+
+    def writeByte(self, address, commandCode, value):
+        self._write(address, commandCode, [value & 0xFF])
+
+    def write_block(self, address, commandCode, value):
+        value = list(value)
+        for i in range(0, len(value), self.kMaxTransfer):
+            self._write(address, _next_register(commandCode, i), value[i:i + self.kMaxTransfer])
+
 # Define the class that encapsulates the device being created. All information
 # associated with this device is encapsulated by this class. The device class
 # should be the only value exported from this module.
@@ -178,6 +880,11 @@ class QwiicISM330DHCX(object):
     kRegTimestamp2 = 0x42
     kRegTimestamp3 = 0x43
 
+    # The timestamp counter nominally runs at 40 kHz, trimmed per device by INTERNAL_FREQ_FINE
+    kTimestampLsb = 1.0 / 40000
+    kRegInternalFreqFine = 0x63
+    kFreqFineStep = 0.0015
+
     # Slope Filtering
     kRegCtrl8XL = 0x17
     kCtrl8XlShiftHpcfXl = 5
@@ -254,6 +961,15 @@ class QwiicISM330DHCX(object):
     kGyroOdr3332Hz = 9
     kGyroOdr6667Hz = 10
 
+    # Output data rates in Hz, indexed by the ODR values above
+    kXlOdrHz = [0, 12.5, 26, 52, 104, 208, 416, 833, 1666, 3332, 6667, 1.6]
+    kGyroOdrHz = [0, 12.5, 26, 52, 104, 208, 416, 833, 1666, 3332, 6667]
+    kTempOdrHz = 52
+
+    # FIFO batch data rates in Hz, indexed by the batch data rate values below
+    kXlBdrHz = [0, 12.5, 26, 52, 104, 208, 417, 833, 1667, 3333, 6667, 6.5]
+    kGyroBdrHz = [0, 12.5, 26, 52, 104, 208, 417, 833, 1667, 3333, 6667, 6.5]
+
     # MLC
     kMlcOdr12Hz5 = 0
     kMlcOdr26Hz  = 1
@@ -321,6 +1037,40 @@ class QwiicISM330DHCX(object):
     kFifoCtrl4ShiftFifoMode = 0
     kFifoCtrl4MaskFifoMode = 0b111 << kFifoCtrl4ShiftFifoMode
 
+    # FIFO output, a tag byte followed by 6 data bytes. With auto-increment, reads roll
+    # over from the last data byte onto the next record's tag
+    kRegFifoDataOutTag = 0x78
+    kFifoWordSize = 7
+    kFifoCapacity = 3072 // 7 # words in the 3 kB FIFO
+    kFifoTagShift = 3 # the sensor tag is in bits 7:3, followed by TAG_CNT and parity
+
+    # Possible FIFO sensor tags
+    kFifoTagGyro = 0x01
+    kFifoTagAccel = 0x02
+    kFifoTagTemp = 0x03
+    kFifoTagTimestamp = 0x04
+    kFifoTagCfgChange = 0x05
+    kFifoTagSensorHub0 = 0x0E
+    kFifoTagSensorHub1 = 0x0F
+    kFifoTagSensorHub2 = 0x10
+    kFifoTagSensorHub3 = 0x11
+    kFifoTagSensorHubNack = 0x19
+
+    kRegFifoStatus1 = 0x3A # DIFF_FIFO[7:0]
+    kRegFifoStatus2 = 0x3B
+    kFifoStatus2ShiftWtmIa = 7
+    kFifoStatus2MaskWtmIa = 0b1 << kFifoStatus2ShiftWtmIa
+    kFifoStatus2ShiftOvrIa = 6
+    kFifoStatus2MaskOvrIa = 0b1 << kFifoStatus2ShiftOvrIa
+    kFifoStatus2ShiftFullIa = 5
+    kFifoStatus2MaskFullIa = 0b1 << kFifoStatus2ShiftFullIa
+    kFifoStatus2ShiftCounterBdrIa = 4
+    kFifoStatus2MaskCounterBdrIa = 0b1 << kFifoStatus2ShiftCounterBdrIa
+    kFifoStatus2ShiftOvrLatched = 3
+    kFifoStatus2MaskOvrLatched = 0b1 << kFifoStatus2ShiftOvrLatched
+    kFifoStatus2ShiftDiffFifo = 0
+    kFifoStatus2MaskDiffFifo = 0b11 << kFifoStatus2ShiftDiffFifo
+
 
     # Possible Fifo Modes
     kBypassMode = 0
@@ -359,6 +1109,12 @@ class QwiicISM330DHCX(object):
     kGyroBatchedAt6Hz5 = 11
 
     # Possible Decimation Rates
+    # Possible Temperature Batch Data Rates
+    kTempNotBatched = 0
+    kTempBatchedAt1Hz6 = 1
+    kTempBatchedAt12Hz5 = 2
+    kTempBatchedAt52Hz = 3
+
     kNoDecimation = 0
     kDec1 = 1
     kDec8 = 2
@@ -387,6 +1143,12 @@ class QwiicISM330DHCX(object):
     kTapCfg0ShiftLir = 0
     kTapCfg0MaskLir = 0b1 << kTapCfg0ShiftLir
 
+    kRegTapCfg1 = 0x57
+    kTapCfg1ShiftTapPriority = 5
+    kTapCfg1MaskTapPriority = 0b111 << kTapCfg1ShiftTapPriority
+    kTapCfg1ShiftTapThsX = 0
+    kTapCfg1MaskTapThsX = 0b11111 << kTapCfg1ShiftTapThsX
+
     kRegTapCfg2 = 0x58
     kTapCfg2ShiftInterruptsEnable = 7
     kTapCfg2MaskInterruptsEnable = 0b1 << kTapCfg2ShiftInterruptsEnable
@@ -395,6 +1157,80 @@ class QwiicISM330DHCX(object):
     kTapCfg2ShiftTapThsY = 0
     kTapCfg2MaskTapThsY = 0b11111 << kTapCfg2ShiftTapThsY
 
+    kRegTapThs6d = 0x59
+    kTapThs6dShiftD4dEn = 7
+    kTapThs6dMaskD4dEn = 0b1 << kTapThs6dShiftD4dEn
+    kTapThs6dShiftSixdThs = 5
+    kTapThs6dMaskSixdThs = 0b11 << kTapThs6dShiftSixdThs
+    kTapThs6dShiftTapThsZ = 0
+    kTapThs6dMaskTapThsZ = 0b11111 << kTapThs6dShiftTapThsZ
+
+    kRegIntDur2 = 0x5A
+    kIntDur2ShiftDur = 4
+    kIntDur2MaskDur = 0b1111 << kIntDur2ShiftDur
+    kIntDur2ShiftQuiet = 2
+    kIntDur2MaskQuiet = 0b11 << kIntDur2ShiftQuiet
+    kIntDur2ShiftShock = 0
+    kIntDur2MaskShock = 0b11 << kIntDur2ShiftShock
+
+    kRegWakeUpThs = 0x5B
+    kWakeUpThsShiftSingleDoubleTap = 7
+    kWakeUpThsMaskSingleDoubleTap = 0b1 << kWakeUpThsShiftSingleDoubleTap
+    kWakeUpThsShiftUsrOffOnWu = 6
+    kWakeUpThsMaskUsrOffOnWu = 0b1 << kWakeUpThsShiftUsrOffOnWu
+    kWakeUpThsShiftWkThs = 0
+    kWakeUpThsMaskWkThs = 0b111111 << kWakeUpThsShiftWkThs
+
+    kRegWakeUpDur = 0x5C
+    kWakeUpDurShiftFfDur5 = 7
+    kWakeUpDurMaskFfDur5 = 0b1 << kWakeUpDurShiftFfDur5
+    kWakeUpDurShiftWakeDur = 5
+    kWakeUpDurMaskWakeDur = 0b11 << kWakeUpDurShiftWakeDur
+    kWakeUpDurShiftWakeThsW = 4
+    kWakeUpDurMaskWakeThsW = 0b1 << kWakeUpDurShiftWakeThsW
+    kWakeUpDurShiftSleepDur = 0
+    kWakeUpDurMaskSleepDur = 0b1111 << kWakeUpDurShiftSleepDur
+
+    kRegFreeFall = 0x5D
+    kFreeFallShiftFfDur = 3
+    kFreeFallMaskFfDur = 0b11111 << kFreeFallShiftFfDur
+    kFreeFallShiftFfThs = 0
+    kFreeFallMaskFfThs = 0b111 << kFreeFallShiftFfThs
+
+    # Possible inactivity modes
+    kInactDisabled = 0
+    kInactXl12Hz5 = 1 # Accelerometer drops to 12.5 Hz, gyroscope unchanged
+    kInactXl12Hz5GySleep = 2 # Accelerometer drops to 12.5 Hz, gyroscope sleeps
+    kInactXl12Hz5GyPowerDown = 3 # Accelerometer drops to 12.5 Hz, gyroscope powers down
+
+    # Possible free-fall thresholds
+    kFfThs156mg = 0
+    kFfThs219mg = 1
+    kFfThs250mg = 2
+    kFfThs312mg = 3
+    kFfThs344mg = 4
+    kFfThs406mg = 5
+    kFfThs469mg = 6
+    kFfThs500mg = 7
+
+    # Possible wake-up threshold weights (1 LSB of the threshold)
+    kWakeThsWeightFsDiv64 = 0
+    kWakeThsWeightFsDiv256 = 1
+
+    # Possible 6D thresholds
+    kSixdThs80Deg = 0
+    kSixdThs70Deg = 1
+    kSixdThs60Deg = 2
+    kSixdThs50Deg = 3
+
+    # Possible tap axis priorities
+    kTapPriorityXYZ = 0
+    kTapPriorityYXZ = 1
+    kTapPriorityXZY = 2
+    kTapPriorityZYX = 3
+    kTapPriorityYZX = 5
+    kTapPriorityZXY = 6
+
     kRegPageRw = 0x17
     kPageRwShiftEmbFuncLir = 7
     kPageRwMaskEmbFuncLir = 0b1 << kPageRwShiftEmbFuncLir
@@ -514,6 +1350,8 @@ class QwiicISM330DHCX(object):
     # Data Ready Pulse modes
     kDrdyLatched = 0
     kDrdyPulsed = 1
+    kDataReadyLatched = kDrdyLatched
+    kDataReadyPulsed = kDrdyPulsed
 
     kRegCntrBdr1 = 0x0B
     kCntrBdr1ShiftDatareadyPulsed = 7
@@ -525,6 +1363,13 @@ class QwiicISM330DHCX(object):
     kCntrBdr1ShiftCntBdrTh = 0
     kCntrBdr1MaskCntBdrTh = 0b111 << kCntrBdr1ShiftCntBdrTh
 
+    kRegCntrBdr2 = 0x0C # CNT_BDR_TH[7:0], the 3 high bits are in COUNTER_BDR_REG1
+    kCntBdrThMax = 2047
+
+    # Possible batch counter triggers
+    kCounterTrigXl = 0
+    kCounterTrigGyro = 1
+
     # Sensor Hub registers
     kRegDatawriteSlv0 = 0x21
     kRegSlv0Subadd = 0x16
@@ -541,6 +1386,7 @@ class QwiicISM330DHCX(object):
     kSlv1AddShiftR1 = 0
 
     kRegslv1Config = 0x1A
+    kRegSlv1Config = kRegslv1Config
     kSlv1ConfigShiftBatchExtSens1En = 3
     kSlv1ConfigMaskBatchExtSens1En = 0b1 << kSlv1ConfigShiftBatchExtSens1En
     kSlv1ConfigShiftSlave1Numop = 0
@@ -599,6 +1445,15 @@ class QwiicISM330DHCX(object):
     kHubWriteModeCycle = 0 # Write each cycle
     kHubWriteModeSingle = 1 # Write once
 
+    # Embedded functions registers that load_ucf() doesn't read back to check that a program is
+    # resident: the indirect page access registers and the self-clearing ones
+    kRegPageSel = 0x02
+    kRegPageAddress = 0x08
+    kRegPageValue = 0x09
+    kRegFsmLongCounterClear = 0x4A
+    kRegEmbFuncInitA = 0x66
+    kRegEmbFuncInitB = 0x67
+
     kSelfTestDisable = 0
     kSelfTestPositive = 1
     kSelfTestNegative = 2
@@ -620,13 +1475,175 @@ class QwiicISM330DHCX(object):
     kStatusShiftXlda = 0
     kStatusMaskXlda = 0b1 << kStatusShiftXlda
 
+    # Event source registers, consecutive so they can be read in one burst
+    kRegAllIntSrc = 0x1A
+    kAllIntSrcShiftTimestampEndcount = 7
+    kAllIntSrcMaskTimestampEndcount = 0b1 << kAllIntSrcShiftTimestampEndcount
+    kAllIntSrcShiftSleepChangeIa = 5
+    kAllIntSrcMaskSleepChangeIa = 0b1 << kAllIntSrcShiftSleepChangeIa
+    kAllIntSrcShiftD6dIa = 4
+    kAllIntSrcMaskD6dIa = 0b1 << kAllIntSrcShiftD6dIa
+    kAllIntSrcShiftDoubleTap = 3
+    kAllIntSrcMaskDoubleTap = 0b1 << kAllIntSrcShiftDoubleTap
+    kAllIntSrcShiftSingleTap = 2
+    kAllIntSrcMaskSingleTap = 0b1 << kAllIntSrcShiftSingleTap
+    kAllIntSrcShiftWuIa = 1
+    kAllIntSrcMaskWuIa = 0b1 << kAllIntSrcShiftWuIa
+    kAllIntSrcShiftFfIa = 0
+    kAllIntSrcMaskFfIa = 0b1 << kAllIntSrcShiftFfIa
+
+    kRegWakeUpSrc = 0x1B
+    kWakeUpSrcShiftSleepChangeIa = 6
+    kWakeUpSrcMaskSleepChangeIa = 0b1 << kWakeUpSrcShiftSleepChangeIa
+    kWakeUpSrcShiftFfIa = 5
+    kWakeUpSrcMaskFfIa = 0b1 << kWakeUpSrcShiftFfIa
+    kWakeUpSrcShiftSleepState = 4
+    kWakeUpSrcMaskSleepState = 0b1 << kWakeUpSrcShiftSleepState
+    kWakeUpSrcShiftWuIa = 3
+    kWakeUpSrcMaskWuIa = 0b1 << kWakeUpSrcShiftWuIa
+    kWakeUpSrcShiftXWu = 2
+    kWakeUpSrcMaskXWu = 0b1 << kWakeUpSrcShiftXWu
+    kWakeUpSrcShiftYWu = 1
+    kWakeUpSrcMaskYWu = 0b1 << kWakeUpSrcShiftYWu
+    kWakeUpSrcShiftZWu = 0
+    kWakeUpSrcMaskZWu = 0b1 << kWakeUpSrcShiftZWu
+
+    kRegTapSrc = 0x1C
+    kTapSrcShiftTapIa = 6
+    kTapSrcMaskTapIa = 0b1 << kTapSrcShiftTapIa
+    kTapSrcShiftSingleTap = 5
+    kTapSrcMaskSingleTap = 0b1 << kTapSrcShiftSingleTap
+    kTapSrcShiftDoubleTap = 4
+    kTapSrcMaskDoubleTap = 0b1 << kTapSrcShiftDoubleTap
+    kTapSrcShiftTapSign = 3
+    kTapSrcMaskTapSign = 0b1 << kTapSrcShiftTapSign
+    kTapSrcShiftXTap = 2
+    kTapSrcMaskXTap = 0b1 << kTapSrcShiftXTap
+    kTapSrcShiftYTap = 1
+    kTapSrcMaskYTap = 0b1 << kTapSrcShiftYTap
+    kTapSrcShiftZTap = 0
+    kTapSrcMaskZTap = 0b1 << kTapSrcShiftZTap
+
+    kRegD6dSrc = 0x1D
+    kD6dSrcShiftDenDrdy = 7
+    kD6dSrcMaskDenDrdy = 0b1 << kD6dSrcShiftDenDrdy
+    kD6dSrcShiftD6dIa = 6
+    kD6dSrcMaskD6dIa = 0b1 << kD6dSrcShiftD6dIa
+    kD6dSrcShiftOrientation = 0
+    kD6dSrcMaskOrientation = 0b111111 << kD6dSrcShiftOrientation
+
+    # D6D_SRC orientation bits
+    kD6dXl = 0x01
+    kD6dXh = 0x02
+    kD6dYl = 0x04
+    kD6dYh = 0x08
+    kD6dZl = 0x10
+    kD6dZh = 0x20
+
+    # Register map used by the field accessors (get_field(), update_fields(), dump_registers()).
+    # Each entry is (name, bank, address, access, field constant prefix). The fields of a
+    # register are the <prefix>Shift<Field>/<prefix>Mask<Field> constant pairs above, named in
+    # upper snake case, e.g. kCtrl1XlShiftLpf2XlEn is CTRL1_XL.LPF2_XL_EN. A prefix of `None`
+    # gives the register a single VALUE field, and a (prefix, fields) pair takes only the
+    # listed fields. Access is "rw", "rs" (read/write, except the fields in kDriverStateFields),
+    # "r" (read-only) or "rc" (read-only, cleared by reading), and kReadOnlyFields makes single
+    # fields of writable registers read-only. FUNC_CFG_ACCESS is left out, as the driver tracks
+    # the selected memory bank
+    kRegisterMap = (
+        ("FIFO_CTRL1", kUserBank, kRegFifoCtrl1, "rw", None),
+        ("FIFO_CTRL2", kUserBank, kRegFifoCtrl2, "rw", "kFifoCtrl2"),
+        ("FIFO_CTRL3", kUserBank, kRegFifoCtrl3, "rw", "kFifoCtrl3"),
+        ("FIFO_CTRL4", kUserBank, kRegFifoCtrl4, "rs", "kFifoCtrl4"),
+        ("COUNTER_BDR_REG1", kUserBank, kRegCntrBdr1, "rw", "kCntrBdr1"),
+        ("COUNTER_BDR_REG2", kUserBank, kRegCntrBdr2, "rw", None),
+        ("INT1_CTRL", kUserBank, kRegInt1Ctrl, "rw", "kInt1Ctrl"),
+        ("INT2_CTRL", kUserBank, kRegInt2Ctrl, "rw", "kInt2Ctrl"),
+        ("WHO_AM_I", kUserBank, kRegWhoAmI, "r", None),
+        ("CTRL1_XL", kUserBank, kRegCtrl1XL, "rw", "kCtrl1Xl"),
+        ("CTRL2_G", kUserBank, kRegCtrl2G, "rw", "kCtrl2G"),
+        ("CTRL3_C", kUserBank, kRegCtrl3C, "rs", "kCtrl3C"),
+        ("CTRL4_C", kUserBank, kRegCtrl4C, "rw", "kCtrl4C"),
+        ("CTRL5_C", kUserBank, kRegCtrl5C, "rw", "kCtrl5C"),
+        ("CTRL6_C", kUserBank, kRegCtrl6C, "rw", "kCtrl6C"),
+        ("CTRL8_XL", kUserBank, kRegCtrl8XL, "rw", "kCtrl8Xl"),
+        ("CTRL9_XL", kUserBank, kRegCtrl9XL, "rw", "kCtrl9Xl"),
+        ("CTRL10_C", kUserBank, kRegCtrl10C, "rw", "kCtrl10C"),
+        ("ALL_INT_SRC", kUserBank, kRegAllIntSrc, "rc", "kAllIntSrc"),
+        ("WAKE_UP_SRC", kUserBank, kRegWakeUpSrc, "rc", "kWakeUpSrc"),
+        ("TAP_SRC", kUserBank, kRegTapSrc, "rc", "kTapSrc"),
+        ("D6D_SRC", kUserBank, kRegD6dSrc, "rc", "kD6dSrc"),
+        ("STATUS_REG", kUserBank, kRegStatus, "r", "kStatus"),
+        ("FIFO_STATUS1", kUserBank, kRegFifoStatus1, "r", None),
+        ("FIFO_STATUS2", kUserBank, kRegFifoStatus2, "r", "kFifoStatus2"),
+        ("TIMESTAMP0", kUserBank, kRegTimestamp0, "r", None),
+        ("TIMESTAMP1", kUserBank, kRegTimestamp1, "r", None),
+        ("TIMESTAMP2", kUserBank, kRegTimestamp2, "r", None),
+        ("TIMESTAMP3", kUserBank, kRegTimestamp3, "r", None),
+        ("TAP_CFG0", kUserBank, kRegTapCfg0, "rw", "kTapCfg0"),
+        ("TAP_CFG1", kUserBank, kRegTapCfg1, "rw", "kTapCfg1"),
+        ("TAP_CFG2", kUserBank, kRegTapCfg2, "rw", "kTapCfg2"),
+        ("TAP_THS_6D", kUserBank, kRegTapThs6d, "rw", "kTapThs6d"),
+        ("INT_DUR2", kUserBank, kRegIntDur2, "rw", "kIntDur2"),
+        ("WAKE_UP_THS", kUserBank, kRegWakeUpThs, "rw", "kWakeUpThs"),
+        ("WAKE_UP_DUR", kUserBank, kRegWakeUpDur, "rw", "kWakeUpDur"),
+        ("FREE_FALL", kUserBank, kRegFreeFall, "rw", "kFreeFall"),
+        ("MD1_CFG", kUserBank, kRegMd1Cfg, "rw", "kMd1Cfg"),
+        ("MD2_CFG", kUserBank, kRegMd2Cfg, "rw", "kMd2Cfg"),
+        ("INTERNAL_FREQ_FINE", kUserBank, kRegInternalFreqFine, "r", None),
+
+        ("SENSOR_HUB_1", kSensorHubBank, kRegSensorHub1, "r", None),
+        ("MASTER_CONFIG", kSensorHubBank, kRegMasterConfig, "rw", "kMasterConfig"),
+        ("SLV0_ADD", kSensorHubBank, kRegSlv0Add, "rw", "kSlv0Add"),
+        ("SLV0_SUBADD", kSensorHubBank, kRegSlv0Subadd, "rw", None),
+        ("SLV0_CONFIG", kSensorHubBank, kRegSlv0Config, "rw", "kSlv0Config"),
+        ("SLV1_ADD", kSensorHubBank, kRegSlv1Add, "rw", "kSlv1Add"),
+        ("SLV1_SUBADD", kSensorHubBank, kRegSlv1Subadd, "rw", None),
+        ("SLV1_CONFIG", kSensorHubBank, kRegSlv1Config, "rw", "kSlv1Config"),
+        ("SLV2_ADD", kSensorHubBank, kRegSlv2Add, "rw", None),
+        ("SLV2_SUBADD", kSensorHubBank, kRegSlv2Subadd, "rw", None),
+        ("SLV2_CONFIG", kSensorHubBank, kRegSlv2Config, "rw", "kSlv2Config"),
+        ("SLV3_ADD", kSensorHubBank, kRegSlv3Add, "rw", None),
+        ("SLV3_SUBADD", kSensorHubBank, kRegSlv3Subadd, "rw", None),
+        ("SLV3_CONFIG", kSensorHubBank, kRegSlv3Config, "rw", "kSlv3Config"),
+        ("DATAWRITE_SLV0", kSensorHubBank, kRegDatawriteSlv0, "rw", None),
+        ("STATUS_MASTER", kSensorHubBank, kRegStatusMaster, "r", "kStatusMaster"),
+
+        ("EMB_FUNC_EN_B", kEmbeddedFuncBank, kRegEmbFuncEnB, "rw", "kEmbFuncEnB"),
+        ("EMB_FUNC_INT1", kEmbeddedFuncBank, kRegEmbFuncInt1, "rw", "kEmbFuncInt1"),
+        ("FSM_INT1_A", kEmbeddedFuncBank, kRegFsmInt1A, "rw", None),
+        ("FSM_INT1_B", kEmbeddedFuncBank, kRegFsmInt1B, "rw", None),
+        ("MLC_INT1", kEmbeddedFuncBank, kRegMlcInt1, "rw", None),
+        ("EMB_FUNC_INT2", kEmbeddedFuncBank, kRegEmbFunInt2, "rw", "kEmbFuncInt2"),
+        ("FSM_INT2_A", kEmbeddedFuncBank, kRegFsmInt2A, "rw", None),
+        ("FSM_INT2_B", kEmbeddedFuncBank, kRegFsmInt2B, "rw", None),
+        ("MLC_INT2", kEmbeddedFuncBank, kRegMlcInt2, "rw", None),
+        ("PAGE_RW", kEmbeddedFuncBank, kRegPageRw, "rw", "kPageRw"),
+        ("FSM_ENABLE_A", kEmbeddedFuncBank, kRegFsmEnableA, "rw", None),
+        ("FSM_ENABLE_B", kEmbeddedFuncBank, kRegFsmEnableB, "rw", None),
+        ("EMB_FUNC_ODR_CFG_B", kEmbeddedFuncBank, kRegEmbFuncOdrCfgB, "rw", ("kEmbFuncOdr", ("FsmOdr",))),
+        ("EMB_FUNC_ODR_CFG_C", kEmbeddedFuncBank, kRegEmbFuncOdrCfgC, "rw", ("kEmbFuncOdr", ("MlcOdr",))),
+    )
+
+    # Fields of "rs" registers that the field accessors refuse to write, since writing them
+    # leaves the driver's cached state stale. Each maps to the method to use instead
+    kDriverStateFields = {
+        "CTRL3_C.BOOT": "reset_and_wait(boot = True)",
+        "CTRL3_C.SW_RESET": "reset_and_wait()",
+        "FIFO_CTRL4.FIFO_MODE": "set_fifo_mode()",
+    }
+
+    # Fields the field accessors treat as read-only. The driver's block reads and writes rely
+    # on register auto-increment, so IF_INC has to stay set
+    kReadOnlyFields = ("CTRL3_C.IF_INC",)
+
     def __init__(self, address=None, i2c_driver=None):
         """!
         Constructor
 
         @param int, optional address: The I2C address to use for the device
             If not provided, the default address is used
-        @param I2CDriver, optional i2c_driver: An existing i2c driver object
+        @param I2CDriver, optional i2c_driver: An existing i2c driver object, or a transport
+            with the same interface such as IsmSpiTransport or IsmI2cDevTransport
             If not provided, a driver object is created
         """
 
@@ -645,9 +1662,41 @@ class QwiicISM330DHCX(object):
         else:
             self._i2c = i2c_driver
 
+        # The device lock is held by every method that touches the bus (see _locked), so that
+        # memory bank switches and read-modify-write sequences can't interleave with other
+        # threads. The bus lock is only held for individual transfers, so devices on the same
+        # bus interleave between transfers and devices on different buses run in parallel
+        self._lock = _RLock()
+        self._busLock = _bus_lock(self._i2c)
+        self._busRetries = 0
+
+        self._metrics = None # see enable_metrics()
+
         self._fullScaleAccel = 0 # powered down by default
         self._fullScaleGyro = 0  # powered down by default
 
+        self._odrAccel = None # unknown until set or read back
+        self._odrGyro = None
+        self._lastDataTime = None
+        self._fifoTime = None # the last FIFO timestamp decoded
+
+        self._inactMode = None # inactivity mode when power management is enabled
+        self._inactive = False
+        self._pmSaved = None # settings power management changed, restored when it's disabled
+
+        self._programHash = None # the MLC/FSM program loaded with load_ucf(), if known
+
+        self._bank = None # memory bank the device is in, unknown until first switched
+        self._bankSel = self.kUserBank # memory bank the driver has selected
+
+        self._txnDepth = 0
+        self._txnWrites = {}
+        self._txnBanks = []
+        self._txnKnown = {}
+
+        self.fields = IsmFieldView(self) # generated field accessors, e.g. fields.CTRL1_XL.ODR
+
+    @_locked
     def is_connected(self):
         """!
         Determines if this device is connected
@@ -655,32 +1704,87 @@ class QwiicISM330DHCX(object):
         @return **bool** `True` if connected, otherwise `False`
         """
         
-        if self._i2c.isDeviceConnected(self.address) == False:
+        with self._busLock:
+            connected = self._i2c.isDeviceConnected(self.address)
+
+        if connected == False:
             return False
         
         # Confirm device ID is correct
         if self.get_id() != self.kDevId:
             return False
+
+        return True
         
     connected = property(is_connected)
 
-    def begin(self):
+    @_locked
+    def begin(self, config = None, reset = True):
         """!
         Initializes this device with default parameters
 
+        When a configuration is given, the control registers are read in a burst and compared
+        against it. If they already match nothing is written and the device isn't reset, so a
+        restarted process picks up a configured device in a few transactions. Otherwise the
+        device is reset (if requested) and only the registers that differ are written.
+        Self-clearing bits (BOOT, SW_RESET, RST_COUNTER_BDR) are left out of the comparison
+        and never written.
+
+        @param config: Optional desired register values keyed by user bank register address,
+            e.g. {kRegCtrl1XL: 0x48}, an IsmConfigSnapshot whose user bank registers are used,
+            or an IsmConfig
+        @param bool reset: Reset the device before writing when it doesn't match the configuration
+
         @return **bool** Returns `True` if successful, otherwise `False`
         """
         # Confirm device is connected before doing anything
-        return self.is_connected()
+        if not self.is_connected():
+            return False
+
+        if isinstance(config, IsmConfig):
+            baseline = self.snapshot_config(include_sensor_hub = config._uses_hub())
+
+            if config.image(self, baseline) != baseline and reset:
+                if self.reset_and_wait() is None:
+                    return False
+
+                baseline = None
+
+            config.apply(self, baseline)
+        elif config is not None:
+            desired = self._config_registers(config)
+            current = self._read_config_registers()
+
+            if any(current.get(reg) != val for reg, val in desired.items()) and reset:
+                if self.reset_and_wait() is None:
+                    return False
 
+                current = self._read_config_registers()
+
+            changed = {}
+            for reg, val in desired.items():
+                if current.get(reg) != val:
+                    changed[reg] = val
+                    current[reg] = val
+
+            self._write_registers(changed, current)
+            self._sync_config_cache(current)
+        else:
+            # Pick up the settings the device is already running with
+            self._sync_config_cache()
+
+        return True
+
+    @_locked
     def get_id(self):
         """!
         Get the device ID
 
         @return **int** The device ID
         """
-        return self._i2c.readByte(self.address, self.kRegWhoAmI)
+        return self._read_byte(self.kRegWhoAmI)
 
+    @_locked
     def set_accel_full_scale(self, val):
         """!
         Set the scale of the accelerometer's readings 2g - 16g
@@ -696,15 +1800,16 @@ class QwiicISM330DHCX(object):
         if val < self.kXlFs2g or val > self.kXlFs8g:
             return
 
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl1XL)
+        regVal = self._read_byte(self.kRegCtrl1XL)
 
         regVal &= ~self.kCtrl1XlMaskFs
         regVal |= (val << self.kCtrl1XlShiftFs)
 
-        self._i2c.writeByte(self.address, self.kRegCtrl1XL, regVal)
+        self._write_byte(self.kRegCtrl1XL, regVal)
 
         self._fullScaleAccel = val
     
+    @_locked
     def set_gyro_full_scale(self, val):
         """!
         Set the scale of the gyroscope's readings 125, 250, 500, 1000, 2000, 4000 degrees per second
@@ -714,15 +1819,16 @@ class QwiicISM330DHCX(object):
         if val < self.kGyroFs250dps or val > self.kGyroFs2000dps:
             return
 
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl2G)
+        regVal = self._read_byte(self.kRegCtrl2G)
 
         regVal &= ~self.kCtrl2GMaskFs
         regVal |= (val << self.kCtrl2GShiftFs)
 
-        self._i2c.writeByte(self.address, self.kRegCtrl2G, regVal)
+        self._write_byte(self.kRegCtrl2G, regVal)
 
         self._fullScaleGyro = val
 
+    @_locked
     def get_accel_full_scale(self):
         """!
         Get the scale of the accelerometer's readings
@@ -735,11 +1841,12 @@ class QwiicISM330DHCX(object):
             - kXlFs4g
             - kXlFs8g
         """
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl1XL)
+        regVal = self._read_byte(self.kRegCtrl1XL)
 
         return (regVal & self.kCtrl1XlMaskFs) >> self.kCtrl1XlShiftFs
 
 
+    @_locked
     def get_gyro_full_scale(self):
         """!
         Get the scale of the gyroscope's readings
@@ -754,17 +1861,18 @@ class QwiicISM330DHCX(object):
             - kGyroFs2000dps
             - kGyroFs4000dps
         """
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl2G)
+        regVal = self._read_byte(self.kRegCtrl2G)
 
         return (regVal & self.kCtrl2GMaskFs) >> self.kCtrl2GShiftFs
 
+    @_locked
     def get_temp(self):
         """!
         Get the temperature
 
         @return **float** The temperature in degrees Celsius
         """
-        temp = self._i2c.read_block(self.address, self.kRegOutTempL,2)
+        temp = self._read_block(self.kRegOutTempL,2)
         val = (temp[1] << 8) | temp[0]
         # Convert to from unsigned to signed 16-bit
         if val > 32767:
@@ -778,7 +1886,10 @@ class QwiicISM330DHCX(object):
 
         @param int reg: The register to read from
         """
-        bytes = self._i2c.read_block(self.address, reg, 6)
+        bytes = self._read_block(reg, 6)
+
+        if self._metrics is not None:
+            self._metrics.count_samples(reg == self.kRegOutXLA, 1)
 
         dataOut = IsmData()
         dataOut.xData = (bytes[1] << 8) | bytes[0]
@@ -792,6 +1903,7 @@ class QwiicISM330DHCX(object):
 
         return dataOut
 
+    @_locked
     def get_raw_accel(self):
         """!
         Get the raw accelerometer readings
@@ -800,6 +1912,7 @@ class QwiicISM330DHCX(object):
         """
         return self._get_raw_data(self.kRegOutXLA)
     
+    @_locked
     def get_raw_gyro(self):
         """!
         Get the raw gyroscope readings
@@ -828,6 +1941,7 @@ class QwiicISM330DHCX(object):
 
         return data
 
+    @_locked
     def get_accel(self):
         """!
         Retrieves raw register values and converts them according to the full scale settings
@@ -845,6 +1959,7 @@ class QwiicISM330DHCX(object):
 
         return self._convert_data(data, self._fullScaleAccel, fullScaleConversions)
 
+    @_locked
     def get_gyro(self):
         """!
         Retrieves raw register values and converts them according to the full scale settings
@@ -901,6 +2016,7 @@ class QwiicISM330DHCX(object):
     def convert_lsb_to_nsec(self, lsb):
         return lsb * 25000.0
 
+    @_locked
     def set_device_config(self, enable=True):
         """!
         Enable the general device configuration
@@ -910,33 +2026,108 @@ class QwiicISM330DHCX(object):
         if enable != 0 and enable != 1:
             return
         
-        val = self._i2c.readByte(self.address, self.kRegCtrl9XL)
+        val = self._read_byte(self.kRegCtrl9XL)
         
         val &= ~self.kCtrl9XlMaskDeviceConf
         val |= (enable << self.kCtrl9XlShiftDeviceConf)
 
-        self._i2c.writeByte(self.address, self.kRegCtrl9XL, val)
+        self._write_byte(self.kRegCtrl9XL, val)
 
+    @_locked
     def device_reset(self):
         """!
         Reset the device to default settings
         """
-        val = self._i2c.readByte(self.address, self.kRegCtrl3C)
+        val = self._read_byte(self.kRegCtrl3C)
         
         val |= self.kCtrl3CMaskSwReset
 
-        self._i2c.writeByte(self.address, self.kRegCtrl3C, val)
+        self._write_byte(self.kRegCtrl3C, val)
 
+        self._reset_state()
+
+    def _reset_state(self):
+        """!
+        Forget the cached device state after a reset or reboot. Not to be used outside this class
+        """
+        # The reset puts the device back in the user bank and powers the sensors down
+        self._bank = None
+        self._bankSel = self.kUserBank
+        self._fullScaleAccel = 0
+        self._fullScaleGyro = 0
+        self._odrAccel = None
+        self._odrGyro = None
+        self._lastDataTime = None
+        self._fifoTime = None
+        self._inactMode = None
+        self._inactive = False
+        self._pmSaved = None
+        self._programHash = None
+
+    @_locked
     def get_device_reset(self):
         """!
         Get the device reset state
 
         @return **bool** The device reset state
         """
-        val = self._i2c.readByte(self.address, self.kRegCtrl3C)
+        val = self._read_byte(self.kRegCtrl3C)
 
         return (val & self.kCtrl3CMaskSwReset) == 0
 
+    @_locked
+    def reset_and_wait(self, boot = False, timeout = 0.1, poll_interval = 0.0005, config = None):
+        """!
+        Reset the device and wait until it is ready again, polling CTRL3_C at a fine interval
+        until the reset bit clears and WHO_AM_I answers
+
+        @param bool boot: Reboot the memory content (BOOT) instead of a software reset (SW_RESET)
+        @param float timeout: The maximum time to wait in seconds
+        @param float poll_interval: The time between polls in seconds
+        @param config: Optional configuration written straight after the reset. Either register
+            values keyed by user bank register address, an IsmConfigSnapshot or an IsmConfig
+
+        @return **float** The measured reset time in seconds, or `None` if the device didn't
+            come back before the timeout
+        """
+        mask = self.kCtrl3CMaskBoot if boot else self.kCtrl3CMaskSwReset
+
+        start = _monotonic()
+        if boot:
+            val = self._read_byte(self.kRegCtrl3C)
+            self._write_byte(self.kRegCtrl3C, val | mask)
+            self._reset_state()
+        else:
+            self.device_reset()
+
+        deadline = start + timeout
+        while True:
+            time.sleep(poll_interval)
+
+            try:
+                # The device may not acknowledge while it is rebooting
+                ready = not (self._read_byte(self.kRegCtrl3C) & mask) and self.get_id() == self.kDevId
+            except (IOError, OSError):
+                ready = False
+
+            if ready:
+                break
+
+            if _monotonic() > deadline:
+                return None
+
+        elapsed = _monotonic() - start
+
+        if config is not None:
+            if isinstance(config, IsmConfig):
+                config.apply(self)
+            else:
+                self._write_registers(self._config_registers(config))
+                self._sync_config_cache()
+
+        return elapsed
+
+    @_locked
     def set_accel_slope_filter(self, val):
         """!
         Set's the accelerometer's slope filter
@@ -953,7 +2144,7 @@ class QwiicISM330DHCX(object):
         newRefMode = (val & 0x20) >> 5
         newCf = (val & 0x07)
 
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl8XL)
+        regVal = self._read_byte(self.kRegCtrl8XL)
 
         regVal &= ~self.kCtrl8XlMaskHpSlopeXlEn
         regVal |= (newSlopeEn << self.kCtrl8XlShiftHpSlopeXlEn)
@@ -964,8 +2155,9 @@ class QwiicISM330DHCX(object):
         regVal &= ~self.kCtrl8XlMaskHpcfXl
         regVal |= (newCf << self.kCtrl8XlShiftHpcfXl)
         
-        self._i2c.writeByte(self.address, self.kRegCtrl8XL, regVal)
+        self._write_byte(self.kRegCtrl8XL, regVal)
     
+    @_locked
     def set_accel_filter_lp2(self, enable = True):
         """!
         Enable the accelerometer's high resolution slope filter
@@ -975,13 +2167,14 @@ class QwiicISM330DHCX(object):
         if enable != True and enable != False:
             return
         
-        val = self._i2c.readByte(self.address, self.kRegCtrl1XL)
+        val = self._read_byte(self.kRegCtrl1XL)
         
         val &= ~self.kCtrl1XlMaskLpf2XlEn
         val |= (enable << self.kCtrl1XlShiftLpf2XlEn)
 
-        self._i2c.writeByte(self.address, self.kRegCtrl1XL, val)
+        self._write_byte(self.kRegCtrl1XL, val)
 
+    @_locked
     def set_gyro_filter_lp1(self, enable = True):
         """!
         Enables the gyroscope's slope filter
@@ -991,13 +2184,14 @@ class QwiicISM330DHCX(object):
         if enable != True and enable != False:
             return
         
-        val = self._i2c.readByte(self.address, self.kRegCtrl4C)
+        val = self._read_byte(self.kRegCtrl4C)
 
         val &= ~self.kCtrl4CMaskLpf1SelG
         val |= (enable << self.kCtrl4CShiftLpf1SelG)
 
-        self._i2c.writeByte(self.address, self.kRegCtrl4C, val)
+        self._write_byte(self.kRegCtrl4C, val)
         
+    @_locked
     def set_gyro_lp1_bandwidth(self, val):
         """!
         Sets the low pass filter's bandwidth for the gyroscope
@@ -1017,13 +2211,14 @@ class QwiicISM330DHCX(object):
         if val < self.kBwUltraLight or val > self.kBwXtreme:
             return
         
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl6C)
+        regVal = self._read_byte(self.kRegCtrl6C)
 
         regVal &= ~self.kCtrl6CMaskFtype
         regVal |= (val << self.kCtrl6CShiftFtype)
 
-        self._i2c.writeByte(self.address, self.kRegCtrl6C, regVal)
+        self._write_byte(self.kRegCtrl6C, regVal)
 
+    @_locked
     def set_block_data_update(self, enable = True):
         """!
         Data is not updated until both MSB and LSB have been read from output registers
@@ -1033,1184 +2228,4704 @@ class QwiicISM330DHCX(object):
         if enable != True and enable != False:
             return
         
-        val = self._i2c.readByte(self.address, self.kRegCtrl3C)
+        val = self._read_byte(self.kRegCtrl3C)
 
         val &= ~self.kCtrl3CMaskBdu
         val |= (enable << self.kCtrl3CShiftBdu)
 
-        self._i2c.writeByte(self.address, self.kRegCtrl3C, val)
+        self._write_byte(self.kRegCtrl3C, val)
 
+    @_locked
     def get_block_data_update(self):
         """!
         Retrieves the bit indicating if block data update is enabled
 
         @return **int** The block data update state
         """
-        val = self._i2c.readByte(self.address, self.kRegCtrl3C)
+        val = self._read_byte(self.kRegCtrl3C)
 
         return (val & self.kCtrl3CMaskBdu) >> self.kCtrl3CShiftBdu
     
-    def _mem_bank_set(self, val):
-        """!
-        Enable access to the embedded functions/sensor hub configuration registers. Not to be used outside this module
+    # Control registers compared and written by begin(), as inclusive address ranges read
+    # in one burst each. WHO_AM_I sits between INT2_CTRL and CTRL1_XL and is skipped
+    kUserConfigRanges = [(0x07, 0x19), (0x56, 0x5F)]
 
-        @param int val: The value to set the memory bank to
+    # Sensor hub bank: MASTER_CONFIG through DATAWRITE_SLV0
+    kShubConfigRanges = [(0x14, 0x21)]
 
-        Possible values:
-            - kUserBank
-            - kSensorHubBank
-            - kEmbeddedFuncBank
-        """
-        if val < self.kUserBank or val > self.kEmbeddedFuncBank:
-            return
+    # Embedded functions bank: function enables, interrupt routing, PAGE_RW, FSM enables and
+    # ODRs. PAGE_ADDRESS/PAGE_VALUE are left out since accessing them moves the page pointer
+    kEmbFuncConfigRanges = [(0x04, 0x05), (0x0A, 0x11), (0x17, 0x17), (0x46, 0x47), (0x5F, 0x60)]
 
-        regVal = self._i2c.readByte(self.address, self.kRegFuncCfgAccess)
+    # Longest run of unchanged registers that is rewritten to join two block writes
+    kMaxWriteGap = 2
 
-        regVal &= ~self.kFuncCfgAccessMaskRegAccess
-        regVal |= (val << self.kFuncCfgAccessShiftRegAccess)
+    # User bank bits that clear themselves once the action they start is done, so they always
+    # read back as zero
+    kSelfClearingBits = {
+        kRegCtrl3C: kCtrl3CMaskBoot | kCtrl3CMaskSwReset,
+        kRegCntrBdr1: kCntrBdr1MaskRstCounterBdr,
+    }
 
-        self._i2c.writeByte(self.address, self.kRegFuncCfgAccess, regVal)
+    def _config_ranges(self, bank):
+        """!
+        Get the configuration register ranges of a memory bank. Not to be used outside this module
+        """
+        if bank == self.kSensorHubBank:
+            return self.kShubConfigRanges
+        if bank == self.kEmbeddedFuncBank:
+            return self.kEmbFuncConfigRanges
+        return self.kUserConfigRanges
 
-    def _fsm_enable_get(self):
+    def _read_config_registers(self, bank = None):
         """!
-        Embedded finite state machine functions mode. Not to be used outside this module
+        Read the control registers of the currently selected bank in one burst per range.
+        Not to be used outside this module
 
-        @return **tuple of int** Tuple containing fsmEnableA followed by fsmEnableB
+        @param int bank: The memory bank that is selected. Defaults to the user bank
+
+        @return **dict** The register values keyed by address
         """
-        self._mem_bank_set(self.kEmbeddedFuncBank)
+        if bank is None:
+            bank = self.kUserBank
 
-        fsmEnableA = self._i2c.readByte(self.address, self.kRegFsmEnableA)
-        fsmEnableB = self._i2c.readByte(self.address, self.kRegFsmEnableB)
+        regs = {}
+        for first, last in self._config_ranges(bank):
+            block = self._read_block(first, last - first + 1)
+            for i in range(last - first + 1):
+                regs[first + i] = block[i]
 
-        self._mem_bank_set(self.kUserBank)
+        if bank == self.kUserBank:
+            del regs[self.kRegWhoAmI]
 
-        return (fsmEnableA, fsmEnableB)
-    
-    def _fsm_data_rate_get(self):
+            for reg, mask in self.kSelfClearingBits.items():
+                regs[reg] &= ~mask
+
+        return regs
+
+    def _config_registers(self, config):
         """!
-        Get the data rate (ODR) of the finite state machine
+        Convert a configuration into register values. Not to be used outside this module
 
-        @return **int** The data rate of the finite state machine
+        @param config: Register values keyed by user bank register address, or an IsmConfigSnapshot
+            whose user bank registers are used
 
-        Possible return values:
-            - kOdrFsm12Hz5
-            - kOdrFsm26Hz
-            - kOdrFsm52Hz
-            - kOdrFsm104Hz
+        @return **dict** The register values to apply
         """
-        self._mem_bank_set(self.kEmbeddedFuncBank)
+        if isinstance(config, IsmConfigSnapshot):
+            config = config.registers(self.kUserBank)
 
-        fsmOdrCfgB = self._i2c.readByte(self.address, self.kRegEmbFuncOdrCfgB)
+        regs = {}
+        for reg, val in config.items():
+            if reg == self.kRegWhoAmI or not any(first <= reg <= last for first, last in self.kUserConfigRanges):
+                raise ValueError("Register 0x%02X is not a configuration register" % reg)
+            regs[reg] = val & 0xFF
 
-        self._mem_bank_set(self.kUserBank)
+        # Never trigger a reset or a batch counter reset, those bits don't hold a setting
+        for reg, mask in self.kSelfClearingBits.items():
+            if reg in regs:
+                regs[reg] &= ~mask
 
-        return (fsmOdrCfgB & self.kEmbFuncOdrMaskFsmOdr) >> self.kEmbFuncOdrShiftFsmOdr
-    
-    def _mlc_get(self):
+        if self.kRegCtrl3C in regs:
+            # Keep auto-increment on so block transfers keep working
+            regs[self.kRegCtrl3C] |= self.kCtrl3CMaskIfInc
+
+        return regs
+
+    def _write_registers(self, values, known = None):
         """!
-        Get the Machine Learning Core enable state
+        Write registers in the current bank, merging adjacent addresses into auto-increment
+        block writes. Not to be used outside this module
 
-        @return **int** The Machine Learning Core enable state
+        @param dict values: The register values to write keyed by address
+        @param dict known: Optional current register values. Short runs of unchanged registers
+            found here are rewritten with their current value so two block writes become one
         """
-        self._mem_bank_set(self.kEmbeddedFuncBank)
+        if self._txnDepth:
+            for reg in values:
+                self._write_byte(reg, values[reg])
+            return
 
-        regVal = self._i2c.readByte(self.address, self.kRegEmbFuncEnB)
+        if self._bankSel == self.kSensorHubBank and self.kRegMasterConfig in values and len(values) > 1:
+            # Configure the peripherals before the sensor hub is (re)started
+            values = dict(values)
+            masterConfig = values.pop(self.kRegMasterConfig)
+            self._write_registers(values, known)
+            self._write_byte(self.kRegMasterConfig, masterConfig)
+            return
 
-        self._mem_bank_set(self.kUserBank)
+        regs = sorted(values)
+        i = 0
+        while i < len(regs):
+            first = regs[i]
+            data = [values[first]]
+            i += 1
+
+            while i < len(regs):
+                gap = regs[i] - (first + len(data))
+                if gap == 0:
+                    data.append(values[regs[i]])
+                    i += 1
+                elif known is not None and gap <= self.kMaxWriteGap \
+                        and all((first + len(data) + k) in known for k in range(gap)):
+                    data.extend(known[first + len(data) + k] for k in range(gap))
+                else:
+                    break
 
-        return (regVal & self.kEmbFuncEnBMaskMlcEn) >> self.kEmbFuncEnBShiftMlcEn
-    
-    def _mlc_data_rate_get(self):
+            if len(data) == 1:
+                self._write_byte(first, data[0])
+            else:
+                self._write_block(first, data)
+
+    def _sync_config_cache(self, regs = None):
         """!
-        Get Machine Learning Core data rate selection
+        Update the cached full scale and data rate settings. Not to be used outside this module
 
-        @return **int** The Machine Learning Core data rate selection
+        @param dict regs: Optional register values keyed by address that include CTRL1_XL and
+            CTRL2_G. If not provided, the registers are read from the device
+        """
+        if regs is None:
+            block = self._read_block(self.kRegCtrl1XL, 2)
+            ctrl1Xl, ctrl2G = block[0], block[1]
+        else:
+            ctrl1Xl, ctrl2G = regs[self.kRegCtrl1XL], regs[self.kRegCtrl2G]
 
-        For possible return values see the "MLC" section in "Possible data rates" in the class definition
+        self._fullScaleAccel = (ctrl1Xl & self.kCtrl1XlMaskFs) >> self.kCtrl1XlShiftFs
+        self._fullScaleGyro = (ctrl2G & self.kCtrl2GMaskFs) >> self.kCtrl2GShiftFs
+        self._odrAccel = (ctrl1Xl & self.kCtrl1XlMaskOdr) >> self.kCtrl1XlShiftOdr
+        self._odrGyro = (ctrl2G & self.kCtrl2GMaskOdr) >> self.kCtrl2GShiftOdr
+
+    @_locked
+    def snapshot_config(self, include_embedded = False, include_sensor_hub = False):
+        """!
+        Read the configuration registers into an immutable snapshot, using one block read per
+        register range: FIFO_CTRL1 to CTRL10_C and TAP_CFG0 to MD2_CFG in the user bank, and
+        optionally the sensor hub and embedded functions banks
+
+        @param bool include_embedded: Also read the embedded functions bank
+        @param bool include_sensor_hub: Also read the sensor hub bank
+
+        @return **IsmConfigSnapshot** The snapshot
         """
-        self._mem_bank_set(self.kEmbeddedFuncBank)
+        regs = {}
+        for reg, val in self._read_config_registers().items():
+            regs[(self.kUserBank, reg)] = val
 
-        regVal = self._i2c.readByte(self.address, self.kRegEmbFuncOdrCfgC)
+        for bank, include in [(self.kSensorHubBank, include_sensor_hub), (self.kEmbeddedFuncBank, include_embedded)]:
+            if not include:
+                continue
 
-        self._mem_bank_set(self.kUserBank)
+            self._mem_bank_set(bank)
+            for reg, val in self._read_config_registers(bank).items():
+                regs[(bank, reg)] = val
 
-        return (regVal & self.kEmbFuncOdrMaskMlcOdr) >> self.kEmbFuncOdrShiftMlcOdr
+        if include_embedded or include_sensor_hub:
+            self._mem_bank_set(self.kUserBank)
 
+        return IsmConfigSnapshot(regs)
 
-    def set_accel_data_rate(self, val): 
+    @_locked
+    def restore_config(self, snapshot, baseline = None):
         """!
-        Sets the data output rate of the accelerometer
+        Write a configuration snapshot back to the device with auto-increment block writes
 
-        @param int val: Data rate
-
-        See the "Accelerometer section in Possible data rates" in the class definition for a list of valid arguments
+        @param IsmConfigSnapshot snapshot: The configuration to restore
+        @param IsmConfigSnapshot baseline: Optional snapshot of what the device currently holds,
+            e.g. the snapshot last restored. When given, only the registers that differ are written
         """
-        if val < self.kXlOdrOff or val > self.kXlOdr1Hz6:
-            return
-        
-        enableA, enableB = self._fsm_enable_get()
+        currentBank = self.kUserBank
 
-        odrXl = val
+        for bank in snapshot.banks():
+            values = snapshot.registers(bank)
+            known = baseline.registers(bank) if baseline is not None else {}
 
-        if (enableA & 0xFF) or (enableB & 0xFF):
-            # Coresponds to any of the FSMs being enabled
-            fsmOdr = self._fsm_data_rate_get()
-            if fsmOdr == self.kOdrFsm12Hz5:
-                if val == self.kXlOdrOff:
-                    odrXl = self.kXlOdr12Hz5
+            if bank == self.kUserBank:
+                values = self._config_registers(values)
+            elif bank == self.kSensorHubBank and self.kRegMasterConfig in values:
+                values[self.kRegMasterConfig] &= ~self.kMasterConfigMaskRstMasterRegs
 
-            elif fsmOdr == self.kOdrFsm26Hz:
-                if val == self.kXlOdrOff:
-                    odrXl = self.kXlOdr26Hz
-                elif val == self.kXlOdr12Hz5:
-                    odrXl = self.kXlOdr26Hz
+            changed = {}
+            for reg, val in values.items():
+                if known.get(reg) != val:
+                    changed[reg] = val
 
-            elif fsmOdr == self.kOdrFsm52Hz:
-                if val == self.kXlOdrOff:
-                    odrXl = self.kXlOdr52Hz
-                elif val == self.kXlOdr12Hz5:
-                    odrXl = self.kXlOdr52Hz
+            if not changed:
+                continue
+
+            if bank != currentBank:
+                self._mem_bank_set(bank)
+                currentBank = bank
+
+            self._write_registers(changed, known)
+
+        if currentBank != self.kUserBank:
+            self._mem_bank_set(self.kUserBank)
+
+        if snapshot.get(self.kUserBank, self.kRegCtrl1XL) is not None:
+            self._sync_config_cache(snapshot.registers(self.kUserBank))
+
+    def _field(self, name):
+        """!
+        Look up a register field. Not to be used outside this module
+
+        @param str name: The field, as "REGISTER.FIELD"
+
+        @return **tuple** The register's bank and address with the field's access, and the
+            field's mask and shift
+        """
+        field = self._fields.get(name)
+        if field is None:
+            raise ValueError("unknown register field %s" % name)
+
+        reg, mask, shift, access = field
+        return self._registers[reg][:2] + (access,), mask, shift
+
+    def _read_registers(self, names):
+        """!
+        Read registers of kRegisterMap, with one block read per run of adjacent registers in
+        each memory bank. Not to be used outside this module
+
+        @param list names: The register names
+
+        @return **dict** The register values, keyed by name
+        """
+        byBank = {}
+        for name in set(names):
+            bank, reg = self._registers[name][:2]
+            byBank.setdefault(bank, []).append((reg, name))
+
+        values = {}
+        for bank in sorted(byBank):
+            regs = sorted(byBank[bank])
+            self._mem_bank_set(bank)
+
+            i = 0
+            while i < len(regs):
+                end = i + 1
+                while end < len(regs) and regs[end][0] == regs[end - 1][0] + 1:
+                    end += 1
+
+                data = self._read_block(regs[i][0], end - i)
+                for k in range(i, end):
+                    values[regs[k][1]] = data[k - i]
+                i = end
+
+        if self._bankSel != self.kUserBank:
+            self._mem_bank_set(self.kUserBank)
+
+        return values
+
+    @_locked
+    def read_fields(self, names = None):
+        """!
+        Read several register fields, with one block read per run of adjacent registers
+
+        @param list names: The fields, as "REGISTER.FIELD". Defaults to every field of
+            kRegisterMap in registers that aren't cleared by reading
+
+        @return **dict** The field values, keyed by name
+        """
+        if names is None:
+            names = [name for name in self._fieldOrder if self._registers[self._fields[name][0]][2] != "rc"]
+
+        for name in names:
+            self._field(name)
+
+        regs = self._read_registers([self._fields[name][0] for name in names])
+
+        out = {}
+        for name in names:
+            reg, mask, shift = self._fields[name][:3]
+            out[name] = (regs[reg] & mask) >> shift
+
+        return out
+
+    @_locked
+    def update_fields(self, values):
+        """!
+        Set several register fields at once. All values are checked before anything is
+        written; the registers that aren't fully overwritten are read with block reads, each
+        changed register is written once, and adjacent registers are written as one block
+
+        Fields of CTRL1_XL and CTRL2_G also update the cached full scale and data rate settings.
+        The reset bits and the FIFO mode (see kDriverStateFields) can't be set here, use the
+        driver methods that keep the driver's state in step. IF_INC is read-only (see
+        kReadOnlyFields).
+
+        @param dict values: The new field values, keyed by "REGISTER.FIELD"
+        """
+        regs = {}
+        for name, val in values.items():
+            (bank, reg, access), mask, shift = self._field(name)
+            val = int(val)
+            if access not in ("rw", "rs"):
+                raise ValueError("%s is read-only" % name)
+            if name in self.kDriverStateFields:
+                raise ValueError("%s can't be set directly, use %s" % (name, self.kDriverStateFields[name]))
+            if val < 0 or val > (mask >> shift):
+                raise ValueError("%s must be between 0 and %d" % (name, mask >> shift))
+
+            regs.setdefault(self._fields[name][0], []).append((mask, val << shift))
+
+        partial = [reg for reg, fields in regs.items() if sum(mask for mask, val in fields) != 0xFF]
+        current = self._read_registers(partial)
+
+        with self.transaction():
+            for reg in sorted(regs, key = lambda reg: self._registers[reg][:2]):
+                old = current.get(reg, 0)
+                new = old
+                for mask, val in regs[reg]:
+                    new = (new & ~mask) | val
+
+                if reg not in current or new != old:
+                    bank, address = self._registers[reg][:2]
+                    self._mem_bank_set(bank)
+                    self._write_byte(address, new)
+
+            self._mem_bank_set(self.kUserBank)
+
+        if "CTRL1_XL" in regs or "CTRL2_G" in regs:
+            self._sync_config_cache()
+
+    @_locked
+    def get_field(self, name):
+        """!
+        Read a register field
+
+        @param str name: The field, as "REGISTER.FIELD", e.g. "CTRL1_XL.ODR"
+
+        @return **int** The field value
+        """
+        return self.read_fields([name])[name]
+
+    @_locked
+    def set_field(self, name, val):
+        """!
+        Set a register field with one read-modify-write of its register
+
+        @param str name: The field, as "REGISTER.FIELD", e.g. "CTRL1_XL.ODR"
+        @param int val: The new value
+        """
+        self.update_fields({name: val})
+
+    @_locked
+    def dump_registers(self, include_cleared = False):
+        """!
+        Read every register of kRegisterMap and format it with its decoded fields
+
+        @param bool include_cleared: Also read the registers that are cleared by reading,
+            which loses any latched events they hold
+
+        @return **str** One line per register: name, address, value and fields
+        """
+        names = [name for name, bank, reg, access, prefix in self.kRegisterMap
+                 if include_cleared or access != "rc"]
+        values = self._read_registers(names)
+        bankNames = {self.kUserBank: "User", self.kSensorHubBank: "Sensor hub",
+                     self.kEmbeddedFuncBank: "Embedded functions"}
+
+        lines = []
+        lastBank = None
+        for name in names:
+            bank, reg, access, fieldNames = self._registers[name]
+            if bank != lastBank:
+                lines.append("%s bank:" % bankNames[bank])
+                lastBank = bank
+
+            fields = []
+            for field in fieldNames:
+                mask, shift = self._fields[name + "." + field][1:3]
+                fields.append("%s=%d" % (field, (values[name] & mask) >> shift))
+
+            lines.append("  %-20s 0x%02X  0x%02X  %s" % (name, reg, values[name], " ".join(fields)))
+
+        return "\n".join(lines)
+
+    def _mem_bank_set(self, val):
+        """!
+        Enable access to the embedded functions/sensor hub configuration registers. Not to be used outside this module
+
+        @param int val: The value to set the memory bank to
+
+        Possible values:
+            - kUserBank
+            - kSensorHubBank
+            - kEmbeddedFuncBank
+        """
+        if val < self.kUserBank or val > self.kEmbeddedFuncBank:
+            return
+
+        self._bankSel = val
+
+        # Inside a transaction the switch is deferred until a register is actually accessed
+        if self._txnDepth == 0:
+            self._select_bank(val)
+
+    def _select_bank(self, val):
+        """!
+        Switch the device to a memory bank if it isn't already there. Not to be used outside this module
+
+        The remaining bits of FUNC_CFG_ACCESS must be zero, so the register is written without
+        reading it first.
+
+        @param int val: The memory bank
+        """
+        if self._bank != val:
+            self._bus_call(False, self._i2c.writeByte, self.kRegFuncCfgAccess, val << self.kFuncCfgAccessShiftRegAccess)
+            self._bank = val
+
+            if self._metrics is not None:
+                with self._busLock:
+                    self._metrics.bank_switches += 1
+
+    def _bus_call(self, read, func, *args):
+        """!
+        Make a bus transfer with the bus lock held, retrying failed transfers (see
+        set_bus_retries()) and updating the metrics. Not to be used outside this module
+
+        @param bool read: The transfer is a read
+        @param func: The driver method to call
+        @param args: The driver method's arguments after the device address
+
+        @return The driver method's result
+        """
+        metrics = self._metrics
+        attempt = 0
+        while True:
+            if metrics is not None:
+                start = _monotonic()
+
+            # The metrics are updated before the bus lock is released, since devices on the
+            # same bus and the reader threads update them concurrently
+            with self._busLock:
+                try:
+                    result = func(self.address, *args)
+                except (IOError, OSError):
+                    if metrics is not None:
+                        metrics.bus_errors += 1
+                    if attempt >= self._busRetries:
+                        raise
+                    attempt += 1
+                    if metrics is not None:
+                        metrics.bus_retries += 1
+                    continue
+
+                if metrics is not None:
+                    if read:
+                        metrics.reads += 1
+                        metrics.record_latency(_monotonic() - start)
+                    else:
+                        metrics.writes += 1
+
+            return result
+
+    def _read_block_copy(self, address, reg, buf, length):
+        """!
+        read_block_into() for drivers without it. Not to be used outside this module
+        """
+        buf[:length] = bytes(self._i2c.read_block(address, reg, length))
+
+    def _read_byte(self, reg):
+        """!
+        Read a register in the selected memory bank. Not to be used outside this module
+
+        @param int reg: The register to read
+
+        @return **int** The register value, or the value queued for it in the current transaction
+        """
+        bank = self._bankSel
+        if self._txnDepth:
+            pending = self._txnWrites.get(bank)
+            if pending and reg in pending:
+                return pending[reg]
+
+        self._select_bank(bank)
+        val = self._bus_call(True, self._i2c.readByte, reg)
+
+        if self._txnDepth:
+            self._txnKnown.setdefault(bank, {})[reg] = val
+
+        return val
+
+    def _read_block(self, reg, length):
+        """!
+        Read consecutive registers in the selected memory bank. Not to be used outside this module
+
+        @param int reg: The first register to read
+        @param int length: The number of registers to read
+
+        @return **list** The register values, with any values queued in the current transaction applied
+        """
+        bank = self._bankSel
+        self._select_bank(bank)
+        data = self._bus_call(True, self._i2c.read_block, reg, length)
+
+        if self._txnDepth:
+            known = self._txnKnown.setdefault(bank, {})
+            pending = self._txnWrites.get(bank, {})
+            data = list(data)
+            for i in range(length):
+                known[reg + i] = data[i]
+                if reg + i in pending:
+                    data[i] = pending[reg + i]
+
+        return data
+
+    def _read_block_into(self, reg, buf, length):
+        """!
+        Read consecutive registers in the selected memory bank into a buffer, without copying
+        if the driver supports it. Not to be used outside this module
+
+        @param int reg: The first register to read
+        @param bytearray buf: The buffer to read into
+        @param int length: The number of registers to read
+        """
+        bank = self._bankSel
+        self._select_bank(bank)
+        if hasattr(self._i2c, "read_block_into"):
+            self._bus_call(True, self._i2c.read_block_into, reg, buf, length)
+        else:
+            self._bus_call(True, self._read_block_copy, reg, buf, length)
+
+    def _write_byte(self, reg, val):
+        """!
+        Write a register in the selected memory bank, or queue it if a transaction is open.
+        Not to be used outside this module
+
+        @param int reg: The register to write
+        @param int val: The value to write
+        """
+        if self._txnDepth:
+            bank = self._bankSel
+            if bank not in self._txnWrites:
+                self._txnWrites[bank] = {}
+                self._txnBanks.append(bank)
+            self._txnWrites[bank][reg] = val & 0xFF
+            return
+
+        self._select_bank(self._bankSel)
+        self._bus_call(False, self._i2c.writeByte, reg, val)
+
+    def _write_block(self, reg, data):
+        """!
+        Write consecutive registers in the selected memory bank, or queue them if a transaction
+        is open. Not to be used outside this module
+
+        @param int reg: The first register to write
+        @param list data: The values to write
+        """
+        if self._txnDepth:
+            for i in range(len(data)):
+                self._write_byte(reg + i, data[i])
+            return
+
+        self._select_bank(self._bankSel)
+        self._bus_call(False, self._i2c.write_block, reg, list(data))
+
+    def transaction(self):
+        """!
+        Open a write-combining transaction, for use in a `with` statement
+
+        Register writes made inside the transaction are queued and flushed when it closes,
+        with writes to adjacent registers merged into auto-increment block writes and memory
+        bank switches made only when needed. Reads see the queued values. Transactions can be
+        nested; only the outermost one flushes. If the block raises, the queued writes are dropped.
+        The device lock is held for the whole transaction, so it also makes a sequence of calls
+        atomic with respect to other threads.
+
+        Each register is written once with its final value, so don't wrap sequences that rely on
+        pulsing a bit, such as device_reset() or reset_sensor_hub().
+
+        @return **IsmTransaction** The transaction context manager
+        """
+        return IsmTransaction(self)
+
+    def _txn_begin(self):
+        """!
+        Open a (possibly nested) transaction. Not to be used outside this module
+        """
+        self._lock.acquire()
+        self._txnDepth += 1
+
+    def _txn_end(self, commit):
+        """!
+        Close a transaction, flushing the queued writes when the outermost one closes.
+        Not to be used outside this module
+
+        @param bool commit: Write the queued registers, otherwise drop them
+        """
+        try:
+            self._txnDepth -= 1
+            if self._txnDepth:
+                return
+
+            writes, banks, known = self._txnWrites, self._txnBanks, self._txnKnown
+            self._txnWrites, self._txnBanks, self._txnKnown = {}, [], {}
+
+            selected = self._bankSel
+            try:
+                if commit:
+                    for bank in banks:
+                        self._bankSel = bank
+                        merged = dict(known.get(bank, {}))
+                        merged.update(writes[bank])
+                        self._write_registers(writes[bank], merged)
+            finally:
+                self._bankSel = selected
+                self._select_bank(selected)
+        finally:
+            self._lock.release()
+
+    def set_bus_retries(self, count):
+        """!
+        Sets how many times a failed bus transfer is retried before the error is raised
+
+        @param int count: The number of retries, 0 to raise straight away
+        """
+        if count < 0:
+            return
+
+        self._busRetries = count
+
+    def enable_metrics(self, name = None, registry = None):
+        """!
+        Start collecting acquisition health metrics for this device
+
+        @param str name: The device label in the metrics, defaults to the address, e.g. "0x6b"
+        @param registry: Optional registry to add the metrics to, such as
+            qwiic_ism330dhcx_metrics.IsmMetricsRegistry.shared, which renders and serves them
+            in the Prometheus format
+
+        @return **IsmMetrics** The metrics
+        """
+        if self._metrics is None:
+            if name is None:
+                name = "0x%02x" % self.address
+
+            self._metrics = IsmMetrics(self, name)
+            if registry is not None:
+                registry.register(self._metrics)
+
+        return self._metrics
+
+    def get_metrics(self):
+        """!
+        Gets the metrics started by enable_metrics()
+
+        @return **IsmMetrics** The metrics, or `None` if they aren't enabled
+        """
+        return self._metrics
+
+    def _fsm_enable_get(self):
+        """!
+        Embedded finite state machine functions mode. Not to be used outside this module
+
+        @return **tuple of int** Tuple containing fsmEnableA followed by fsmEnableB
+        """
+        self._mem_bank_set(self.kEmbeddedFuncBank)
+
+        regs = self._read_block(self.kRegFsmEnableA, 2)
+        fsmEnableA, fsmEnableB = regs[0], regs[1]
+
+        self._mem_bank_set(self.kUserBank)
+
+        return (fsmEnableA, fsmEnableB)
+    
+    def _fsm_data_rate_get(self):
+        """!
+        Get the data rate (ODR) of the finite state machine
+
+        @return **int** The data rate of the finite state machine
+
+        Possible return values:
+            - kOdrFsm12Hz5
+            - kOdrFsm26Hz
+            - kOdrFsm52Hz
+            - kOdrFsm104Hz
+        """
+        self._mem_bank_set(self.kEmbeddedFuncBank)
+
+        fsmOdrCfgB = self._read_byte(self.kRegEmbFuncOdrCfgB)
+
+        self._mem_bank_set(self.kUserBank)
+
+        return (fsmOdrCfgB & self.kEmbFuncOdrMaskFsmOdr) >> self.kEmbFuncOdrShiftFsmOdr
+    
+    def _mlc_get(self):
+        """!
+        Get the Machine Learning Core enable state
+
+        @return **int** The Machine Learning Core enable state
+        """
+        self._mem_bank_set(self.kEmbeddedFuncBank)
+
+        regVal = self._read_byte(self.kRegEmbFuncEnB)
+
+        self._mem_bank_set(self.kUserBank)
+
+        return (regVal & self.kEmbFuncEnBMaskMlcEn) >> self.kEmbFuncEnBShiftMlcEn
+    
+    def _mlc_data_rate_get(self):
+        """!
+        Get Machine Learning Core data rate selection
+
+        @return **int** The Machine Learning Core data rate selection
+
+        For possible return values see the "MLC" section in "Possible data rates" in the class definition
+        """
+        self._mem_bank_set(self.kEmbeddedFuncBank)
+
+        regVal = self._read_byte(self.kRegEmbFuncOdrCfgC)
+
+        self._mem_bank_set(self.kUserBank)
+
+        return (regVal & self.kEmbFuncOdrMaskMlcOdr) >> self.kEmbFuncOdrShiftMlcOdr
+
+    def _compile_ucf(self, lines):
+        """!
+        Compile the lines of an ST .ucf file into coalesced register writes. Not to be used outside this module
+
+        Writes to consecutive addresses in the same bank are merged into a single auto-increment
+        block write and redundant FUNC_CFG_ACCESS bank switches are dropped.
+
+        @param list of str lines: The lines of the .ucf file
+
+        @return **tuple** A list of operations, each ("write", reg, bytearray) or ("wait", ms),
+            the 64-bit hash of the program, and the final value the program writes to each
+            directly addressed embedded functions register that can be read back
+        """
+        ops = []
+        bankVal = None
+        progHash = 0xCBF29CE484222325 # FNV-1a offset basis
+        checks = {}
+        skip = (self.kRegPageSel, self.kRegPageAddress, self.kRegPageValue, self.kRegPageRw,
+                self.kRegFsmLongCounterClear, self.kRegEmbFuncInitA, self.kRegEmbFuncInitB)
+
+        def fnv(progHash, data):
+            for byte in data:
+                progHash = ((progHash ^ byte) * 0x100000001B3) & 0xFFFFFFFFFFFFFFFF
+            return progHash
+
+        for line in lines:
+            tokens = line.split()
+            if not tokens or tokens[0].startswith("--"):
+                continue
+
+            cmd = tokens[0].upper()
+            if cmd == "WAIT" and len(tokens) == 2:
+                ms = int(tokens[1])
+                ops.append(("wait", ms))
+                progHash = fnv(progHash, [ord("W"), ms & 0xFF, (ms >> 8) & 0xFF, (ms >> 16) & 0xFF, (ms >> 24) & 0xFF])
+                continue
+
+            if cmd != "AC" or len(tokens) != 3:
+                raise ValueError("Unrecognized UCF line: %s" % line.strip())
+
+            reg = int(tokens[1], 16)
+            val = int(tokens[2], 16)
+            progHash = fnv(progHash, [ord("A"), reg, val])
+
+            if reg == self.kRegFuncCfgAccess:
+                # Bank switches are never merged, and are skipped when they don't change anything
+                if val == bankVal:
+                    continue
+                bankVal = val
+                ops.append(("write", reg, bytearray([val])))
+                continue
+
+            bank = (bankVal or 0) >> self.kFuncCfgAccessShiftRegAccess
+            if bank == self.kEmbeddedFuncBank and reg not in skip:
+                checks[reg] = val
+
+            last = ops[-1] if ops else None
+            if last and last[0] == "write" and last[1] != self.kRegFuncCfgAccess \
+                    and last[1] + len(last[2]) == reg:
+                last[2].append(val)
+            else:
+                ops.append(("write", reg, bytearray([val])))
+
+        return ops, progHash, checks
+
+    def _read_program_file(self, path):
+        """!
+        Read the program hash saved by load_ucf(). Not to be used outside this module
+
+        @param str path: The file
+
+        @return **int** The hash, or `None` if the file is missing or unreadable
+        """
+        try:
+            with open(path) as hashFile:
+                return int(hashFile.read().strip(), 16)
+        except (OSError, ValueError):
+            return None
+
+    def get_program_hash(self, state_file = None):
+        """!
+        Get the hash of the MLC/FSM program last loaded with load_ucf()
+
+        @param str state_file: The file passed to load_ucf(), to get the hash saved by another process
+
+        @return **int** The 64-bit program hash, 0 if no program is known to be loaded
+        """
+        if self._programHash is not None:
+            return self._programHash
+
+        if state_file is not None:
+            return self._read_program_file(state_file) or 0
+
+        return 0
+
+    @_locked
+    def load_ucf(self, source, force = False, state_file = None):
+        """!
+        Load an MLC/FSM program from an ST .ucf register sequence
+
+        The load is skipped if the same program is already resident: its 64-bit hash matches the
+        last program loaded through this object, or the one saved in state_file by an earlier
+        process, and the embedded functions registers the program sets (enables, data rates,
+        interrupt routing) still read back as the program left them, which they don't after a
+        reset or power cycle. Nothing is stored on the device.
+
+        @param source: The path of the .ucf file, or an iterable of its lines
+        @param bool force: Load the program even if it is already resident
+        @param str state_file: A file to save the program hash in, so that a restarted process
+            can skip the load. Use one file per device
+
+        @return **bool** `True` if the program was written, `False` if it was already resident
+        """
+        if isinstance(source, str):
+            with open(source) as ucfFile:
+                lines = ucfFile.read().splitlines()
+        else:
+            lines = source
+
+        ops, progHash, checks = self._compile_ucf(lines)
+
+        if not force and checks and self.get_program_hash(state_file) == progHash:
+            self._mem_bank_set(self.kEmbeddedFuncBank)
+            resident = all(self._read_byte(reg) == val for reg, val in checks.items())
+            self._mem_bank_set(self.kUserBank)
+
+            if resident:
+                self._programHash = progHash
+                return False
+
+        # The program switches banks itself, so its writes go straight to the bus
+        self._select_bank(self.kUserBank)
+        self._programHash = None
+
+        for op in ops:
+            if op[0] == "wait":
+                time.sleep(op[1] / 1000.0)
+            elif len(op[2]) == 1:
+                self._bus_call(False, self._i2c.writeByte, op[1], op[2][0])
+            else:
+                self._bus_call(False, self._i2c.write_block, op[1], list(op[2]))
+
+        self._bank = None # left wherever the program finished
+        self._mem_bank_set(self.kUserBank)
+
+        self._programHash = progHash
+        if state_file is not None:
+            with open(state_file, "w") as hashFile:
+                hashFile.write("%016x\n" % progHash)
+
+        # The program may have changed the full scale and data rate settings
+        self._sync_config_cache()
+
+        return True
+
+
+    @_locked
+    def set_accel_data_rate(self, val): 
+        """!
+        Sets the data output rate of the accelerometer
+
+        @param int val: Data rate
+
+        See the "Accelerometer section in Possible data rates" in the class definition for a list of valid arguments
+        """
+        if val < self.kXlOdrOff or val > self.kXlOdr1Hz6:
+            return
+
+        enableA, enableB = self._fsm_enable_get()
+
+        odrXl = val
+
+        if (enableA & 0xFF) or (enableB & 0xFF):
+            # Coresponds to any of the FSMs being enabled
+            fsmOdr = self._fsm_data_rate_get()
+            if fsmOdr == self.kOdrFsm12Hz5:
+                if val == self.kXlOdrOff:
+                    odrXl = self.kXlOdr12Hz5
+
+            elif fsmOdr == self.kOdrFsm26Hz:
+                if val == self.kXlOdrOff:
+                    odrXl = self.kXlOdr26Hz
+                elif val == self.kXlOdr12Hz5:
+                    odrXl = self.kXlOdr26Hz
+
+            elif fsmOdr == self.kOdrFsm52Hz:
+                if val == self.kXlOdrOff:
+                    odrXl = self.kXlOdr52Hz
+                elif val == self.kXlOdr12Hz5:
+                    odrXl = self.kXlOdr52Hz
+                elif val == self.kXlOdr26Hz:
+                    odrXl = self.kXlOdr52Hz
+
+            elif fsmOdr == self.kOdrFsm104Hz:
+                if val == self.kXlOdrOff:
+                    odrXl = self.kXlOdr104Hz
+                elif val == self.kXlOdr12Hz5:
+                    odrXl = self.kXlOdr104Hz
+                elif val == self.kXlOdr26Hz:
+                    odrXl = self.kXlOdr104Hz
+                elif val == self.kXlOdr52Hz:
+                    odrXl = self.kXlOdr104Hz
+
+        # Machine Learning Core data rate constraints:
+        mlcEnable = self._mlc_get()
+
+        if mlcEnable:
+            mlc_odr = self._mlc_data_rate_get()
+
+            if mlc_odr == self.kMlcOdr12Hz5:
+                if val == self.kXlOdrOff:
+                    odrXl = self.kXlOdr12Hz5
+                else:
+                    odrXl = val
+
+            elif mlc_odr == self.kMlcOdr26Hz:
+                if val == self.kXlOdrOff:
+                    odrXl = self.kXlOdr26Hz
+                elif val == self.kXlOdr12Hz5:
+                    odrXl = self.kXlOdr26Hz
+                else:
+                    odrXl = val
+
+            elif mlc_odr == self.kMlcOdr52Hz:
+                if val == self.kXlOdrOff:
+                    odrXl = self.kXlOdr52Hz
+                elif val == self.kXlOdr12Hz5:
+                    odrXl = self.kXlOdr52Hz
                 elif val == self.kXlOdr26Hz:
                     odrXl = self.kXlOdr52Hz
+                else:
+                    odrXl = val
+
+            elif mlc_odr == self.kMlcOdr104Hz:
+                if val == self.kXlOdrOff:
+                    odrXl = self.kXlOdr104Hz
+                elif val == self.kXlOdr12Hz5:
+                    odrXl = self.kXlOdr104Hz
+                elif val == self.kXlOdr26Hz:
+                    odrXl = self.kXlOdr104Hz
+                elif val == self.kXlOdr52Hz:
+                    odrXl = self.kXlOdr104Hz
+                else:
+                    odrXl = val
+
+            else:
+                odrXl = val
+
+        regVal = self._read_byte(self.kRegCtrl1XL)
+
+        regVal &= ~self.kCtrl1XlMaskOdr
+        regVal |= (odrXl << self.kCtrl1XlShiftOdr)
+
+        self._write_byte(self.kRegCtrl1XL, regVal)
+
+        self._odrAccel = odrXl
+
+    @_locked
+    def set_gyro_data_rate(self, val):
+        """!
+        Sets the data output rate of the gyroscope
+
+        @param int val: Data rate
+
+        See the "Gyroscope" section in Possible data rates" in the class definition for a list of valid arguments
+        """
+        if val < self.kGyroOdrOff or val > self.kGyroOdr6667Hz:
+            return
+
+        enableA, enableB = self._fsm_enable_get()
+
+        odrGy = val
+
+        if (enableA & 0xFF) or (enableB & 0xFF):
+            # Coresponds to any of the FSMs being enabled
+            fsmOdr = self._fsm_data_rate_get()
+            if fsmOdr == self.kOdrFsm12Hz5:
+                if val == self.kGyroOdrOff:
+                    odrGy = self.kGyroOdr12Hz5
+
+            elif fsmOdr == self.kOdrFsm26Hz:
+                if val == self.kGyroOdrOff:
+                    odrGy = self.kGyroOdr26Hz
+                elif val == self.kGyroOdr12Hz5:
+                    odrGy = self.kGyroOdr26Hz
+
+            elif fsmOdr == self.kOdrFsm52Hz:
+                if val == self.kGyroOdrOff:
+                    odrGy = self.kGyroOdr52Hz
+                elif val == self.kGyroOdr12Hz5:
+                    odrGy = self.kGyroOdr52Hz
+                elif val == self.kGyroOdr26Hz:
+                    odrGy = self.kGyroOdr52Hz
+
+            elif fsmOdr == self.kOdrFsm104Hz:
+                if val == self.kGyroOdrOff:
+                    odrGy = self.kGyroOdr104Hz
+                elif val == self.kGyroOdr12Hz5:
+                    odrGy = self.kGyroOdr104Hz
+                elif val == self.kGyroOdr26Hz:
+                    odrGy = self.kGyroOdr104Hz
+                elif val == self.kGyroOdr52Hz:
+                    odrGy = self.kGyroOdr104Hz
+
+        mlcEnable = self._mlc_get()
+        if mlcEnable:
+            mlc_odr = self._mlc_data_rate_get()
+            if mlc_odr == self.kMlcOdr12Hz5:
+                if val == self.kGyroOdrOff:
+                    odrGy = self.kGyroOdr12Hz5
+                else:
+                    odrGy = val
+
+            elif mlc_odr == self.kMlcOdr26Hz:
+                if val == self.kGyroOdrOff:
+                    odrGy = self.kGyroOdr26Hz
+                elif val == self.kGyroOdr12Hz5:
+                    odrGy = self.kGyroOdr26Hz
+                else:
+                    odrGy = val
+
+            elif mlc_odr == self.kMlcOdr52Hz:
+                if val == self.kGyroOdrOff:
+                    odrGy = self.kGyroOdr52Hz
+                elif val == self.kGyroOdr12Hz5:
+                    odrGy = self.kGyroOdr52Hz
+                elif val == self.kGyroOdr26Hz:
+                    odrGy = self.kGyroOdr52Hz
+                else:
+                    odrGy = val
+
+            elif mlc_odr == self.kMlcOdr104Hz:
+                if val == self.kGyroOdrOff:
+                    odrGy = self.kGyroOdr104Hz
+                elif val == self.kGyroOdr12Hz5:
+                    odrGy = self.kGyroOdr104Hz
+                elif val == self.kGyroOdr26Hz:
+                    odrGy = self.kGyroOdr104Hz
+                elif val == self.kGyroOdr52Hz:
+                    odrGy = self.kGyroOdr104Hz
+                else:
+                    odrGy = val
+
+            else:
+                odrGy = val
+
+        regVal = self._read_byte(self.kRegCtrl2G)
+
+        regVal &= ~self.kCtrl2GMaskOdr
+        regVal |= (odrGy << self.kCtrl2GShiftOdr)
+
+        self._write_byte(self.kRegCtrl2G, regVal)
+
+        self._odrGyro = odrGy
+
+
+    @_locked
+    def enable_timestamp(self, enable = True):
+        """!
+        Enables the timestamp counter.
+
+        @param bool enable: Enable or disable the timestamp counter
+        """
+        if enable != True and enable != False:
+            return
+        
+        val = self._read_byte(self.kRegCtrl10C)
+
+        val &= ~self.kCtrl10CMaskTimestampEn
+        val |= (enable << self.kCtrl10CShiftTimestampEn)
+
+        self._write_byte(self.kRegCtrl10C, val)
+    
+    @_locked
+    def reset_timestamp(self):
+        """!
+        Resets the timestamp counter
+        """
+        resetVal = 0xAA
+        self._write_byte(self.kRegTimestamp2, resetVal)
+
+        self._fifoTime = None
+
+    @_locked
+    def get_timestamp(self):
+        """!
+        Reads the timestamp counter
+
+        @return **int** The 32-bit counter value, see get_timestamp_resolution()
+        """
+        regs = self._read_block(self.kRegTimestamp0, 4)
+
+        return regs[0] | (regs[1] << 8) | (regs[2] << 16) | (regs[3] << 24)
+
+    @_locked
+    def get_timestamp_resolution(self):
+        """!
+        Gets the period of one timestamp count, using the device's INTERNAL_FREQ_FINE trim
+
+        @return **float** The timestamp resolution in seconds
+        """
+        freqFine = self._read_byte(self.kRegInternalFreqFine)
+        if freqFine > 127:
+            freqFine -= 256
+
+        return self.kTimestampLsb / (1 + self.kFreqFineStep * freqFine)
+
+    # Fifo Methods
+    @_locked
+    def set_fifo_watermark(self, val):
+        """!
+        Set the FIFO watermark level
+
+        @param int val: The watermark level. Must be between 0 and 511 (a 9-bit value)
+        """
+        if val < 0 or val > 511:
+            return
+
+        with self.transaction():
+            ctrl2Val = (val >> 8) & 0x01 # WTM8
+            ctrl1Val = val & 0xFF # WTM[7:0]
+
+            regVal = self._read_byte(self.kRegFifoCtrl2)
+
+            regVal &= ~self.kFifoCtrl2MaskWtm
+            regVal |= (ctrl2Val << self.kFifoCtrl2ShiftWtm)
+
+            self._write_byte(self.kRegFifoCtrl2, regVal)
+
+            self._write_byte(self.kRegFifoCtrl1, ctrl1Val)
+
+    @_locked
+    def set_fifo_mode(self, val):
+        """!
+        Sets the FIFO mode
+
+        @param int val: The FIFO mode
+
+        Possible values:
+            - kBypassMode
+            - kFifoMode
+            - kStreamToFifoMode
+            - kBypassToStreamMode
+            - kStreamMode
+            - kBypassToFifoMode
+        """
+        if val < self.kBypassMode or val > self.kBypassToFifoMode:
+            return
+        
+        regVal = self._read_byte(self.kRegFifoCtrl4)
+
+        regVal &= ~self.kFifoCtrl4MaskFifoMode
+        regVal |= (val << self.kFifoCtrl4ShiftFifoMode)
+
+        self._write_byte(self.kRegFifoCtrl4, regVal)
+
+        # Bypass mode empties the FIFO, so the last TIMESTAMP word read no longer applies
+        if val == self.kBypassMode:
+            self._fifoTime = None
+
+    @_locked
+    def set_accel_fifo_batch_set(self, val):
+        """!
+        Sets the batch data rate for the accelerometer
+
+        @param int val: The batch data rate
+
+        See the "Possible Accelerometer Batch Data Rates" in the class definition for a list of valid arguments
+        """
+        if val < self.kXlNotBatched or val > self.kXlBatchedAt6Hz5:
+            return
+
+        regVal = self._read_byte(self.kRegFifoCtrl3)
+
+        regVal &= ~self.kFifoCtrl3MaskBdrXl
+        regVal |= (val << self.kFifoCtrl3ShiftBdrXl)
+        
+        self._write_byte(self.kRegFifoCtrl3, regVal)
+
+
+    @_locked
+    def set_gyro_fifo_batch_set(self, val):
+        """!
+        Sets the batch data rate for the gyroscope
+
+        @param int val: The batch data rate
+
+        See the "Possible Gyroscope Batch Data Rates" in the class definition for a list of valid arguments
+        """
+        if val < self.kGyroNotBatched or val > self.kGyroBatchedAt6Hz5:
+            return
+
+        regVal = self._read_byte(self.kRegFifoCtrl3)
+
+        regVal &= ~self.kFifoCtrl3MaskBdrGy
+        regVal |= (val << self.kFifoCtrl3ShiftBdrGy)
+        
+        self._write_byte(self.kRegFifoCtrl3, regVal)
+    
+    @_locked
+    def set_temp_fifo_batch_set(self, val):
+        """!
+        Sets the temperature batch data rate for the FIFO
+
+        @param int val: The batch data rate
+
+        Possible values:
+            - kTempNotBatched
+            - kTempBatchedAt1Hz6
+            - kTempBatchedAt12Hz5
+            - kTempBatchedAt52Hz
+        """
+        if val < self.kTempNotBatched or val > self.kTempBatchedAt52Hz:
+            return
+
+        regVal = self._read_byte(self.kRegFifoCtrl4)
+
+        regVal &= ~self.kFifoCtrl4MaskOdrTBatch
+        regVal |= (val << self.kFifoCtrl4ShiftOdrTBatch)
+
+        self._write_byte(self.kRegFifoCtrl4, regVal)
+
+    @_locked
+    def set_fifo_timestamp_dec(self, val):
+        """!
+        Sets the FIFO time stamp decimation rate.
+
+        @param int val: The decimation rate
+
+        Possible values:
+            - kNoDecimation
+            - kDec1
+            - kDec8
+            - kDec32
+        """
+        if val < self.kNoDecimation or val > self.kDec32:
+            return
+        
+        regVal = self._read_byte(self.kRegFifoCtrl4)
+
+        regVal &= ~self.kFifoCtrl4MaskOdrTsBatch
+        regVal |= (val << self.kFifoCtrl4ShiftOdrTsBatch)
+
+        self._write_byte(self.kRegFifoCtrl4, regVal)
+
+    @_locked
+    def get_fifo_status(self):
+        """!
+        Gets the number of unread FIFO words and the FIFO status flags in one read
+
+        @return **tuple of int** The number of unread words, followed by the FIFO_STATUS2 value.
+            Test the flags with kFifoStatus2MaskWtmIa, kFifoStatus2MaskOvrIa,
+            kFifoStatus2MaskFullIa, kFifoStatus2MaskCounterBdrIa and kFifoStatus2MaskOvrLatched
+        """
+        regs = self._read_block(self.kRegFifoStatus1, 2)
+
+        level = regs[0] | ((regs[1] & self.kFifoStatus2MaskDiffFifo) << 8)
+
+        if self._metrics is not None:
+            with self._busLock:
+                self._metrics.update_fifo(level, regs[1] & (self.kFifoStatus2MaskOvrIa | self.kFifoStatus2MaskFullIa))
+
+        return (level, regs[1])
+
+    @_locked
+    def get_fifo_level(self):
+        """!
+        Gets the number of unread FIFO words
+
+        @return **int** The number of unread words
+        """
+        return self.get_fifo_status()[0]
+
+    @_locked
+    def read_fifo(self, words = None, buf = None):
+        """!
+        Reads FIFO words in one burst
+
+        Each word is 7 bytes: a tag byte followed by the X, Y and Z values as little endian
+        int16. When NumPy is available the raw bytes are also returned as a zero-copy
+        structured array with the fields tag, x, y and z (see split_fifo()).
+
+        @param int words: The number of words to read. Defaults to all the unread words
+        @param bytearray buf: A buffer to read into, reused between calls to avoid allocating.
+            It must hold at least the words read; it is returned as it is, so it may be longer
+
+        @return **tuple** The raw bytes followed by the structured array, or `None` instead
+            of the array if NumPy isn't installed
+        """
+        if words is None:
+            words = self.get_fifo_level()
+
+        length = words * self.kFifoWordSize
+        if buf is None:
+            buf = bytearray(length)
+        elif len(buf) < length:
+            raise ValueError("buffer too small for %d FIFO words" % words)
+
+        if length:
+            self._read_block_into(self.kRegFifoDataOutTag, buf, length)
+
+        np = _numpy()
+        if np is None:
+            return (buf, None)
+
+        return (buf, np.frombuffer(buf, dtype = _fifo_dtype(), count = words))
+
+    @_locked
+    def split_fifo(self, words):
+        """!
+        Demultiplexes FIFO words by tag without looping over them in Python. Requires NumPy
+
+        @param words: The structured array returned by read_fifo()
+
+        @return **tuple** Nx3 int16 arrays of the raw accelerometer and gyroscope samples in
+            FIFO order, followed by a structured array of every other word
+        """
+        tags = words["tag"] >> self.kFifoTagShift
+        accel = tags == self.kFifoTagAccel
+        gyro = tags == self.kFifoTagGyro
+
+        # A strided view of the three axes of every word, the boolean selections then copy
+        # out contiguous Nx3 arrays
+        xyz = _fifo_columns(words, "<i2", 3)
+
+        if self._metrics is not None:
+            self._metrics.count_samples(True, int(accel.sum()))
+            self._metrics.count_samples(False, int(gyro.sum()))
+
+        return (xyz[accel], xyz[gyro], words[~(accel | gyro)])
+
+    @_locked
+    def decode_fifo(self, words):
+        """!
+        Demultiplexes FIFO words by tag and attaches timestamps, without looping over them in
+        Python. Requires NumPy
+
+        Each accelerometer, gyroscope and temperature sample gets the time of the most recent
+        TIMESTAMP word before it, carried over from earlier reads, so enable the timestamp
+        counter and set_fifo_timestamp_dec() to get times in-band. Samples read before the first
+        TIMESTAMP word have time -1. Temperature is batched with set_temp_fifo_batch_set().
+
+        @param words: The structured array returned by read_fifo()
+
+        @return **IsmFifoData** The decoded samples
+        """
+        np = _numpy()
+        out = IsmFifoData()
+
+        tags = words["tag"] >> self.kFifoTagShift
+        accel = tags == self.kFifoTagAccel
+        gyro = tags == self.kFifoTagGyro
+        temp = tags == self.kFifoTagTemp
+        stamp = tags == self.kFifoTagTimestamp
+
+        xyz = _fifo_columns(words, "<i2", 3)
+
+        # TIMESTAMP words carry the 32-bit counter in their first 4 data bytes
+        ticks = _fifo_columns(words, "<u4", 1)[:, 0]
+
+        # Forward fill: the index of the latest TIMESTAMP word at or before each word
+        latest = np.maximum.accumulate(np.where(stamp, np.arange(len(words)), -1))
+        carried = -1 if self._fifoTime is None else self._fifoTime
+        times = np.where(latest >= 0, ticks[np.maximum(latest, 0)].astype(np.int64), carried)
+
+        out.accel = xyz[accel]
+        out.accelTime = times[accel]
+        out.gyro = xyz[gyro]
+        out.gyroTime = times[gyro]
+        out.temp = words["x"][temp]
+        out.tempTime = times[temp]
+        out.timestamps = ticks[stamp].astype(np.int64)
+        out.other = words[~(accel | gyro | temp | stamp)]
+
+        if len(out.timestamps):
+            self._fifoTime = int(out.timestamps[-1])
+
+        if self._metrics is not None:
+            self._metrics.count_samples(True, len(out.accel))
+            self._metrics.count_samples(False, len(out.gyro))
+
+        return out
+
+    @_locked
+    def set_batch_counter_threshold(self, val):
+        """!
+        Sets the batch counter threshold. COUNTER_BDR_IA is raised each time the counter
+        reaches it, see set_batch_counter_int1()
+
+        @param int val: The number of batched samples of the trigger sensor (0 - 2047)
+
+        @return **bool** `True` if the threshold was set, `False` if it's out of range
+        """
+        if val < 0 or val > self.kCntBdrThMax:
+            return False
+
+        with self.transaction():
+            regVal = self._read_byte(self.kRegCntrBdr1)
+
+            regVal &= ~self.kCntrBdr1MaskCntBdrTh
+            regVal |= ((val >> 8) << self.kCntrBdr1ShiftCntBdrTh)
+
+            self._write_byte(self.kRegCntrBdr1, regVal)
+            self._write_byte(self.kRegCntrBdr2, val & 0xFF)
+
+        return True
+
+    @_locked
+    def get_batch_counter_threshold(self):
+        """!
+        Gets the batch counter threshold
+
+        @return **int** The threshold
+        """
+        regs = self._read_block(self.kRegCntrBdr1, 2)
+
+        return (((regs[0] & self.kCntrBdr1MaskCntBdrTh) >> self.kCntrBdr1ShiftCntBdrTh) << 8) | regs[1]
+
+    @_locked
+    def set_batch_counter_trigger(self, val):
+        """!
+        Sets which sensor's batched samples the batch counter counts
+
+        @param int val: The trigger sensor
+
+        Possible values:
+            - kCounterTrigXl
+            - kCounterTrigGyro
+        """
+        if val != self.kCounterTrigXl and val != self.kCounterTrigGyro:
+            return
+
+        regVal = self._read_byte(self.kRegCntrBdr1)
+
+        regVal &= ~self.kCntrBdr1MaskTrigCounterBdr
+        regVal |= (val << self.kCntrBdr1ShiftTrigCounterBdr)
+
+        self._write_byte(self.kRegCntrBdr1, regVal)
+
+    @_locked
+    def reset_batch_counter(self):
+        """!
+        Resets the batch counter. The reset bit clears itself
+        """
+        regVal = self._read_byte(self.kRegCntrBdr1)
+
+        regVal |= self.kCntrBdr1MaskRstCounterBdr
+
+        self._write_byte(self.kRegCntrBdr1, regVal)
+
+    @_locked
+    def get_batch_counter_flag(self):
+        """!
+        Checks whether the batch counter reached its threshold since the FIFO status was last
+        read. The counter value itself can't be read from the device; reading the flag clears it
+
+        @return **bool** `True` if the threshold was reached
+        """
+        return (self.get_fifo_status()[1] & self.kFifoStatus2MaskCounterBdrIa) != 0
+
+    # Interrupt and pin mode settings
+    @_locked
+    def set_pin_mode(self, activeLow):
+        """!
+        Sets the active state of the interrupt pin - high or low.
+
+        @param bool activeLow: Set to `True` for active low, `False` for active high
+        """
+        if activeLow != True and activeLow != False:
+            return
+
+        regVal = self._read_byte(self.kRegCtrl3C)
+
+        regVal &= ~self.kCtrl3CMaskHlActive
+        regVal |= (activeLow << self.kCtrl3CShiftHlActive)
+
+        if activeLow:
+            # pinmode must be set to push-pull when active low is set.
+            # See section 9.14 on pg 51 of datasheet for more information
+            regVal &= ~self.kCtrl3CMaskPpOd
+
+        self._write_byte(self.kRegCtrl3C, regVal)
+
+    @_locked
+    def set_int_notification(self, val):
+        """!
+        Sets what triggers an interrupt
+
+        @param int val: The interrupt event type
+
+        Possible Values:
+            - kAllIntPulsed
+            - kBaseLatchedEmbPulsed
+            - kBasePulsedEmbLatched
+            - kAllIntLatched
+        """
+        if val < self.kAllIntPulsed or val > self.kAllIntLatched:
+            return
+
+        with self.transaction():
+            lir = val & 0x01
+            intClrOnRead = val & 0x01
+
+            # Set necessary values in the tap config register
+            regVal = self._read_byte(self.kRegTapCfg0)
+
+            regVal &= ~(self.kTapCfg0MaskLir | self.kTapCfg0MaskIntClrOnRead)
+            regVal |= (lir << self.kTapCfg0ShiftLir)
+            regVal |= (intClrOnRead << self.kTapCfg0ShiftIntClrOnRead)
+
+            self._write_byte(self.kRegTapCfg0, regVal)
+
+            # Set necessary values in the Page RW register
+            self._mem_bank_set(self.kEmbeddedFuncBank)
+
+            regVal = self._read_byte(self.kRegPageRw)
+
+            embFuncLir = (val & 0x02) >> 1
+            regVal &= ~self.kPageRwMaskEmbFuncLir
+            regVal |= (embFuncLir << self.kPageRwShiftEmbFuncLir)
+
+            self._write_byte(self.kRegPageRw, regVal)
+
+            self._mem_bank_set(self.kUserBank)
+
+    class _PinIntRoute:
+        """!
+        The routing information for an interrupt pin
+        """
+        def __init__(self):
+            self.int_ctrl = 0
+            self.md_cfg = 0
+            self.emb_func_int = 0
+            self.fsm_int_a = 0
+            self.fsm_int_b = 0
+            self.mlc_int = 0
+
+    def _pin_int1_route_get(self):
+        """!
+        Get the routing information from registers INT1_CTRL, MD1_CFG,
+        EMB_FUNC_INT1, FSM_INT1_A, FSM_INT1_B
+
+        @return **PinIntRoute** The routing information
+        """
+        route = self._PinIntRoute()
+
+        self._mem_bank_set(self.kEmbeddedFuncBank)
+
+        # EMB_FUNC_INT1, FSM_INT1_A, FSM_INT1_B and MLC_INT1 are consecutive
+        regs = self._read_block(self.kRegEmbFuncInt1, 4)
+        route.emb_func_int, route.fsm_int_a, route.fsm_int_b, route.mlc_int = regs[0], regs[1], regs[2], regs[3]
+
+        self._mem_bank_set(self.kUserBank)
+        
+        route.int_ctrl = self._read_byte(self.kRegInt1Ctrl)
+        route.md_cfg = self._read_byte(self.kRegMd1Cfg)
+
+        return route
+
+    def _pin_int2_route_get(self):
+        """!
+        Get the routing information from registers INT2_CTRL,  MD2_CFG,
+        EMB_FUNC_INT2, FSM_INT2_A, FSM_INT2_B
+
+        @return **PinIntRoute** The routing information
+        """
+        route = self._PinIntRoute()
+
+        self._mem_bank_set(self.kEmbeddedFuncBank)
+
+        # EMB_FUNC_INT2, FSM_INT2_A, FSM_INT2_B and MLC_INT2 are consecutive
+        regs = self._read_block(self.kRegEmbFunInt2, 4)
+        route.emb_func_int, route.fsm_int_a, route.fsm_int_b, route.mlc_int = regs[0], regs[1], regs[2], regs[3]
+
+        self._mem_bank_set(self.kUserBank)
+        
+        route.int_ctrl = self._read_byte(self.kRegInt2Ctrl)
+        route.md_cfg = self._read_byte(self.kRegMd2Cfg)
+
+        return route
+    
+    def _pin_int1_route_set(self, val):
+        """!
+        Set the routing information to registers INT1_CTRL, MD1_CFG,
+        EMB_FUNC_INT1, FSM_INT1_A, FSM_INT1_B
+
+        @param PinIntRoute val: The routing information
+        """
+        with self.transaction():
+            self._mem_bank_set(self.kEmbeddedFuncBank)
+
+            self._write_byte(self.kRegMlcInt1, val.mlc_int)
+            self._write_byte(self.kRegEmbFuncInt1, val.emb_func_int)
+            self._write_byte(self.kRegFsmInt1A, val.fsm_int_a)
+            self._write_byte(self.kRegFsmInt1B, val.fsm_int_b)
+
+            self._mem_bank_set(self.kUserBank)
+
+            embFunEn = (
+                (val.emb_func_int & self.kEmbFuncInt1MaskFsmLc) or
+                (val.emb_func_int & self.kEmbFuncInt1MaskSigMot) or
+                (val.emb_func_int & self.kEmbFuncInt1MaskTilt) or
+                (val.emb_func_int & self.kEmbFuncInt1MaskStepDetector)
+            )
+
+            if embFunEn or (val.fsm_int_a) or (val.fsm_int_b) or (val.mlc_int):
+                val.md_cfg |= self.kMd1CfgMaskInt1EmbFunc
+            else:
+                val.md_cfg &= ~self.kMd1CfgMaskInt1EmbFunc
+
+            self._write_byte(self.kRegInt1Ctrl, val.int_ctrl)
+            self._write_byte(self.kRegMd1Cfg, val.md_cfg)
+
+            tapCfg2 = self._read_byte(self.kRegTapCfg2)
+
+            intsEnable = (
+                (val.md_cfg & self.kMd1CfgMaskInt1Shub) or
+                (val.md_cfg & self.kMd1CfgMaskInt16d) or
+                (val.md_cfg & self.kMd1CfgMaskInt1DoubleTap) or
+                (val.md_cfg & self.kMd1CfgMaskInt1Ff) or
+                (val.md_cfg & self.kMd1CfgMaskInt1Wu) or
+                (val.md_cfg & self.kMd1CfgMaskInt1SingleTap) or
+                (val.md_cfg & self.kMd1CfgMaskInt1SleepChange)
+            )
+
+            if intsEnable or val.int_ctrl or self._inactMode is not None:
+                tapCfg2 |= self.kTapCfg2MaskInterruptsEnable
+            else:
+                tapCfg2 &= ~self.kTapCfg2MaskInterruptsEnable
+
+            self._write_byte(self.kRegTapCfg2, tapCfg2)
+
+    def _pin_int2_route_set(self, val):
+        """!
+        Select the signal that needs to route on the int2 pad
+
+        @param PinIntRoute val: The routing information
+        """
+        with self.transaction():
+            self._mem_bank_set(self.kEmbeddedFuncBank)
+
+            self._write_byte(self.kRegMlcInt2, val.mlc_int)
+            self._write_byte(self.kRegEmbFunInt2, val.emb_func_int)
+            self._write_byte(self.kRegFsmInt2A, val.fsm_int_a)
+            self._write_byte(self.kRegFsmInt2B, val.fsm_int_b)
+
+            self._mem_bank_set(self.kUserBank)
+
+            embFunEn = (
+                (val.emb_func_int & self.kEmbFuncInt2MaskFsmLc) or
+                (val.emb_func_int & self.kEmbFuncInt2MaskSigMot) or
+                (val.emb_func_int & self.kEmbFuncInt2MaskTilt) or
+                (val.emb_func_int & self.kEmbFuncInt2MaskStepDetector)
+            )
+
+            if embFunEn or (val.fsm_int_a) or (val.fsm_int_b) or (val.mlc_int):
+                val.md_cfg |= self.kMd2CfgMaskInt2EmbFunc
+            else:
+                val.md_cfg &= ~self.kMd2CfgMaskInt2EmbFunc
+
+            self._write_byte(self.kRegInt2Ctrl, val.int_ctrl)
+            self._write_byte(self.kRegMd2Cfg, val.md_cfg)
+
+            tapCfg2 = self._read_byte(self.kRegTapCfg2)
+
+            intCtrlEn = (
+                (val.int_ctrl & self.kInt2CtrlMaskInt2DrdyXl) or
+                (val.int_ctrl & self.kInt2CtrlMaskInt2DrdyG) or
+                (val.int_ctrl & self.kInt2CtrlMaskInt2DrdyTemp) or
+                (val.int_ctrl & self.kInt2CtrlMaskInt2FifoTh) or
+                (val.int_ctrl & self.kInt2CtrlMaskInt2FifoOvr) or
+                (val.int_ctrl & self.kInt2CtrlMaskInt2FifoFull) or
+                (val.int_ctrl & self.kInt2CtrlMaskInt2CntBdr)
+            )
+
+            md2CfgEn = (
+                (val.md_cfg & self.kMd2CfgMaskInt26d) or
+                (val.md_cfg & self.kMd2CfgMaskInt2DoubleTap) or
+                (val.md_cfg & self.kMd2CfgMaskInt2Ff) or
+                (val.md_cfg & self.kMd2CfgMaskInt2Wu) or
+                (val.md_cfg & self.kMd2CfgMaskInt2SingleTap) or
+                (val.md_cfg & self.kMd2CfgMaskInt2SleepChange)
+            )
+
+            if intCtrlEn or md2CfgEn or self._inactMode is not None:
+                tapCfg2 |= self.kTapCfg2MaskInterruptsEnable
+            else:
+                tapCfg2 &= ~self.kTapCfg2MaskInterruptsEnable
+
+            self._write_byte(self.kRegTapCfg2, tapCfg2)
+
+        
+    @_locked
+    def set_accel_status_to_int1(self, enable = True):
+        """!
+        Sends the accelerometer's data ready signal to interrupt one.
+
+        @param bool enable: Enable or disable the accelerometer status to the interrupt pin
+        """
+        if enable != True and enable != False:
+            return
+
+        route = self._pin_int1_route_get()
+
+        route.int_ctrl &= ~self.kInt1CtrlMaskInt1DrdyXl
+        route.int_ctrl |= (enable << self.kInt1CtrlShiftInt1DrdyXl)
+
+        self._pin_int1_route_set(route)
+    
+
+    @_locked
+    def set_fifo_threshold_int1(self, enable = True):
+        """!
+        Sends the accelerometer's data ready signal to interrupt one.
+
+        @param bool enable: Enable or disable the accelerometer status to the interrupt pin
+        """
+        if enable != True and enable != False:
+            return
+
+        route = self._pin_int1_route_get()
+
+        route.int_ctrl &= ~self.kInt1CtrlMaskInt1FifoTh
+        route.int_ctrl |= (enable << self.kInt1CtrlShiftInt1FifoTh)
+
+        self._pin_int1_route_set(route)
+
+    @_locked
+    def set_batch_counter_int1(self, enable = True):
+        """!
+        Sends the accelerometer's data ready signal to interrupt one.
+
+        @param bool enable: Enable or disable the accelerometer status to the interrupt pin
+        """
+        if enable != True and enable != False:
+            return
+
+        route = self._pin_int1_route_get()
+
+        route.int_ctrl &= ~self.kInt1CtrlMaskInt1CntBdr
+        route.int_ctrl |= (enable << self.kInt1CtrlShiftInt1CntBdr)
+
+        self._pin_int1_route_set(route)
+
+    @_locked
+    def set_accel_status_to_int2(self, enable = True):
+        """!
+        Sends the accelerometer's data ready signal to interrupt two.
+
+        @param bool enable: Enable or disable the accelerometer status to the interrupt pin
+        """
+        if enable != True and enable != False:
+            return
+        
+        route = self._pin_int2_route_get()
+
+        route.int_ctrl &= ~self.kInt2CtrlMaskInt2DrdyXl
+        route.int_ctrl |= (enable << self.kInt2CtrlShiftInt2DrdyXl)
+
+        self._pin_int2_route_set(route)
+    
+    @_locked
+    def set_gyro_status_to_int1(self, enable = True):
+        """!
+        Sends the gyroscope's data ready signal to interrupt one.
+
+        @param bool enable: Enable or disable the gyroscope status to the interrupt pin
+        """
+        if enable != True and enable != False:
+            return
+        
+        route = self._pin_int1_route_get()
+
+        route.int_ctrl &= ~self.kInt1CtrlMaskInt1DrdyG
+        route.int_ctrl |= (enable << self.kInt1CtrlShiftInt1DrdyG)
+
+        self._pin_int1_route_set(route)
+
+    @_locked
+    def set_gyro_status_to_int2(self, enable = True):
+        """!
+        Sends the gyroscope's data ready signal to interrupt two.
+
+        @param bool enable: Enable or disable the gyroscope status to the interrupt pin
+        """
+        if enable != True and enable != False:
+            return
+        
+        route = self._pin_int2_route_get()
+
+        route.int_ctrl &= ~self.kInt2CtrlMaskInt2DrdyG
+        route.int_ctrl |= (enable << self.kInt2CtrlShiftInt2DrdyG)
+
+        self._pin_int2_route_set(route)
+
+    @_locked
+    def set_batch_counter_int2(self, enable = True):
+        """!
+        Sends the batch counter threshold event to interrupt two.
+
+        @param bool enable: Enable or disable the batch counter event to the interrupt pin
+        """
+        if enable != True and enable != False:
+            return
+
+        route = self._pin_int2_route_get()
+
+        route.int_ctrl &= ~self.kInt2CtrlMaskInt2CntBdr
+        route.int_ctrl |= (enable << self.kInt2CtrlShiftInt2CntBdr)
+
+        self._pin_int2_route_set(route)
+
+    @_locked
+    def set_data_ready_mode(self, val):
+        """!
+        Sets how the data ready signal is latched i.e. only return zero after interface reading
+        OR is pulsed.
+
+        @param int val: The data ready mode.
+
+        Possible values:
+            - kDrdyLatched
+            - kDrdyPulsed
+        """
+        if val < self.kDrdyLatched or val > self.kDrdyPulsed:
+            return
+
+        regVal = self._read_byte(self.kRegCntrBdr1)
+
+        regVal &= ~self.kCntrBdr1MaskDatareadyPulsed
+        regVal |= (val << self.kCntrBdr1ShiftDatareadyPulsed)
+
+        self._write_byte(self.kRegCntrBdr1, regVal)
+    
+    @_locked
+    def set_hub_odr(self, rate):
+        """!
+        Sets the output data rate for the sensor hub.
+
+        @param int rate: The output data rate
+
+        Possible values:
+            - kShOdr104Hz
+            - kShOdr52Hz
+            - kShOdr26Hz
+            - kShOdr13Hz
+        """
+        if rate < self.kShOdr104Hz or rate > self.kShOdr13Hz:
+            return
+        
+        self._mem_bank_set(self.kSensorHubBank)
+
+        regVal = self._read_byte(self.kRegSlv0Config)
+
+        regVal &= ~self.kSlv0ConfigMaskShubOdr
+        regVal |= (rate << self.kSlv0ConfigShiftShubOdr)
+
+        self._write_byte(self.kRegSlv0Config, regVal)
+
+        self._mem_bank_set(self.kUserBank)
+
+
+    @_locked
+    def set_hub_sensor_read(self, sensor, address, subAddress, lenData):
+        """!
+        Sets the general sensor hub settings, which sensor and their I2C address and register
+        to read.
+
+        @param int sensor: The sensor to read from
+        @param int address: The I2C address of the sensor
+        @param int subAddress: The register address of the sensor
+        @param int lenData: The length of data to read from the sensor
+        """
+        if sensor < 0 or sensor > 3:
+            return
+
+        if sensor == 0:
+            slvAddReg = self.kRegSlv0Add
+            slvSubaddReg = self.kRegSlv0Subadd
+            slvConfigReg = self.kRegSlv0Config
+        elif sensor == 1:
+            slvAddReg = self.kRegSlv1Add
+            slvSubaddReg = self.kRegSlv1Subadd
+            slvConfigReg = self.kRegSlv1Config
+        elif sensor == 2:
+            slvAddReg = self.kRegSlv2Add
+            slvSubaddReg = self.kRegSlv2Subadd
+            slvConfigReg = self.kRegSlv2Config
+        elif sensor == 3:
+            slvAddReg = self.kRegSlv3Add
+            slvSubaddReg = self.kRegSlv3Subadd
+            slvConfigReg = self.kRegSlv3Config
+
+
+        with self.transaction():
+            self._mem_bank_set(self.kSensorHubBank)
+
+            # TODO: okay to use slave0 vals for all of this masking since bit pos are the same for all 3 slaves. 
+            #       the vendor API explicitly has a different function for each slave, so we might want to switch to that way,
+            #       but it creates a lot of duplicated code
+            slvAddVal = (address >> 1) << self.kSlv0AddShiftSlave0
+            slvAddVal |= self.kSlv0AddMaskRw0 
+
+            self._write_byte(slvAddReg, slvAddVal)
+
+            self._write_byte(slvSubaddReg, subAddress)
+
+            slvConfigRead = self._read_byte(slvConfigReg)
+
+            slvConfigRead &= ~self.kSlv0ConfigMaskSlave0Numop
+            slvConfigRead |= (lenData << self.kSlv0ConfigShiftSlave0Numop)
+
+            self._write_byte(slvConfigReg, slvConfigRead)
+
+            self._mem_bank_set(self.kUserBank)
+
+    @_locked
+    def set_hub_sensor_write(self, address, subAddress, data):
+        """!
+        Gives settings to the 6DoF to write to an external sensor.
+
+        @param int address: The I2C address of the sensor
+        @param int subAddress: The register address of the sensor
+        @param int data: The single byte data to write to the sensor
+        """
+        
+        if data < 0 or data > 255:
+            return
+
+        with self.transaction():
+            self._mem_bank_set(self.kSensorHubBank)
+
+            slv0AddVal = (address >> 1) << self.kSlv0AddShiftSlave0
+            slv0AddVal &= ~self.kSlv0AddMaskRw0
+
+            self._write_byte(self.kRegSlv0Add, slv0AddVal)
+
+            self._write_byte(self.kRegSlv0Subadd, subAddress)
+
+            self._write_byte(self.kRegDatawriteSlv0, data)
+
+            self._mem_bank_set(self.kUserBank)
+
+    @_locked
+    def set_number_hub_sensors(self, highestSlave):
+        """!
+        Sets the number of sensors that the sensor hub will read from.
+
+        @param int highestSlave: The highest sensor number to read from (0-3)
+
+        For example, if highest slave is set to 2, the sensor hub will read from sensors 0, 1, and 2.
+        """
+        if highestSlave < 0 or highestSlave > 3:
+            return
+        
+        self._mem_bank_set(self.kSensorHubBank)
+
+        masterConfig = self._read_byte(self.kRegMasterConfig)
+
+        masterConfig &= ~self.kMasterConfigMaskAuxSensOn
+        masterConfig |= (highestSlave << self.kMasterConfigShiftAuxSensOn)
+
+        self._write_byte(self.kRegMasterConfig, masterConfig)
+
+        self._mem_bank_set(self.kUserBank)
+
+    @_locked
+    def enable_sensor_i2c(self, enable = True):
+        """!
+        Enables the 6DoF as an I2C sensor controller
+
+        @param bool enable: Enable or disable the sensor I2C controller
+        """
+
+        if enable != 1 and enable != 0:
+            return
+
+        self._mem_bank_set(self.kSensorHubBank)
+
+        masterConfig = self._read_byte(self.kRegMasterConfig)
+
+        masterConfig &= ~self.kMasterConfigMaskMasterOn
+        masterConfig |= (enable << self.kMasterConfigShiftMasterOn)
+
+        self._write_byte(self.kRegMasterConfig, masterConfig)
+
+        self._mem_bank_set(self.kUserBank)
+
+    @_locked
+    def read_peripheral_sensor(self, len):
+        """!
+        Read external sensor data from the sensor hub
+
+        @param int len: The number of bytes to read from the sensor
+
+        @return **list** The data read from the sensor
+        """
+
+        self._mem_bank_set(self.kSensorHubBank)
+
+        data = list(self._read_block(self.kRegSensorHub1, len))
+
+        self._mem_bank_set(self.kUserBank)
+
+        return data
+
+    def _sh_status_get(self): 
+        """!
+        Read the sensor hub source register
+
+        @return **int** The status of the sensor hub
+        """
+
+        self._mem_bank_set(self.kSensorHubBank)
+
+        status = self._read_byte(self.kRegStatusMaster)
+
+        self._mem_bank_set(self.kUserBank)
+
+        return status
+
+
+    @_locked
+    def get_hub_status(self):
+        """!
+        Checks whether communication with the external sensor has concluded.
+
+        @return **bool** Whether communication has ended or not
+        """
+        status = self._sh_status_get()
+
+        if status & self.kStatusMasterMaskSensHubEndop:
+            return True
+        
+        return False
+    
+    @_locked
+    def get_external_sensor_nack(self, sensor):
+        """!
+        Get the NACK status of the external sensor
+
+        @param int sensor: The sensor to check
+        """
+        status = self._sh_status_get()
+        
+        if sensor == 0:
+            return status & self.kStatusMasterMaskSlave0Nack
+        elif sensor == 1:
+            return status & self.kStatusMasterMaskSlave1Nack
+        elif sensor == 2:
+            return status & self.kStatusMasterMaskSlave2Nack
+        elif sensor == 3:
+            return status & self.kStatusMasterMaskSlave3Nack
+        
+        return False
+
+    @_locked
+    def read_mmc_magnetometer(self, len):
+        """!
+        Read data from the MMC magnetometer
+
+        @param int len: The number of bytes to read from the magnetometer
+
+        @return **list** The data read from the magnetometer
+        """
+        return self.read_peripheral_sensor(len)
+    
+    @_locked
+    def set_hub_write_mode(self, config):
+        """!
+        Sets how often the 6DoF should write to the external sensor: once per cycle i.e. output
+        data rate, or just once.
+
+        @param int config: The write mode
+
+        Possible values:
+            - kHubWriteModeSingle
+            - kHubWriteModeCycle
+        """
+        if config not in [self.kHubWriteModeSingle, self.kHubWriteModeCycle]:
+            return
+        
+        self._mem_bank_set(self.kSensorHubBank)
+
+        masterConfig = self._read_byte(self.kRegMasterConfig)
+        masterConfig &= ~self.kMasterConfigMaskWriteOnce
+        masterConfig |= (config << self.kMasterConfigShiftWriteOnce)
+        self._write_byte(self.kRegMasterConfig, masterConfig)
+
+        self._mem_bank_set(self.kUserBank)
+
+    @_locked
+    def set_hub_pass_through(self, enable = True):
+        """!
+        Allows the primary I2C data lines to communicate through the auxiliary I2C lines.
+
+        @param bool enable: Enable or disable the pass through
+        """
+
+        self._mem_bank_set(self.kSensorHubBank)
+
+        masterConfig = self._read_byte(self.kRegMasterConfig)
+        masterConfig &= ~self.kMasterConfigShiftPassThroughMode
+        masterConfig |= (enable << self.kMasterConfigShiftPassThroughMode)
+        self._write_byte(self.kRegMasterConfig, masterConfig)
+
+        self._mem_bank_set(self.kUserBank)
+
+    @_locked
+    def set_hub_fifo_batching(self, enable = True):
+        """!
+        Sets sensor hub FIFO batching
+
+        @param bool enable: Enable or disable the FIFO batching
+        """
+        if enable != 1 and enable != 0:
+            return
+
+        self._mem_bank_set(self.kSensorHubBank)
+
+        slv0Config = self._read_byte(self.kRegSlv0Config)
+
+        slv0Config &= ~self.kSlv0ConfigMaskBatchExtSens0En
+        slv0Config |= (enable << self.kSlv0ConfigShiftBatchExtSens0En)
+
+        self._write_byte(self.kRegSlv0Config, slv0Config)
+
+        self._mem_bank_set(self.kUserBank)
+
+
+    @_locked
+    def set_hub_pull_ups(self, enable = True):
+        """!
+        Enables/Disables internal pullups on SDX/SCX lines
+
+        @param bool enable: Enable or disable the pullups
+        """
+        if enable != 1 and enable != 0:
+            return
+        
+        self._mem_bank_set(self.kSensorHubBank)
+
+        masterConfig = self._read_byte(self.kRegMasterConfig)
+        masterConfig &= ~self.kMasterConfigMaskShubPuEn
+        masterConfig |= (enable << self.kMasterConfigShiftShubPuEn)
+        self._write_byte(self.kRegMasterConfig, masterConfig)
+
+        self._mem_bank_set(self.kUserBank)
+
+    @_locked
+    def reset_sensor_hub(self):
+        """!
+        Resets all settings in the "Master Config" register
+        """
+        self._mem_bank_set(self.kSensorHubBank)
+
+        masterConfig = self._read_byte(self.kRegMasterConfig)
+        masterConfig |= self.kMasterConfigMaskRstMasterRegs
+        self._write_byte(self.kRegMasterConfig, masterConfig)
+        masterConfig &= ~self.kMasterConfigMaskRstMasterRegs
+        self._write_byte(self.kRegMasterConfig, masterConfig)
+
+        self._mem_bank_set(self.kUserBank)
+
+
+    # Self Test Functions
+    @_locked
+    def setAccelSelfTest(self, val):
+        """!
+        Linear acceleration sensor self-test enable.
+
+        @param int val: Change the values of st_xl in reg CTRL5_C
+
+        Possible values:
+            - kSelfTestDisable
+            - kSelfTestPositive
+            - kSelfTestNegative
+        """
+        if val not in [self.kSelfTestDisable, self.kSelfTestPositive, self.kSelfTestNegative]:
+            return
+        
+        regVal = self._read_byte(self.kRegCtrl5C)
+
+        regVal &= ~self.kCtrl5CMaskStXl
+        regVal |= (val << self.kCtrl5CShiftStXl)
+
+        self._write_byte(self.kRegCtrl5C, regVal)
+
+    @_locked
+    def setGyroSelfTest(self, val):
+        """!
+        Angular rate sensor self-test enable
+
+        @param int val: Change the values of st_g in reg CTRL5_C
+
+        Possible values:
+            - kSelfTestDisable
+            - kSelfTestPositive
+            - kSelfTestNegative
+        """
+        if val not in [self.kSelfTestDisable, self.kSelfTestPositive, self.kSelfTestNegative]:
+            return
+        
+        regVal = self._read_byte(self.kRegCtrl5C)
+
+        regVal &= ~self.kCtrl5CMaskStG
+        regVal |= (val << self.kCtrl5CShiftStG)
+
+        self._write_byte(self.kRegCtrl5C, regVal)
+
+    # Status Checking Functions
+
+    @_locked
+    def check_status(self):
+        """!
+        Checks if data is ready for both the acclerometer and the gyroscope
+
+        @return **bool** If data is ready for both sensors
+        """
+        status = self._read_byte(self.kRegStatus)
+
+        if status & self.kStatusMaskXlda and status & self.kStatusMaskGda:
+            return True
+        
+        return False
+    
+    @_locked
+    def check_accel_status(self):
+        """!
+        Checks if data is ready for the accelerometer
+
+        @return **bool** If data is ready for the accelerometer
+        """
+        status = self._read_byte(self.kRegStatus)
+
+        if status & self.kStatusMaskXlda:
+            return True
+        
+        return False
+    
+    @_locked
+    def check_gyro_status(self):
+        """!
+        Checks if data is ready for the gyroscope
+        """
+        status = self._read_byte(self.kRegStatus)
+
+        if status & self.kStatusMaskGda:
+            return True
+        
+        return False
+    
+    @_locked
+    def check_temp_status(self):
+        """!
+        Checks if data is ready for the temperature sensor
+        """
+        status = self._read_byte(self.kRegStatus)
+
+        if status & self.kStatusMaskTda:
+            return True
+        
+        return False
+
+    def _data_period(self, sensors):
+        """!
+        Get the time between samples of the slowest of the requested sensors. Not to be used outside this module
+
+        @param int sensors: STATUS_REG mask of the sensors being waited on
+
+        @return **float** The sample period in seconds, or `None` if a requested sensor is powered down
+        """
+        xlHz, gyHz = self._effective_odr()
+
+        rates = []
+        if sensors & self.kStatusMaskXlda:
+            rates.append(xlHz)
+        if sensors & self.kStatusMaskGda:
+            rates.append(gyHz)
+        if sensors & self.kStatusMaskTda:
+            rates.append(self.kTempOdrHz)
+
+        if not rates or min(rates) == 0:
+            return None
+
+        return 1.0 / min(rates)
+
+    def _effective_odr(self):
+        """!
+        Get the accelerometer and gyroscope data rates currently in effect, following the
+        inactivity state when power management is enabled. Not to be used outside this module
+
+        @return **tuple of float** The accelerometer and gyroscope rates in Hz, 0 if powered down
+        """
+        if self._odrAccel is None or self._odrGyro is None:
+            self._sync_config_cache()
+
+        xlHz = self.kXlOdrHz[self._odrAccel] if self._odrAccel < len(self.kXlOdrHz) else 0
+        gyHz = self.kGyroOdrHz[self._odrGyro] if self._odrGyro < len(self.kGyroOdrHz) else 0
+
+        if self._inactive:
+            xlHz = min(xlHz, self.kXlOdrHz[self.kXlOdr12Hz5])
+            if self._inactMode != self.kInactXl12Hz5:
+                gyHz = 0
+
+        return (xlHz, gyHz)
+
+    def _default_sensors(self):
+        """!
+        The sensors wait_for_data() waits for by default: the accelerometer, and the gyroscope
+        unless it's asleep during inactivity. Not to be used outside this module
+        """
+        if self._inactive and self._effective_odr()[1] == 0:
+            return self.kStatusMaskXlda
+
+        return self.kStatusMaskXlda | self.kStatusMaskGda
+
+    def wait_for_data(self, timeout = 1.0, sensors = None):
+        """!
+        Waits until new data is ready, sleeping until just before the next sample is due based
+        on the configured data rates and then polling the status register
+
+        With power management enabled (see set_activity_power_management()) the wait follows
+        the data rates in effect: data that is late at the active rates triggers a check of the
+        sleep state, and while inactive every sample does, so the wait adapts as the device
+        drops to and leaves its low-power rates.
+
+        @param float timeout: The maximum time to wait in seconds
+        @param int sensors: STATUS_REG mask of the sensors to wait for. Any combination of
+            kStatusMaskXlda, kStatusMaskGda and kStatusMaskTda. Defaults to the accelerometer and
+            gyroscope, or just the accelerometer while the gyroscope sleeps during inactivity
+
+        @return **int** The number of status polls needed, or 0 if the timeout expired first
+        """
+        useDefault = sensors is None
+
+        now = _monotonic()
+        deadline = now + timeout
+
+        with self._lock:
+            if useDefault:
+                sensors = self._default_sensors()
+            period = self._data_period(sensors)
+
+        if period is None:
+            pollInterval = 0.001
+        else:
+            pollInterval = max(period / 50, 0.0001)
+
+            if self._lastDataTime is not None:
+                # Wake up slightly ahead of the expected sample so that it's caught with a short spin
+                wakeTime = min(self._lastDataTime + period * 0.9, deadline)
+                if wakeTime > now:
+                    time.sleep(wakeTime - now)
+
+        # When data is this late at the active rates, the device may have gone to sleep
+        checkTime = None
+        if self._inactMode is not None and period is not None:
+            checkTime = (now if self._lastDataTime is None else self._lastDataTime) + 2 * period
+
+        polls = 0
+        while True:
+            # Only the status read holds the device lock, so other threads aren't blocked while waiting
+            with self._lock:
+                status = self._read_byte(self.kRegStatus)
+            polls += 1
+
+            if (status & sensors) == sensors:
+                if self._inactive:
+                    self.update_activity_state()
+                self._lastDataTime = _monotonic()
+                return polls
+
+            if checkTime is not None and not self._inactive and _monotonic() >= checkTime:
+                with self._lock:
+                    self.update_activity_state()
+                    if useDefault:
+                        sensors = self._default_sensors()
+                    period = self._data_period(sensors)
+
+                if period is None:
+                    checkTime = None
+                else:
+                    pollInterval = max(period / 50, 0.0001)
+                    checkTime = _monotonic() + 2 * period
+
+            if _monotonic() >= deadline:
+                return 0
+
+            time.sleep(pollInterval)
+
+    # Event Detection Functions
+    @_locked
+    def set_wake_up_threshold(self, threshold):
+        """!
+        Sets the wake-up threshold. 1 LSB is the full scale divided by 64 or 256, depending
+        on set_wake_up_threshold_weight()
+
+        @param int threshold: The wake-up threshold (0 - 63)
+        """
+        if threshold < 0 or threshold > 63:
+            return
+
+        regVal = self._read_byte(self.kRegWakeUpThs)
+
+        regVal &= ~self.kWakeUpThsMaskWkThs
+        regVal |= (threshold << self.kWakeUpThsShiftWkThs)
+
+        self._write_byte(self.kRegWakeUpThs, regVal)
+
+    @_locked
+    def set_wake_up_threshold_weight(self, val):
+        """!
+        Sets the weight of 1 LSB of the wake-up threshold
+
+        @param int val: The threshold weight
+
+        Possible values:
+            - kWakeThsWeightFsDiv64
+            - kWakeThsWeightFsDiv256
+        """
+        if val not in [self.kWakeThsWeightFsDiv64, self.kWakeThsWeightFsDiv256]:
+            return
+
+        regVal = self._read_byte(self.kRegWakeUpDur)
+
+        regVal &= ~self.kWakeUpDurMaskWakeThsW
+        regVal |= (val << self.kWakeUpDurShiftWakeThsW)
+
+        self._write_byte(self.kRegWakeUpDur, regVal)
+
+    @_locked
+    def set_wake_up_duration(self, duration):
+        """!
+        Sets how long the wake-up threshold must be exceeded before the event is flagged
+
+        @param int duration: The duration in accelerometer ODR periods (0 - 3)
+        """
+        if duration < 0 or duration > 3:
+            return
+
+        regVal = self._read_byte(self.kRegWakeUpDur)
+
+        regVal &= ~self.kWakeUpDurMaskWakeDur
+        regVal |= (duration << self.kWakeUpDurShiftWakeDur)
+
+        self._write_byte(self.kRegWakeUpDur, regVal)
+
+    @_locked
+    def set_sleep_duration(self, duration):
+        """!
+        Sets how long the device must stay below the wake-up threshold before it is considered inactive
+
+        @param int duration: The duration in units of 512 accelerometer ODR periods (0 - 15).
+            0 corresponds to 16 ODR periods
+        """
+        if duration < 0 or duration > 15:
+            return
+
+        regVal = self._read_byte(self.kRegWakeUpDur)
+
+        regVal &= ~self.kWakeUpDurMaskSleepDur
+        regVal |= (duration << self.kWakeUpDurShiftSleepDur)
+
+        self._write_byte(self.kRegWakeUpDur, regVal)
+
+    @_locked
+    def set_inactivity_mode(self, val):
+        """!
+        Sets what the device does when it detects inactivity
+
+        @param int val: The inactivity mode
+
+        Possible values:
+            - kInactDisabled
+            - kInactXl12Hz5
+            - kInactXl12Hz5GySleep
+            - kInactXl12Hz5GyPowerDown
+        """
+        if val < self.kInactDisabled or val > self.kInactXl12Hz5GyPowerDown:
+            return
+
+        regVal = self._read_byte(self.kRegTapCfg2)
+
+        regVal &= ~self.kTapCfg2MaskInactEn
+        regVal |= (val << self.kTapCfg2ShiftInactEn)
+
+        self._write_byte(self.kRegTapCfg2, regVal)
+
+    @_locked
+    def set_free_fall_threshold(self, val):
+        """!
+        Sets the free-fall threshold
+
+        @param int val: The free-fall threshold
+
+        See the "Possible free-fall thresholds" in the class definition for a list of valid arguments
+        """
+        if val < self.kFfThs156mg or val > self.kFfThs500mg:
+            return
+
+        regVal = self._read_byte(self.kRegFreeFall)
+
+        regVal &= ~self.kFreeFallMaskFfThs
+        regVal |= (val << self.kFreeFallShiftFfThs)
+
+        self._write_byte(self.kRegFreeFall, regVal)
+
+    @_locked
+    def set_free_fall_duration(self, duration):
+        """!
+        Sets how long the device must be in free-fall before the event is flagged
+
+        @param int duration: The duration in accelerometer ODR periods (0 - 63)
+        """
+        if duration < 0 or duration > 63:
+            return
+
+        with self.transaction():
+            # The duration is split between FREE_FALL (bits 4:0) and WAKE_UP_DUR (bit 5)
+            regVal = self._read_byte(self.kRegWakeUpDur)
+
+            regVal &= ~self.kWakeUpDurMaskFfDur5
+            regVal |= (((duration >> 5) & 0x01) << self.kWakeUpDurShiftFfDur5)
+
+            self._write_byte(self.kRegWakeUpDur, regVal)
+
+            regVal = self._read_byte(self.kRegFreeFall)
+
+            regVal &= ~self.kFreeFallMaskFfDur
+            regVal |= ((duration & 0x1F) << self.kFreeFallShiftFfDur)
+
+            self._write_byte(self.kRegFreeFall, regVal)
+
+    @_locked
+    def set_tap_detection(self, xEnable = True, yEnable = True, zEnable = True):
+        """!
+        Enables tap detection on each axis
+
+        @param bool xEnable: Enable or disable tap detection on the X axis
+        @param bool yEnable: Enable or disable tap detection on the Y axis
+        @param bool zEnable: Enable or disable tap detection on the Z axis
+        """
+        regVal = self._read_byte(self.kRegTapCfg0)
+
+        regVal &= ~(self.kTapCfg0MaskTapXEn | self.kTapCfg0MaskTapYEn | self.kTapCfg0MaskTapZEn)
+        regVal |= (bool(xEnable) << self.kTapCfg0ShiftTapXEn)
+        regVal |= (bool(yEnable) << self.kTapCfg0ShiftTapYEn)
+        regVal |= (bool(zEnable) << self.kTapCfg0ShiftTapZEn)
+
+        self._write_byte(self.kRegTapCfg0, regVal)
+
+    @_locked
+    def set_tap_threshold(self, xThs, yThs, zThs):
+        """!
+        Sets the tap threshold of each axis. 1 LSB is the full scale divided by 32
+
+        @param int xThs: The X axis threshold (0 - 31)
+        @param int yThs: The Y axis threshold (0 - 31)
+        @param int zThs: The Z axis threshold (0 - 31)
+        """
+        for ths in [xThs, yThs, zThs]:
+            if ths < 0 or ths > 31:
+                return
+
+        with self.transaction():
+            regVal = self._read_byte(self.kRegTapCfg1)
+            regVal &= ~self.kTapCfg1MaskTapThsX
+            regVal |= (xThs << self.kTapCfg1ShiftTapThsX)
+            self._write_byte(self.kRegTapCfg1, regVal)
+
+            regVal = self._read_byte(self.kRegTapCfg2)
+            regVal &= ~self.kTapCfg2MaskTapThsY
+            regVal |= (yThs << self.kTapCfg2ShiftTapThsY)
+            self._write_byte(self.kRegTapCfg2, regVal)
+
+            regVal = self._read_byte(self.kRegTapThs6d)
+            regVal &= ~self.kTapThs6dMaskTapThsZ
+            regVal |= (zThs << self.kTapThs6dShiftTapThsZ)
+            self._write_byte(self.kRegTapThs6d, regVal)
 
-            elif fsmOdr == self.kOdrFsm104Hz:
-                if val == self.kXlOdrOff:
-                    odrXl = self.kXlOdr104Hz
-                elif val == self.kXlOdr12Hz5:
-                    odrXl = self.kXlOdr104Hz
-                elif val == self.kXlOdr26Hz:
-                    odrXl = self.kXlOdr104Hz
-                elif val == self.kXlOdr52Hz:
-                    odrXl = self.kXlOdr104Hz
+    @_locked
+    def set_tap_priority(self, val):
+        """!
+        Sets the order in which the axes are checked for a tap
 
-        # Machine Learning Core data rate constraints:
-        mlcEnable = self._mlc_get()
+        @param int val: The axis priority
 
-        if mlcEnable:
-            mlc_odr = self._mlc_data_rate_get()
+        Possible values:
+            - kTapPriorityXYZ
+            - kTapPriorityYXZ
+            - kTapPriorityXZY
+            - kTapPriorityZYX
+            - kTapPriorityYZX
+            - kTapPriorityZXY
+        """
+        if val not in [self.kTapPriorityXYZ, self.kTapPriorityYXZ, self.kTapPriorityXZY,
+                       self.kTapPriorityZYX, self.kTapPriorityYZX, self.kTapPriorityZXY]:
+            return
 
-            if mlc_odr == self.kMlcOdr12Hz5:
-                if val == self.kXlOdrOff:
-                    odrXl = self.kXlOdr12Hz5
-                else:
-                    odrXl = val
+        regVal = self._read_byte(self.kRegTapCfg1)
 
-            elif mlc_odr == self.kMlcOdr26Hz:
-                if val == self.kXlOdrOff:
-                    odrXl = self.kXlOdr26Hz
-                elif val == self.kXlOdr12Hz5:
-                    odrXl = self.kXlOdr26Hz
-                else:
-                    odrXl = val
+        regVal &= ~self.kTapCfg1MaskTapPriority
+        regVal |= (val << self.kTapCfg1ShiftTapPriority)
 
-            elif mlc_odr == self.kMlcOdr52Hz:
-                if val == self.kXlOdrOff:
-                    odrXl = self.kXlOdr52Hz
-                elif val == self.kXlOdr12Hz5:
-                    odrXl = self.kXlOdr52Hz
-                elif val == self.kXlOdr26Hz:
-                    odrXl = self.kXlOdr52Hz
-                else:
-                    odrXl = val
+        self._write_byte(self.kRegTapCfg1, regVal)
 
-            elif mlc_odr == self.kMlcOdr104Hz:
-                if val == self.kXlOdrOff:
-                    odrXl = self.kXlOdr104Hz
-                elif val == self.kXlOdr12Hz5:
-                    odrXl = self.kXlOdr104Hz
-                elif val == self.kXlOdr26Hz:
-                    odrXl = self.kXlOdr104Hz
-                elif val == self.kXlOdr52Hz:
-                    odrXl = self.kXlOdr104Hz
-                else:
-                    odrXl = val
+    @_locked
+    def set_tap_timing(self, shock, quiet, duration):
+        """!
+        Sets the tap recognition time windows
 
-            else:
-                odrXl = val
+        @param int shock: Maximum duration of the over-threshold event (0 - 3)
+        @param int quiet: Quiet time after the first detected tap (0 - 3)
+        @param int duration: Maximum time between two taps of a double tap (0 - 15)
+        """
+        if shock < 0 or shock > 3 or quiet < 0 or quiet > 3 or duration < 0 or duration > 15:
+            return
 
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl1XL)
+        regVal = (duration << self.kIntDur2ShiftDur) \
+            | (quiet << self.kIntDur2ShiftQuiet) \
+            | (shock << self.kIntDur2ShiftShock)
 
-        regVal &= ~self.kCtrl1XlMaskOdr
-        regVal |= (odrXl << self.kCtrl1XlShiftOdr)
+        self._write_byte(self.kRegIntDur2, regVal)
 
-        self._i2c.writeByte(self.address, self.kRegCtrl1XL, regVal)
+    @_locked
+    def set_double_tap(self, enable = True):
+        """!
+        Enables double tap recognition. When disabled only single taps are recognized
 
-    def set_gyro_data_rate(self, val):
+        @param bool enable: Enable or disable double tap recognition
+        """
+        if enable != True and enable != False:
+            return
+
+        regVal = self._read_byte(self.kRegWakeUpThs)
+
+        regVal &= ~self.kWakeUpThsMaskSingleDoubleTap
+        regVal |= (enable << self.kWakeUpThsShiftSingleDoubleTap)
+
+        self._write_byte(self.kRegWakeUpThs, regVal)
+
+    @_locked
+    def set_6d_threshold(self, val):
         """!
-        Sets the data output rate of the gyroscope
+        Sets the threshold angle for 6D orientation detection
 
-        @param int val: Data rate
+        @param int val: The threshold angle
 
-        See the "Gyroscope" section in Possible data rates" in the class definition for a list of valid arguments
+        Possible values:
+            - kSixdThs80Deg
+            - kSixdThs70Deg
+            - kSixdThs60Deg
+            - kSixdThs50Deg
         """
-        if val < self.kGyroOdrOff or val > self.kGyroOdr6667Hz:
+        if val < self.kSixdThs80Deg or val > self.kSixdThs50Deg:
             return
-        
-        enableA, enableB = self._fsm_enable_get()
 
-        odrGy = val
+        regVal = self._read_byte(self.kRegTapThs6d)
 
-        if (enableA & 0xFF) or (enableB & 0xFF):
-            # Coresponds to any of the FSMs being enabled
-            fsmOdr = self._fsm_data_rate_get()
-            if fsmOdr == self.kOdrFsm12Hz5:
-                if val == self.kGyroOdrOff:
-                    odrGy = self.kGyroOdr12Hz5
+        regVal &= ~self.kTapThs6dMaskSixdThs
+        regVal |= (val << self.kTapThs6dShiftSixdThs)
 
-            elif fsmOdr == self.kOdrFsm26Hz:
-                if val == self.kGyroOdrOff:
-                    odrGy = self.kGyroOdr26Hz
-                elif val == self.kGyroOdr12Hz5:
-                    odrGy = self.kGyroOdr26Hz
+        self._write_byte(self.kRegTapThs6d, regVal)
 
-            elif fsmOdr == self.kOdrFsm52Hz:
-                if val == self.kGyroOdrOff:
-                    odrGy = self.kGyroOdr52Hz
-                elif val == self.kGyroOdr12Hz5:
-                    odrGy = self.kGyroOdr52Hz
-                elif val == self.kGyroOdr26Hz:
-                    odrGy = self.kGyroOdr52Hz
+    @_locked
+    def set_4d_mode(self, enable = True):
+        """!
+        Enables 4D orientation detection, where the Z axis position is ignored
 
-            elif fsmOdr == self.kOdrFsm104Hz:
-                if val == self.kGyroOdrOff:
-                    odrGy = self.kGyroOdr104Hz
-                elif val == self.kGyroOdr12Hz5:
-                    odrGy = self.kGyroOdr104Hz
-                elif val == self.kGyroOdr26Hz:
-                    odrGy = self.kGyroOdr104Hz
-                elif val == self.kGyroOdr52Hz:
-                    odrGy = self.kGyroOdr104Hz
-        
-        mlcEnable = self._mlc_get()
-        if mlcEnable:
-            mlc_odr = self._mlc_data_rate_get()
-            if mlc_odr == self.kMlcOdr12Hz5:
-                if val == self.kGyroOdrOff:
-                    odrGy = self.kGyroOdr12Hz5
-                else:
-                    odrGy = val
+        @param bool enable: Enable or disable 4D mode
+        """
+        if enable != True and enable != False:
+            return
 
-            elif mlc_odr == self.kMlcOdr26Hz:
-                if val == self.kGyroOdrOff:
-                    odrGy = self.kGyroOdr26Hz
-                elif val == self.kGyroOdr12Hz5:
-                    odrGy = self.kGyroOdr26Hz
-                else:
-                    odrGy = val
+        regVal = self._read_byte(self.kRegTapThs6d)
 
-            elif mlc_odr == self.kMlcOdr52Hz:
-                if val == self.kGyroOdrOff:
-                    odrGy = self.kGyroOdr52Hz
-                elif val == self.kGyroOdr12Hz5:
-                    odrGy = self.kGyroOdr52Hz
-                elif val == self.kGyroOdr26Hz:
-                    odrGy = self.kGyroOdr52Hz
-                else:
-                    odrGy = val
+        regVal &= ~self.kTapThs6dMaskD4dEn
+        regVal |= (enable << self.kTapThs6dShiftD4dEn)
 
-            elif mlc_odr == self.kMlcOdr104Hz:
-                if val == self.kGyroOdrOff:
-                    odrGy = self.kGyroOdr104Hz
-                elif val == self.kGyroOdr12Hz5:
-                    odrGy = self.kGyroOdr104Hz
-                elif val == self.kGyroOdr26Hz:
-                    odrGy = self.kGyroOdr104Hz
-                elif val == self.kGyroOdr52Hz:
-                    odrGy = self.kGyroOdr104Hz
-                else:
-                    odrGy = val
+        self._write_byte(self.kRegTapThs6d, regVal)
 
-            else:
-                odrGy = val
-        
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl2G)
+    def _md_int1_set(self, mask, enable):
+        """!
+        Route or unroute an MD1_CFG event on interrupt one. Not to be used outside this module
 
-        regVal &= ~self.kCtrl2GMaskOdr
-        regVal |= (odrGy << self.kCtrl2GShiftOdr)
+        @param int mask: The MD1_CFG bit mask of the event
+        @param bool enable: Enable or disable the event on the interrupt pin
+        """
+        if enable != True and enable != False:
+            return
 
-        self._i2c.writeByte(self.address, self.kRegCtrl2G, regVal)
+        route = self._pin_int1_route_get()
 
+        if enable:
+            route.md_cfg |= mask
+        else:
+            route.md_cfg &= ~mask
 
-    def enable_timestamp(self, enable = True):
+        self._pin_int1_route_set(route)
+
+    def _md_int2_set(self, mask, enable):
         """!
-        Enables the timestamp counter.
+        Route or unroute an MD2_CFG event on interrupt two. Not to be used outside this module
 
-        @param bool enable: Enable or disable the timestamp counter
+        @param int mask: The MD2_CFG bit mask of the event
+        @param bool enable: Enable or disable the event on the interrupt pin
         """
         if enable != True and enable != False:
             return
-        
-        val = self._i2c.readByte(self.address, self.kRegCtrl10C)
 
-        val &= ~self.kCtrl10CMaskTimestampEn
-        val |= (enable << self.kCtrl10CShiftTimestampEn)
+        route = self._pin_int2_route_get()
 
-        self._i2c.writeByte(self.address, self.kRegCtrl10C, val)
-    
-    def reset_timestamp(self):
+        if enable:
+            route.md_cfg |= mask
+        else:
+            route.md_cfg &= ~mask
+
+        self._pin_int2_route_set(route)
+
+    @_locked
+    def set_wake_up_int1(self, enable = True):
         """!
-        Resets the timestamp counter
+        Sends the wake-up event to interrupt one.
+
+        @param bool enable: Enable or disable the event on the interrupt pin
         """
-        resetVal = 0xAA
-        self._i2c.writeByte(self.address, self.kRegTimestamp2, resetVal)
+        self._md_int1_set(self.kMd1CfgMaskInt1Wu, enable)
 
-    # Fifo Methods
-    def set_fifo_watermark(self, val):
+    @_locked
+    def set_wake_up_int2(self, enable = True):
         """!
-        Set the FIFO watermark level
+        Sends the wake-up event to interrupt two.
 
-        @param int val: The watermark level. Must be between 0 and 511 (a 9-bit value)
+        @param bool enable: Enable or disable the event on the interrupt pin
         """
-        if val < 0 or val > 511:
-            return
-        
-        ctrl2Val = (val >> 8) & 0x01 # WTM8
-        ctrl1Val = val & 0xFF # WTM[7:0]
+        self._md_int2_set(self.kMd2CfgMaskInt2Wu, enable)
 
-        regVal = self._i2c.readByte(self.address, self.kRegFifoCtrl2)
+    @_locked
+    def set_free_fall_int1(self, enable = True):
+        """!
+        Sends the free-fall event to interrupt one.
 
-        regVal &= ~self.kFifoCtrl2MaskWtm
-        regVal |= (ctrl2Val << self.kFifoCtrl2ShiftWtm)
+        @param bool enable: Enable or disable the event on the interrupt pin
+        """
+        self._md_int1_set(self.kMd1CfgMaskInt1Ff, enable)
 
-        self._i2c.writeByte(self.address, self.kRegFifoCtrl2, regVal)
+    @_locked
+    def set_free_fall_int2(self, enable = True):
+        """!
+        Sends the free-fall event to interrupt two.
 
-        self._i2c.writeByte(self.address, self.kRegFifoCtrl1, ctrl1Val)
+        @param bool enable: Enable or disable the event on the interrupt pin
+        """
+        self._md_int2_set(self.kMd2CfgMaskInt2Ff, enable)
 
-    def set_fifo_mode(self, val):
+    @_locked
+    def set_single_tap_int1(self, enable = True):
         """!
-        Sets the FIFO mode
+        Sends the single tap event to interrupt one.
 
-        @param int val: The FIFO mode
+        @param bool enable: Enable or disable the event on the interrupt pin
+        """
+        self._md_int1_set(self.kMd1CfgMaskInt1SingleTap, enable)
 
-        Possible values:
-            - kBypassMode
-            - kFifoMode
-            - kStreamToFifoMode
-            - kBypassToStreamMode
-            - kStreamMode
-            - kBypassToFifoMode
+    @_locked
+    def set_single_tap_int2(self, enable = True):
+        """!
+        Sends the single tap event to interrupt two.
+
+        @param bool enable: Enable or disable the event on the interrupt pin
         """
-        if val < self.kBypassMode or val > self.kBypassToFifoMode:
-            return
-        
-        regVal = self._i2c.readByte(self.address, self.kRegFifoCtrl4)
+        self._md_int2_set(self.kMd2CfgMaskInt2SingleTap, enable)
 
-        regVal &= ~self.kFifoCtrl4MaskFifoMode
-        regVal |= (val << self.kFifoCtrl4ShiftFifoMode)
+    @_locked
+    def set_double_tap_int1(self, enable = True):
+        """!
+        Sends the double tap event to interrupt one.
 
-        self._i2c.writeByte(self.address, self.kRegFifoCtrl4, regVal)
+        @param bool enable: Enable or disable the event on the interrupt pin
+        """
+        self._md_int1_set(self.kMd1CfgMaskInt1DoubleTap, enable)
 
-    def set_accel_fifo_batch_set(self, val):
+    @_locked
+    def set_double_tap_int2(self, enable = True):
         """!
-        Sets the batch data rate for the accelerometer
+        Sends the double tap event to interrupt two.
 
-        @param int val: The batch data rate
+        @param bool enable: Enable or disable the event on the interrupt pin
+        """
+        self._md_int2_set(self.kMd2CfgMaskInt2DoubleTap, enable)
 
-        See the "Possible Accelerometer Batch Data Rates" in the class definition for a list of valid arguments
+    @_locked
+    def set_6d_int1(self, enable = True):
+        """!
+        Sends the 6D orientation change event to interrupt one.
+
+        @param bool enable: Enable or disable the event on the interrupt pin
         """
-        if val < self.kXlNotBatched or val > self.kXlBatchedAt6Hz5:
-            return
+        self._md_int1_set(self.kMd1CfgMaskInt16d, enable)
 
-        regVal = self._i2c.readByte(self.address, self.kRegFifoCtrl3)
+    @_locked
+    def set_6d_int2(self, enable = True):
+        """!
+        Sends the 6D orientation change event to interrupt two.
 
-        regVal &= ~self.kFifoCtrl3MaskBdrXl
-        regVal |= (val << self.kFifoCtrl3ShiftBdrXl)
-        
-        self._i2c.writeByte(self.address, self.kRegFifoCtrl3, regVal)
+        @param bool enable: Enable or disable the event on the interrupt pin
+        """
+        self._md_int2_set(self.kMd2CfgMaskInt26d, enable)
 
+    @_locked
+    def set_sleep_change_int1(self, enable = True):
+        """!
+        Sends the activity/inactivity change event to interrupt one.
 
-    def set_gyro_fifo_batch_set(self, val):
+        @param bool enable: Enable or disable the event on the interrupt pin
+        """
+        self._md_int1_set(self.kMd1CfgMaskInt1SleepChange, enable)
+
+    @_locked
+    def set_sleep_change_int2(self, enable = True):
         """!
-        Sets the batch data rate for the gyroscope
+        Sends the activity/inactivity change event to interrupt two.
 
-        @param int val: The batch data rate
+        @param bool enable: Enable or disable the event on the interrupt pin
+        """
+        self._md_int2_set(self.kMd2CfgMaskInt2SleepChange, enable)
 
-        See the "Possible Gyroscope Batch Data Rates" in the class definition for a list of valid arguments
+    @_locked
+    def get_event_sources(self):
+        """!
+        Reads ALL_INT_SRC, WAKE_UP_SRC, TAP_SRC and D6D_SRC in a single burst. With latched
+        interrupts this also clears the latched events
+
+        @return **IsmEventSource** The event source registers and decoded event flags
         """
-        if val < self.kGyroNotBatched or val > self.kGyroBatchedAt6Hz5:
+        regs = self._read_block(self.kRegAllIntSrc, 4)
+
+        events = IsmEventSource()
+        events.allIntSrc, events.wakeUpSrc, events.tapSrc, events.d6dSrc = regs[0], regs[1], regs[2], regs[3]
+
+        events.wakeUp = bool(events.wakeUpSrc & self.kWakeUpSrcMaskWuIa)
+        events.freeFall = bool(events.wakeUpSrc & self.kWakeUpSrcMaskFfIa)
+        events.sleepChange = bool(events.wakeUpSrc & self.kWakeUpSrcMaskSleepChangeIa)
+        events.sleepState = bool(events.wakeUpSrc & self.kWakeUpSrcMaskSleepState)
+        events.singleTap = bool(events.tapSrc & self.kTapSrcMaskSingleTap)
+        events.doubleTap = bool(events.tapSrc & self.kTapSrcMaskDoubleTap)
+        events.sixD = bool(events.d6dSrc & self.kD6dSrcMaskD6dIa)
+        events.orientation = (events.d6dSrc & self.kD6dSrcMaskOrientation) >> self.kD6dSrcShiftOrientation
+
+        if self._inactMode is not None:
+            self._inactive = events.sleepState
+
+        return events
+
+    # Power Management Functions
+    @_locked
+    def set_accel_high_performance(self, enable = True):
+        """!
+        Enables or disables the accelerometer's high-performance mode. With it disabled, the
+        accelerometer runs in low-power or normal mode at data rates up to 208 Hz
+
+        @param bool enable: Enable or disable high-performance mode
+        """
+        if enable != True and enable != False:
             return
 
-        regVal = self._i2c.readByte(self.address, self.kRegFifoCtrl3)
+        regVal = self._read_byte(self.kRegCtrl6C)
 
-        regVal &= ~self.kFifoCtrl3MaskBdrG
-        regVal |= (val << self.kFifoCtrl3ShiftBdrG)
-        
-        self._i2c.writeByte(self.address, self.kRegFifoCtrl3, regVal)
-    
-    def set_fifo_timestamp_dec(self, val):
+        # XL_HM_MODE set disables high-performance mode
+        regVal &= ~self.kCtrl6CMaskXlHmMode
+        regVal |= ((not enable) << self.kCtrl6CShiftXlHmMode)
+
+        self._write_byte(self.kRegCtrl6C, regVal)
+
+    @_locked
+    def set_gyro_sleep(self, enable = True):
         """!
-        Sets the FIFO time stamp decimation rate.
+        Puts the gyroscope in or out of sleep mode, which saves power but turns on faster than
+        powering it down
 
-        @param int val: The decimation rate
+        @param bool enable: Enable or disable gyroscope sleep mode
+        """
+        if enable != True and enable != False:
+            return
 
-        Possible values:
-            - kNoDecimation
-            - kDec1
-            - kDec8
-            - kDec32
+        regVal = self._read_byte(self.kRegCtrl4C)
+
+        regVal &= ~self.kCtrl4CMaskSleepG
+        regVal |= (enable << self.kCtrl4CShiftSleepG)
+
+        self._write_byte(self.kRegCtrl4C, regVal)
+
+    @_locked
+    def set_activity_power_management(self, enable = True, wake_threshold = 2, sleep_duration = 1,
+                                      mode = kInactXl12Hz5GySleep, low_power = True, int_pin = None):
+        """!
+        Enables or disables activity-adaptive power management. While the device is inactive
+        (below the wake-up threshold for the sleep duration) the accelerometer drops to 12.5 Hz
+        and the gyroscope sleeps or powers down, as set by mode. The configured rates return on
+        wake-up. wait_for_data() follows the rates in effect automatically.
+
+        Disabling restores the high-performance mode, INTERRUPTS_ENABLE and sleep change
+        routing in effect before power management was enabled.
+
+        The FIFO batch data rates aren't changed, and the FIFO readers (IsmBatchReader,
+        IsmWatermarkTuner, IsmPipelineSource and IsmStreamServer) work out their word rates from
+        the configured rates, so while the device is inactive the FIFO fills more slowly than
+        they expect: reads come back with fewer words, or after their timeout.
+
+        @param bool enable: Enable or disable power management
+        @param int wake_threshold: The wake-up threshold, see set_wake_up_threshold()
+        @param int sleep_duration: The inactivity time, see set_sleep_duration()
+        @param int mode: kInactXl12Hz5, kInactXl12Hz5GySleep or kInactXl12Hz5GyPowerDown
+        @param bool low_power: Disable the accelerometer's high-performance mode, so that it
+            runs in low-power mode at the reduced rate. This also applies while active if the
+            active accelerometer data rate is 208 Hz or less
+        @param int int_pin: Route sleep state changes to interrupt 1 or 2, or `None` not to
         """
-        if val < self.kNoDecimation or val > self.kDec32:
+        if enable != True and enable != False:
+            return
+        if mode < self.kInactXl12Hz5 or mode > self.kInactXl12Hz5GyPowerDown:
             return
-        
-        regVal = self._i2c.readByte(self.address, self.kRegFifoCtrl4)
 
-        regVal &= ~self.kFifoCtrl4MaskOdrTsBatch
-        regVal |= (val << self.kFifoCtrl4ShiftOdrTsBatch)
+        with self.transaction():
+            if enable:
+                if self._inactMode is None:
+                    ctrl6C = self._read_byte(self.kRegCtrl6C)
+                    tapCfg2 = self._read_byte(self.kRegTapCfg2)
+                    mdCfg = self._read_block(self.kRegMd1Cfg, 2)
+                    self._pmSaved = (not (ctrl6C & self.kCtrl6CMaskXlHmMode),
+                                     bool(tapCfg2 & self.kTapCfg2MaskInterruptsEnable),
+                                     bool(mdCfg[0] & self.kMd1CfgMaskInt1SleepChange),
+                                     bool(mdCfg[1] & self.kMd2CfgMaskInt2SleepChange))
+
+                self._inactMode = mode
+                self.set_wake_up_threshold(wake_threshold)
+                self.set_sleep_duration(sleep_duration)
+                self.set_inactivity_mode(mode)
+                self.set_accel_high_performance(not low_power)
+
+                # The inactivity function is one of the basic interrupts
+                regVal = self._read_byte(self.kRegTapCfg2)
+                self._write_byte(self.kRegTapCfg2, regVal | self.kTapCfg2MaskInterruptsEnable)
+
+                if int_pin == 1:
+                    self.set_sleep_change_int1()
+                elif int_pin == 2:
+                    self.set_sleep_change_int2()
+            else:
+                saved = self._pmSaved
+                self._inactMode = None
+                self._pmSaved = None
+                self.set_inactivity_mode(self.kInactDisabled)
+
+                if saved is not None:
+                    highPerformance, intsEnable, int1, int2 = saved
+                    self.set_accel_high_performance(highPerformance)
+                    if not int1:
+                        self._md_int1_set(self.kMd1CfgMaskInt1SleepChange, False)
+                    if not int2:
+                        self._md_int2_set(self.kMd2CfgMaskInt2SleepChange, False)
+
+                    # Keep INTERRUPTS_ENABLE if it was set before, or if other basic interrupts
+                    # (wake-up, free-fall, tap, 6D, sleep change) are still routed. It doesn't
+                    # gate the INT1_CTRL and INT2_CTRL signals or the embedded functions. Set
+                    # it again too, since clearing the sleep change routing above recomputes it
+                    if not intsEnable:
+                        basic1 = self.kMd1CfgMaskInt16d | self.kMd1CfgMaskInt1DoubleTap | self.kMd1CfgMaskInt1Ff \
+                            | self.kMd1CfgMaskInt1Wu | self.kMd1CfgMaskInt1SingleTap | self.kMd1CfgMaskInt1SleepChange
+                        basic2 = self.kMd2CfgMaskInt26d | self.kMd2CfgMaskInt2DoubleTap | self.kMd2CfgMaskInt2Ff \
+                            | self.kMd2CfgMaskInt2Wu | self.kMd2CfgMaskInt2SingleTap | self.kMd2CfgMaskInt2SleepChange
+                        mdCfg = self._read_block(self.kRegMd1Cfg, 2)
+                        intsEnable = bool(mdCfg[0] & basic1 or mdCfg[1] & basic2)
+
+                    regVal = self._read_byte(self.kRegTapCfg2)
+                    if intsEnable:
+                        regVal |= self.kTapCfg2MaskInterruptsEnable
+                    else:
+                        regVal &= ~self.kTapCfg2MaskInterruptsEnable
+                    self._write_byte(self.kRegTapCfg2, regVal)
+
+        self._inactive = False
+
+    @_locked
+    def update_activity_state(self):
+        """!
+        Reads the sleep state, for example after a sleep change interrupt. Reading WAKE_UP_SRC
+        also clears latched wake-up and free-fall events
+
+        @return **bool** `True` if the device is active, `False` if it's in the inactive state
+        """
+        regVal = self._read_byte(self.kRegWakeUpSrc)
+
+        inactive = bool(regVal & self.kWakeUpSrcMaskSleepState)
+        if self._inactMode is not None:
+            self._inactive = inactive
+
+        return not inactive
+
+class IsmMetrics:
+    """!
+    Acquisition health counters for one device, created by QwiicISM330DHCX.enable_metrics()
+
+    The counters are plain integers updated from the device's read paths with the device's bus
+    lock held, so the reader threads and other devices on the same bus don't lose updates.
+    Readers such as the Prometheus endpoint in qwiic_ism330dhcx_metrics just read the current
+    values.
+
+    Counters:
+        - reads, writes: bus transfers
+        - bus_errors, bus_retries: failed and retried transfers
+        - bank_switches: memory bank switches
+        - accel_samples, gyro_samples: samples read directly or from the FIFO
+        - fifo_level: the fill level at the last FIFO status read
+        - fifo_overruns: times a FIFO status read found the FIFO full or overrun after the
+          previous read found it clear, so a FIFO that stays full counts once
+    """
+    kLatencySamples = 1024
+
+    def __init__(self, device, name):
+        """!
+        Constructor
 
-        self._i2c.writeByte(self.address, self.kRegFifoCtrl4, regVal)
+        @param QwiicISM330DHCX device: The device the metrics belong to
+        @param str name: The device label
+        """
+        self.device = device
+        self.name = name
+        self.reset()
 
-    # Interrupt and pin mode settings
-    def set_pin_mode(self, activeLow):
+    def reset(self):
         """!
-        Sets the active state of the interrupt pin - high or low.
+        Zero every counter and restart the rate measurements
+        """
+        self.start = _monotonic()
+        self.reads = 0
+        self.writes = 0
+        self.bus_errors = 0
+        self.bus_retries = 0
+        self.bank_switches = 0
+        self.accel_samples = 0
+        self.gyro_samples = 0
+        self.fifo_level = 0
+        self.fifo_overruns = 0
+        self._overrun = False # the FIFO was full or overrun at the last status read
+
+        # Ring of the most recent read latencies, and the total over every read
+        self._latency = [0.0] * self.kLatencySamples
+        self._latencyCount = 0
+        self._latencySum = 0.0
+
+    def record_latency(self, seconds):
+        """!
+        Record the latency of a bus read
 
-        @param bool activeLow: Set to `True` for active low, `False` for active high
+        @param float seconds: The latency
         """
-        if activeLow != True and activeLow != False:
-            return
+        self._latency[self._latencyCount % self.kLatencySamples] = seconds
+        self._latencyCount += 1
+        self._latencySum += seconds
 
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl3C)
+    def update_fifo(self, level, overrun):
+        """!
+        Record a FIFO status read
 
-        regVal &= ~self.kCtrl3CMaskHlActive
-        regVal |= (activeLow << self.kCtrl3CShiftHlActive)
+        @param int level: The number of unread words
+        @param bool overrun: The FIFO was full or overrun
+        """
+        self.fifo_level = level
+        if overrun and not self._overrun:
+            self.fifo_overruns += 1
+        self._overrun = bool(overrun)
 
-        if activeLow:
-            # pinmode must be set to push-pull when active low is set.
-            # See section 9.14 on pg 51 of datasheet for more information
-            regVal &= ~self.kCtrl3CMaskPpOd
+    def count_samples(self, accel, count):
+        """!
+        Count samples read
 
-        self._i2c.writeByte(self.address, self.kRegCtrl3C, regVal)
+        @param bool accel: The samples are accelerometer samples, otherwise gyroscope
+        @param int count: The number of samples
+        """
+        with self.device._busLock:
+            if accel:
+                self.accel_samples += count
+            else:
+                self.gyro_samples += count
 
-    def set_int_notification(self, val):
+    def latency_percentiles(self, percentiles = (50, 90, 99)):
         """!
-        Sets what triggers an interrupt
+        Get percentiles of the recent bus read latencies
 
-        @param int val: The interrupt event type
+        @param percentiles: The percentiles to compute (0 - 100)
 
-        Possible Values:
-            - kAllIntPulsed
-            - kBaseLatchedEmbPulsed
-            - kBasePulsedEmbLatched
-            - kAllIntLatched
+        @return **list of float** The latency in seconds at each percentile, 0 before any read
         """
-        if val < self.kAllIntPulsed or val > self.kAllIntLatched:
-            return
+        count = min(self._latencyCount, self.kLatencySamples)
+        recent = sorted(self._latency[:count])
+        if not recent:
+            return [0.0 for p in percentiles]
 
+        return [recent[min(count - 1, int(p / 100.0 * count))] for p in percentiles]
 
-        lir = val & 0x01
-        intClrOnRead = val & 0x01
+    def achieved_rates(self):
+        """!
+        Get the achieved accelerometer and gyroscope sample rates since the metrics were reset
 
-        # Set necessary values in the tap config register
-        regVal = self._i2c.readByte(self.address, self.kRegTapCfg0)
+        @return **tuple of float** The accelerometer and gyroscope rates in Hz
+        """
+        elapsed = _monotonic() - self.start
+        if elapsed <= 0:
+            return (0.0, 0.0)
 
-        regVal &= ~(self.kTapCfg0MaskLir | self.kTapCfg0MaskIntClrOnRead)
-        regVal |= (lir << self.kTapCfg0ShiftLir)
-        regVal |= (intClrOnRead << self.kTapCfg0ShiftIntClrOnRead)
-        
-        self._i2c.writeByte(self.address, self.kRegTapCfg0, regVal)
+        return (self.accel_samples / elapsed, self.gyro_samples / elapsed)
 
-        # Set necessary values in the Page RW register
-        self._mem_bank_set(self.kEmbeddedFuncBank)
+    def configured_rates(self):
+        """!
+        Get the configured accelerometer and gyroscope output data rates
 
-        regVal = self._i2c.readByte(self.address, self.kRegPageRw)
+        @return **tuple of float** The accelerometer and gyroscope rates in Hz, 0 if unknown
+        """
+        D = QwiicISM330DHCX
+        dev = self.device
+        xlHz = D.kXlOdrHz[dev._odrAccel] if dev._odrAccel is not None else 0
+        gyHz = D.kGyroOdrHz[dev._odrGyro] if dev._odrGyro is not None else 0
 
-        embFuncLir = (val & 0x02) >> 1
-        regVal &= ~self.kPageRwMaskEmbFuncLir
-        regVal |= (embFuncLir << self.kPageRwShiftEmbFuncLir)
+        return (xlHz, gyHz)
 
-        self._i2c.writeByte(self.address, self.kRegPageRw, regVal)
+    def samples(self):
+        """!
+        Get every metric as Prometheus samples
 
-        self._mem_bank_set(self.kUserBank)
+        @return **list of tuple** (metric name, extra labels, value) for each sample
+        """
+        xlRate, gyRate = self.achieved_rates()
+        xlOdr, gyOdr = self.configured_rates()
+
+        out = [
+            ("bus_reads_total", "", self.reads),
+            ("bus_writes_total", "", self.writes),
+            ("bus_errors_total", "", self.bus_errors),
+            ("bus_retries_total", "", self.bus_retries),
+            ("bank_switches_total", "", self.bank_switches),
+            ("samples_total", 'sensor="accel"', self.accel_samples),
+            ("samples_total", 'sensor="gyro"', self.gyro_samples),
+            ("sample_rate_hz", 'sensor="accel"', xlRate),
+            ("sample_rate_hz", 'sensor="gyro"', gyRate),
+            ("odr_hz", 'sensor="accel"', xlOdr),
+            ("odr_hz", 'sensor="gyro"', gyOdr),
+            ("fifo_level", "", self.fifo_level),
+            ("fifo_overruns_total", "", self.fifo_overruns),
+        ]
 
-    class _PinIntRoute:
+        quantiles = (50, 90, 99)
+        for q, val in zip(quantiles, self.latency_percentiles(quantiles)):
+            out.append(("read_latency_seconds", 'quantile="%g"' % (q / 100.0), val))
+        out.append(("read_latency_seconds_sum", "", self._latencySum))
+        out.append(("read_latency_seconds_count", "", self._latencyCount))
+
+        return out
+
+def _field_name(name):
+    """!
+    Convert a constant's CamelCase field name to upper snake case, e.g. Lpf2XlEn to
+    LPF2_XL_EN. Not to be used outside this module
+    """
+    out = ""
+    for i, c in enumerate(name):
+        if i and c.isupper():
+            prev = name[i - 1]
+            nextLower = i + 1 < len(name) and name[i + 1].islower()
+            if prev.islower() or prev.isdigit() or nextLower:
+                out += "_"
+        out += c.upper()
+    return out
+
+def _build_register_map(cls):
+    """!
+    Generate the field table of kRegisterMap from the Shift/Mask constants. Not to be used
+    outside this module
+    """
+    cls._registers = {}
+    cls._fields = {}
+    cls._fieldOrder = []
+
+    for name, bank, reg, access, prefix in cls.kRegisterMap:
+        only = None
+        if isinstance(prefix, tuple):
+            prefix, only = prefix
+
+        found = []
+        if prefix is not None:
+            shiftPrefix = prefix + "Shift"
+            for attr in dir(cls):
+                if attr.startswith(shiftPrefix) and hasattr(cls, prefix + "Mask" + attr[len(shiftPrefix):]):
+                    field = attr[len(shiftPrefix):]
+                    if only is None or field in only:
+                        shift = getattr(cls, attr)
+                        found.append((-shift, _field_name(field), getattr(cls, prefix + "Mask" + field), shift))
+        if not found:
+            found = [(0, "VALUE", 0xFF, 0)]
+
+        # Most significant field first, as in the datasheet
+        found.sort()
+        cls._registers[name] = (bank, reg, access, [field for order, field, mask, shift in found])
+        for order, field, mask, shift in found:
+            fieldAccess = "r" if name + "." + field in cls.kReadOnlyFields else access
+            cls._fields[name + "." + field] = (name, mask, shift, fieldAccess)
+            cls._fieldOrder.append(name + "." + field)
+
+_build_register_map(QwiicISM330DHCX)
+
+class IsmConfig:
+    """!
+    Declarative device configuration
+
+    Every field defaults to `None`, meaning "leave as is". apply() validates the fields,
+    builds the final register images from a snapshot of the device and writes only the
+    registers that change, with adjacent registers merged into block writes.
+
+    Fields:
+        - accel_odr, accel_full_scale, accel_lp2, accel_slope_filter
+        - gyro_odr, gyro_full_scale, gyro_lp1, gyro_lp1_bandwidth
+        - block_data_update, device_config, timestamp, pin_active_low
+        - fifo_mode, fifo_watermark, accel_fifo_batch, gyro_fifo_batch, temp_fifo_batch,
+          fifo_timestamp_dec
+        - int1_accel_ready, int1_gyro_ready, int1_fifo_threshold, int1_batch_counter
+        - int2_accel_ready, int2_gyro_ready, int2_fifo_threshold, int2_batch_counter
+        - hub_enable, hub_odr, hub_sensors, hub_pull_ups, hub_pass_through, hub_write_mode,
+          hub_fifo_batching, hub_slaves (list of (address, subAddress, lenData) per sensor)
+
+    Values use the same constants as the matching QwiicISM330DHCX setters.
+    """
+    _fields = (
+        "accel_odr", "accel_full_scale", "accel_lp2", "accel_slope_filter",
+        "gyro_odr", "gyro_full_scale", "gyro_lp1", "gyro_lp1_bandwidth",
+        "block_data_update", "device_config", "timestamp", "pin_active_low",
+        "fifo_mode", "fifo_watermark", "accel_fifo_batch", "gyro_fifo_batch", "temp_fifo_batch",
+        "fifo_timestamp_dec",
+        "int1_accel_ready", "int1_gyro_ready", "int1_fifo_threshold", "int1_batch_counter",
+        "int2_accel_ready", "int2_gyro_ready", "int2_fifo_threshold", "int2_batch_counter",
+        "hub_enable", "hub_odr", "hub_sensors", "hub_pull_ups", "hub_pass_through", "hub_write_mode",
+        "hub_fifo_batching", "hub_slaves",
+    )
+
+    def __init__(self, **fields):
+        for name in self._fields:
+            setattr(self, name, None)
+
+        for name, val in fields.items():
+            if name not in self._fields:
+                raise TypeError("Unknown configuration field: %s" % name)
+            setattr(self, name, val)
+
+    def replace(self, **changes):
         """!
-        The routing information for an interrupt pin
+        @return **IsmConfig** A copy of this configuration with some fields changed
         """
-        def __init__(self):
-            self.int_ctrl = 0
-            self.md_cfg = 0
-            self.emb_func_int = 0
-            self.fsm_int_a = 0
-            self.fsm_int_b = 0
-            self.mlc_int = 0
+        fields = self.as_dict()
+        fields.update(changes)
+        return IsmConfig(**fields)
 
-    def _pin_int1_route_get(self):
+    def as_dict(self):
         """!
-        Get the routing information from registers INT1_CTRL, MD1_CFG,
-        EMB_FUNC_INT1, FSM_INT1_A, FSM_INT1_B
-
-        @return **PinIntRoute** The routing information
+        @return **dict** The fields that are set, keyed by name
         """
-        route = self._PinIntRoute()
+        return dict((name, getattr(self, name)) for name in self._fields if getattr(self, name) is not None)
 
-        self._mem_bank_set(self.kEmbeddedFuncBank)
+    def __repr__(self):
+        return "IsmConfig(%s)" % ", ".join("%s=%r" % item for item in sorted(self.as_dict().items()))
 
-        route.mlc_int = self._i2c.readByte(self.address, self.kRegMlcInt1)
-        route.emb_func_int = self._i2c.readByte(self.address, self.kRegEmbFuncInt1)
-        route.fsm_int_a = self._i2c.readByte(self.address, self.kRegFsmInt1A)
-        route.fsm_int_b = self._i2c.readByte(self.address, self.kRegFsmInt1B)
+    def _uses_hub(self):
+        return any(getattr(self, name) is not None for name in self._fields if name.startswith("hub_"))
 
-        self._mem_bank_set(self.kUserBank)
-        
-        route.int_ctrl = self._i2c.readByte(self.address, self.kRegInt1Ctrl)
-        route.md_cfg = self._i2c.readByte(self.address, self.kRegMd1Cfg)
+    def validate(self, device, embedded = None):
+        """!
+        Check the value of every field and the constraints between them
 
-        return route
+        @param QwiicISM330DHCX device: The device the configuration is for
+        @param dict embedded: Optional embedded functions bank registers keyed by address. When
+            given, the accelerometer and gyroscope data rates are checked against the rates the
+            enabled finite state machines and machine learning core need
 
-    def _pin_int2_route_get(self):
+        @raise ValueError: If the configuration is invalid
+        """
+        D = device
+        ranges = [
+            ("accel_odr", D.kXlOdrOff, D.kXlOdr1Hz6),
+            ("accel_full_scale", D.kXlFs2g, D.kXlFs8g),
+            ("accel_slope_filter", D.kHpPathDisableOnOut, D.kHpRefMdOdrDiv800),
+            ("gyro_odr", D.kGyroOdrOff, D.kGyroOdr6667Hz),
+            ("gyro_lp1_bandwidth", D.kBwUltraLight, D.kBwXtreme),
+            ("fifo_mode", D.kBypassMode, D.kBypassToFifoMode),
+            ("fifo_watermark", 0, 511),
+            ("accel_fifo_batch", D.kXlNotBatched, D.kXlBatchedAt6Hz5),
+            ("gyro_fifo_batch", D.kGyroNotBatched, D.kGyroBatchedAt6Hz5),
+            ("temp_fifo_batch", D.kTempNotBatched, D.kTempBatchedAt52Hz),
+            ("fifo_timestamp_dec", D.kNoDecimation, D.kDec32),
+            ("hub_odr", D.kShOdr104Hz, D.kShOdr13Hz),
+            ("hub_sensors", 0, 3),
+            ("hub_write_mode", D.kHubWriteModeCycle, D.kHubWriteModeSingle),
+        ]
+        for name, low, high in ranges:
+            val = getattr(self, name)
+            if val is not None and (val < low or val > high):
+                raise ValueError("%s must be between %d and %d" % (name, low, high))
+
+        if self.gyro_full_scale is not None and self.gyro_full_scale not in [D.kGyroFs125dps,
+                D.kGyroFs250dps, D.kGyroFs500dps, D.kGyroFs1000dps, D.kGyroFs2000dps, D.kGyroFs4000dps]:
+            raise ValueError("gyro_full_scale is not a valid full scale")
+
+        if self.hub_slaves is not None:
+            if len(self.hub_slaves) > 4:
+                raise ValueError("hub_slaves can hold at most 4 sensors")
+            for address, subAddress, lenData in self.hub_slaves:
+                if address < 0 or address > 0xFF or subAddress < 0 or subAddress > 0xFF or lenData < 0 or lenData > 7:
+                    raise ValueError("hub_slaves entries must be (address, subAddress, lenData 0 - 7)")
+
+        if embedded is None:
+            return
+
+        # Finite state machines and the machine learning core need the sensors running at least as fast as they are
+        minHz = 0
+        if embedded.get(D.kRegFsmEnableA, 0) or embedded.get(D.kRegFsmEnableB, 0):
+            fsmOdr = (embedded.get(D.kRegEmbFuncOdrCfgB, 0) & D.kEmbFuncOdrMaskFsmOdr) >> D.kEmbFuncOdrShiftFsmOdr
+            minHz = max(minHz, [12.5, 26, 52, 104][fsmOdr])
+        if embedded.get(D.kRegEmbFuncEnB, 0) & D.kEmbFuncEnBMaskMlcEn:
+            mlcOdr = (embedded.get(D.kRegEmbFuncOdrCfgC, 0) & D.kEmbFuncOdrMaskMlcOdr) >> D.kEmbFuncOdrShiftMlcOdr
+            minHz = max(minHz, [12.5, 26, 52, 104][mlcOdr])
+
+        if minHz:
+            if self.accel_odr is not None and D.kXlOdrHz[self.accel_odr] < minHz:
+                raise ValueError("accel_odr must be at least %g Hz while the FSM/MLC is enabled" % minHz)
+            if self.gyro_odr is not None and self.gyro_odr != D.kGyroOdrOff and D.kGyroOdrHz[self.gyro_odr] < minHz:
+                raise ValueError("gyro_odr must be off or at least %g Hz while the FSM/MLC is enabled" % minHz)
+
+    def image(self, device, baseline):
         """!
-        Get the routing information from registers INT2_CTRL,  MD2_CFG,
-        EMB_FUNC_INT2, FSM_INT2_A, FSM_INT2_B
+        Compute the register values this configuration results in
 
-        @return **PinIntRoute** The routing information
+        @param QwiicISM330DHCX device: The device the configuration is for
+        @param IsmConfigSnapshot baseline: The current configuration of the device
+
+        @return **IsmConfigSnapshot** The baseline with this configuration applied
         """
-        route = self._PinIntRoute()
+        D = device
+        user = baseline.registers(D.kUserBank)
+        hub = baseline.registers(D.kSensorHubBank)
+
+        def field(regs, reg, mask, shift, val):
+            if val is not None:
+                regs[reg] = (regs[reg] & ~mask) | ((int(val) << shift) & mask)
+
+        field(user, D.kRegCtrl1XL, D.kCtrl1XlMaskOdr, D.kCtrl1XlShiftOdr, self.accel_odr)
+        field(user, D.kRegCtrl1XL, D.kCtrl1XlMaskFs, D.kCtrl1XlShiftFs, self.accel_full_scale)
+        field(user, D.kRegCtrl1XL, D.kCtrl1XlMaskLpf2XlEn, D.kCtrl1XlShiftLpf2XlEn, self.accel_lp2)
+        if self.accel_slope_filter is not None:
+            val = self.accel_slope_filter
+            field(user, D.kRegCtrl8XL, D.kCtrl8XlMaskHpSlopeXlEn, D.kCtrl8XlShiftHpSlopeXlEn, (val & 0x10) >> 4)
+            field(user, D.kRegCtrl8XL, D.kCtrl8XlMaskHpRefModeXl, D.kCtrl8XlShiftHpRefModeXl, (val & 0x20) >> 5)
+            field(user, D.kRegCtrl8XL, D.kCtrl8XlMaskHpcfXl, D.kCtrl8XlShiftHpcfXl, val & 0x07)
+
+        field(user, D.kRegCtrl2G, D.kCtrl2GMaskOdr, D.kCtrl2GShiftOdr, self.gyro_odr)
+        field(user, D.kRegCtrl2G, D.kCtrl2GMaskFs, D.kCtrl2GShiftFs, self.gyro_full_scale)
+        field(user, D.kRegCtrl4C, D.kCtrl4CMaskLpf1SelG, D.kCtrl4CShiftLpf1SelG, self.gyro_lp1)
+        field(user, D.kRegCtrl6C, D.kCtrl6CMaskFtype, D.kCtrl6CShiftFtype, self.gyro_lp1_bandwidth)
+
+        field(user, D.kRegCtrl3C, D.kCtrl3CMaskBdu, D.kCtrl3CShiftBdu, self.block_data_update)
+        field(user, D.kRegCtrl9XL, D.kCtrl9XlMaskDeviceConf, D.kCtrl9XlShiftDeviceConf, self.device_config)
+        field(user, D.kRegCtrl10C, D.kCtrl10CMaskTimestampEn, D.kCtrl10CShiftTimestampEn, self.timestamp)
+        field(user, D.kRegCtrl3C, D.kCtrl3CMaskHlActive, D.kCtrl3CShiftHlActive, self.pin_active_low)
+        if self.pin_active_low:
+            # Active low requires push-pull, see set_pin_mode()
+            user[D.kRegCtrl3C] &= ~D.kCtrl3CMaskPpOd
+
+        field(user, D.kRegFifoCtrl4, D.kFifoCtrl4MaskFifoMode, D.kFifoCtrl4ShiftFifoMode, self.fifo_mode)
+        field(user, D.kRegFifoCtrl4, D.kFifoCtrl4MaskOdrTsBatch, D.kFifoCtrl4ShiftOdrTsBatch, self.fifo_timestamp_dec)
+        field(user, D.kRegFifoCtrl4, D.kFifoCtrl4MaskOdrTBatch, D.kFifoCtrl4ShiftOdrTBatch, self.temp_fifo_batch)
+        field(user, D.kRegFifoCtrl3, D.kFifoCtrl3MaskBdrXl, D.kFifoCtrl3ShiftBdrXl, self.accel_fifo_batch)
+        field(user, D.kRegFifoCtrl3, D.kFifoCtrl3MaskBdrGy, D.kFifoCtrl3ShiftBdrGy, self.gyro_fifo_batch)
+        if self.fifo_watermark is not None:
+            user[D.kRegFifoCtrl1] = self.fifo_watermark & 0xFF
+            field(user, D.kRegFifoCtrl2, D.kFifoCtrl2MaskWtm, D.kFifoCtrl2ShiftWtm, (self.fifo_watermark >> 8) & 0x01)
+
+        field(user, D.kRegInt1Ctrl, D.kInt1CtrlMaskInt1DrdyXl, D.kInt1CtrlShiftInt1DrdyXl, self.int1_accel_ready)
+        field(user, D.kRegInt1Ctrl, D.kInt1CtrlMaskInt1DrdyG, D.kInt1CtrlShiftInt1DrdyG, self.int1_gyro_ready)
+        field(user, D.kRegInt1Ctrl, D.kInt1CtrlMaskInt1FifoTh, D.kInt1CtrlShiftInt1FifoTh, self.int1_fifo_threshold)
+        field(user, D.kRegInt1Ctrl, D.kInt1CtrlMaskInt1CntBdr, D.kInt1CtrlShiftInt1CntBdr, self.int1_batch_counter)
+        field(user, D.kRegInt2Ctrl, D.kInt2CtrlMaskInt2DrdyXl, D.kInt2CtrlShiftInt2DrdyXl, self.int2_accel_ready)
+        field(user, D.kRegInt2Ctrl, D.kInt2CtrlMaskInt2DrdyG, D.kInt2CtrlShiftInt2DrdyG, self.int2_gyro_ready)
+        field(user, D.kRegInt2Ctrl, D.kInt2CtrlMaskInt2FifoTh, D.kInt2CtrlShiftInt2FifoTh, self.int2_fifo_threshold)
+        field(user, D.kRegInt2Ctrl, D.kInt2CtrlMaskInt2CntBdr, D.kInt2CtrlShiftInt2CntBdr, self.int2_batch_counter)
+
+        # Interrupts are only generated while INTERRUPTS_ENABLE is set. Like the routing
+        # setters, only touch it when routing changes, and keep it while power management
+        # needs the inactivity interrupt
+        if any(getattr(self, name) is not None for name in self._fields if name.startswith("int")):
+            intsEnable = user[D.kRegInt1Ctrl] or user[D.kRegInt2Ctrl] \
+                or (user[D.kRegMd1Cfg] & ~D.kMd1CfgMaskInt1EmbFunc) or (user[D.kRegMd2Cfg] & ~D.kMd2CfgMaskInt2EmbFunc) \
+                or D._inactMode is not None
+            field(user, D.kRegTapCfg2, D.kTapCfg2MaskInterruptsEnable, D.kTapCfg2ShiftInterruptsEnable, bool(intsEnable))
+
+        regs = dict(baseline.items())
+        for reg, val in user.items():
+            regs[(D.kUserBank, reg)] = val
+
+        if self._uses_hub():
+            if not hub:
+                raise ValueError("The baseline snapshot must include the sensor hub bank")
+
+            field(hub, D.kRegMasterConfig, D.kMasterConfigMaskMasterOn, D.kMasterConfigShiftMasterOn, self.hub_enable)
+            field(hub, D.kRegMasterConfig, D.kMasterConfigMaskAuxSensOn, D.kMasterConfigShiftAuxSensOn, self.hub_sensors)
+            field(hub, D.kRegMasterConfig, D.kMasterConfigMaskShubPuEn, D.kMasterConfigShiftShubPuEn, self.hub_pull_ups)
+            field(hub, D.kRegMasterConfig, D.kMasterConfigMaskPassThroughMode, D.kMasterConfigShiftPassThroughMode, self.hub_pass_through)
+            field(hub, D.kRegMasterConfig, D.kMasterConfigMaskWriteOnce, D.kMasterConfigShiftWriteOnce, self.hub_write_mode)
+            field(hub, D.kRegSlv0Config, D.kSlv0ConfigMaskShubOdr, D.kSlv0ConfigShiftShubOdr, self.hub_odr)
+            field(hub, D.kRegSlv0Config, D.kSlv0ConfigMaskBatchExtSens0En, D.kSlv0ConfigShiftBatchExtSens0En, self.hub_fifo_batching)
+
+            for sensor, (address, subAddress, lenData) in enumerate(self.hub_slaves or []):
+                # SLVx_ADD, SLVx_SUBADD and SLVx_CONFIG repeat every 3 registers
+                slvAddReg = D.kRegSlv0Add + 3 * sensor
+                hub[slvAddReg] = ((address >> 1) << D.kSlv0AddShiftSlave0) | D.kSlv0AddMaskRw0
+                hub[slvAddReg + 1] = subAddress
+                field(hub, slvAddReg + 2, D.kSlv0ConfigMaskSlave0Numop, D.kSlv0ConfigShiftSlave0Numop, lenData)
+
+            for reg, val in hub.items():
+                regs[(D.kSensorHubBank, reg)] = val
+
+        return IsmConfigSnapshot(regs)
+
+    def apply(self, device, baseline = None):
+        """!
+        Validate this configuration and write it to the device, touching only the registers that change
 
-        self._mem_bank_set(self.kEmbeddedFuncBank)
+        @param QwiicISM330DHCX device: The device to configure
+        @param IsmConfigSnapshot baseline: Optional snapshot of the device's current configuration,
+            e.g. the snapshot returned by the previous apply(). If not provided it is read from the
+            device, including the banks this configuration needs
 
-        route.mlc_int = self._i2c.readByte(self.address, self.kRegMlcInt2)
-        route.emb_func_int = self._i2c.readByte(self.address, self.kRegEmbFuncInt2)
-        route.fsm_int_a = self._i2c.readByte(self.address, self.kRegFsmInt2A)
-        route.fsm_int_b = self._i2c.readByte(self.address, self.kRegFsmInt2B)
+        @raise ValueError: If the configuration is invalid
 
-        self._mem_bank_set(self.kUserBank)
-        
-        route.int_ctrl = self._i2c.readByte(self.address, self.kRegInt2Ctrl)
-        route.md_cfg = self._i2c.readByte(self.address, self.kRegMd2Cfg)
+        @return **IsmConfigSnapshot** The configuration the device now holds
+        """
+        checkOdr = self.accel_odr is not None or self.gyro_odr is not None
 
-        return route
-    
-    def _pin_int1_route_set(self, val):
-        """!
-        Set the routing information to registers INT1_CTRL, MD1_CFG,
-        EMB_FUNC_INT1, FSM_INT1_A, FSM_INT1_B
+        if baseline is None:
+            baseline = device.snapshot_config(include_embedded = checkOdr, include_sensor_hub = self._uses_hub())
 
-        @param PinIntRoute val: The routing information
-        """
-        self._mem_bank_set(self.kEmbeddedFuncBank)
+        embedded = baseline.registers(device.kEmbeddedFuncBank) if checkOdr else None
+        if embedded is not None and not embedded:
+            embedded = device.snapshot_config(include_embedded = True).registers(device.kEmbeddedFuncBank)
 
-        self._i2c.writeByte(self.address, self.kRegMlcInt1, val.mlc_int)
-        self._i2c.writeByte(self.address, self.kRegEmbFuncInt1, val.emb_func_int)
-        self._i2c.writeByte(self.address, self.kRegFsmInt1A, val.fsm_int_a)
-        self._i2c.writeByte(self.address, self.kRegFsmInt1B, val.fsm_int_b)
+        self.validate(device, embedded)
 
-        self._mem_bank_set(self.kUserBank)
+        final = self.image(device, baseline)
+        device.restore_config(final, baseline)
 
-        embFunEn = (
-            (val.emb_func_int & self.kEmbFuncInt1MaskFsmLc) or
-            (val.emb_func_int & self.kEmbFuncInt1MaskSigMot) or
-            (val.emb_func_int & self.kEmbFuncInt1MaskTilt) or
-            (val.emb_func_int & self.kEmbFuncInt1MaskStepDetector)
-        )
+        return final
 
-        if embFunEn or (val.fsm_int_a) or (val.fsm_int_b) or (val.mlc_int):
-            val.md_cfg |= self.kMd1CfgMaskInt1EmbFunc
-        else:
-            val.md_cfg &= ~self.kMd1CfgMaskInt1EmbFunc
-        
-        self._i2c.writeByte(self.address, self.kRegInt1Ctrl, val.int_ctrl)
-        self._i2c.writeByte(self.address, self.kRegMd1Cfg, val.md_cfg)
-
-        tapCfg2 = self._i2c.readByte(self.address, self.kRegTapCfg2)
-
-        intsEnable = (
-            (val.md_cfg & self.kMd1CfgMaskInt1Shub) or
-            (val.md_cfg & self.kMd1CfgMaskInt16d) or
-            (val.md_cfg & self.kMd1CfgMaskInt1DoubleTap) or
-            (val.md_cfg & self.kMd1CfgMaskInt1Ff) or
-            (val.md_cfg & self.kMd1CfgMaskInt1Wu) or
-            (val.md_cfg & self.kMd1CfgMaskInt1SingleTap) or
-            (val.md_cfg & self.kMd1CfgMaskInt1SleepChange)
-        )
-
-        if intsEnable or val.int_ctrl:
-            tapCfg2 |= self.kTapCfg2MaskInterruptsEnable
-        else:
-            tapCfg2 &= ~self.kTapCfg2MaskInterruptsEnable
+def _as_rows(data):
+    """!
+    Normalize sample data into rows of (x, y, z). Not to be used outside this module
 
-        self._i2c.writeByte(self.address, self.kRegTapCfg2, tapCfg2)
+    @param data: An IsmData, an (x, y, z) triple, a list of either, or an Nx3 NumPy array
 
-    def _pin_int2_route_set(self, val):
-        """!
-        Select the signal that needs to route on the int2 pad
+    @return **list or ndarray** The samples as rows of three values
+    """
+    if isinstance(data, IsmData):
+        return [(data.xData, data.yData, data.zData)]
 
-        @param PinIntRoute val: The routing information
-        """
-        self._mem_bank_set(self.kEmbeddedFuncBank)
+    if hasattr(data, "shape"):
+        return data.reshape(-1, 3)
 
-        self._i2c.writeByte(self.address, self.kRegMlcInt2, val.mlc_int)
-        self._i2c.writeByte(self.address, self.kRegEmbFuncInt2, val.emb_func_int)
-        self._i2c.writeByte(self.address, self.kRegFsmInt2A, val.fsm_int_a)
-        self._i2c.writeByte(self.address, self.kRegFsmInt2B, val.fsm_int_b)
+    if len(data) == 3 and not hasattr(data[0], "__len__") and not isinstance(data[0], IsmData):
+        return [tuple(data)]
 
-        self._mem_bank_set(self.kUserBank)
+    return [(row.xData, row.yData, row.zData) if isinstance(row, IsmData) else row for row in data]
 
-        embFunEn = (
-            (val.emb_func_int & self.kEmbFuncInt2MaskFsmLc) or
-            (val.emb_func_int & self.kEmbFuncInt2MaskSigMot) or
-            (val.emb_func_int & self.kEmbFuncInt2MaskTilt) or
-            (val.emb_func_int & self.kEmbFuncInt2MaskStepDetector)
-        )
+class IsmStats:
+    """!
+    Streaming per-axis statistics (mean, variance, RMS, min/max, peak-to-peak and crest factor)
 
-        if embFunEn or (val.fsm_int_a) or (val.fsm_int_b) or (val.mlc_int):
-            val.md_cfg |= self.kMd2CfgMaskInt2EmbFunc
-        else:
-            val.md_cfg &= ~self.kMd2CfgMaskInt2EmbFunc
-        
-        self._i2c.writeByte(self.address, self.kRegInt2Ctrl, val.int_ctrl)
-        self._i2c.writeByte(self.address, self.kRegMd2Cfg, val.md_cfg)
-
-        tapCfg2 = self._i2c.readByte(self.address, self.kRegTapCfg2)
-
-        intCtrlEn = (
-            (val.int_ctrl & self.kInt2CtrlMaskInt2DrdyXl) or
-            (val.int_ctrl & self.kInt2CtrlMaskInt2DrdyG) or
-            (val.int_ctrl & self.kInt2CtrlMaskInt2DrdyTemp) or
-            (val.int_ctrl & self.kInt2CtrlMaskInt2FifoTh) or
-            (val.int_ctrl & self.kInt2CtrlMaskInt2FifoOvr) or
-            (val.int_ctrl & self.kInt2CtrlMaskInt2FifoFull) or
-            (val.int_ctrl & self.kInt2CtrlMaskInt2CntBdr)
-        )
-
-        md2CfgEn = (
-            (val.md_cfg & self.kMd2CfgMaskInt26d) or
-            (val.md_cfg & self.kMd2CfgMaskInt2DoubleTap) or
-            (val.md_cfg & self.kMd2CfgMaskInt2Ff) or
-            (val.md_cfg & self.kMd2CfgMaskInt2Wu) or
-            (val.md_cfg & self.kMd2CfgMaskInt2SingleTap) or
-            (val.md_cfg & self.kMd2CfgMaskInt2SleepChange)
-        )
-
-        if intCtrlEn or md2CfgEn:
-            tapCfg2 |= self.kTapCfg2MaskInterruptsEnable
-        else:
-            tapCfg2 &= ~self.kTapCfg2MaskInterruptsEnable
-        
-        self._i2c.writeByte(self.address, self.kRegTapCfg2, tapCfg2)
+    Samples are folded in block by block using Welford/Chan updates, so no samples are retained.
+    Two accumulators can be merged, which allows statistics gathered on separate threads or
+    devices to be combined.
+    """
+    def __init__(self):
+        self.reset()
 
-        
-    def set_accel_status_to_int1(self, enable = True):
+    def reset(self):
         """!
-        Sends the accelerometer's data ready signal to interrupt one.
-
-        @param bool enable: Enable or disable the accelerometer status to the interrupt pin
+        Clear all accumulated statistics
         """
-        if enable != True and enable != False:
-            return
+        self.count = 0
+        self._mean = [0.0, 0.0, 0.0]
+        self._m2 = [0.0, 0.0, 0.0]
+        self._min = [None, None, None]
+        self._max = [None, None, None]
 
-        route = self._pin_int1_route_get()
-
-        route.int_ctrl &= ~self.kInt1CtrlMaskInt1DrdyXl
-        route.int_ctrl |= (enable << self.kInt1CtrlShiftInt1DrdyXl)
+    def copy(self):
+        """!
+        Get an independent copy of this accumulator
 
-        self._pin_int1_route_set(route)
-    
+        @return **IsmStats** The copy
+        """
+        other = IsmStats()
+        other.merge(self)
+        return other
 
-    def set_fifo_threshold_int1(self, enable = True):
+    def _combine(self, count, mean, m2, minimum, maximum):
         """!
-        Sends the accelerometer's data ready signal to interrupt one.
-
-        @param bool enable: Enable or disable the accelerometer status to the interrupt pin
+        Fold the statistics of a block into this accumulator. Not to be used outside this module
         """
-        if enable != True and enable != False:
+        if count == 0:
             return
 
-        route = self._pin_int1_route_get()
+        total = self.count + count
 
-        route.int_ctrl &= ~self.kInt1CtrlMaskInt1FifoTh
-        route.int_ctrl |= (enable << self.kInt1CtrlShiftInt1FifoTh)
+        for i in range(3):
+            delta = mean[i] - self._mean[i]
+            self._mean[i] += delta * count / total
+            self._m2[i] += m2[i] + delta * delta * self.count * count / total
 
-        self._pin_int1_route_set(route)
+            if self._min[i] is None or minimum[i] < self._min[i]:
+                self._min[i] = minimum[i]
+            if self._max[i] is None or maximum[i] > self._max[i]:
+                self._max[i] = maximum[i]
 
-    def set_batch_counter_int1(self, enable = True):
+        self.count = total
+
+    def update(self, data):
         """!
-        Sends the accelerometer's data ready signal to interrupt one.
+        Add a sample or a block of samples
 
-        @param bool enable: Enable or disable the accelerometer status to the interrupt pin
-        """
-        if enable != True and enable != False:
-            return
+        @param data: An IsmData, an (x, y, z) triple, a list of either, or an Nx3 NumPy array
+            such as the int16 blocks returned by the FIFO read functions
 
-        route = self._pin_int1_route_get()
+        @return **IsmStats** This accumulator, to allow chaining
+        """
+        rows = _as_rows(data)
+        count = len(rows)
+        if count == 0:
+            return self
+
+        if hasattr(rows, "shape"):
+            # Vectorized path for NumPy blocks
+            np = _numpy()
+            block = rows.astype(np.float64)
+            mean = block.mean(axis=0)
+            m2 = ((block - mean) ** 2).sum(axis=0)
+            self._combine(count, mean.tolist(), m2.tolist(), block.min(axis=0).tolist(), block.max(axis=0).tolist())
+            return self
+
+        mean = [0.0, 0.0, 0.0]
+        m2 = [0.0, 0.0, 0.0]
+        minimum = [0, 0, 0]
+        maximum = [0, 0, 0]
+        for i in range(3):
+            column = [row[i] for row in rows]
+            mean[i] = sum(column) / count
+            m2[i] = sum((val - mean[i]) ** 2 for val in column)
+            minimum[i] = min(column)
+            maximum[i] = max(column)
+
+        self._combine(count, mean, m2, minimum, maximum)
+        return self
+
+    def merge(self, other):
+        """!
+        Merge the statistics gathered by another accumulator into this one
 
-        route.int_ctrl &= ~self.kInt1CtrlMaskInt1CntBdr
-        route.int_ctrl |= (enable << self.kInt1CtrlShiftInt1CntBdr)
+        @param IsmStats other: The accumulator to merge
 
-        self._pin_int1_route_set(route)
+        @return **IsmStats** This accumulator, to allow chaining
+        """
+        self._combine(other.count, other._mean, other._m2, other._min, other._max)
+        return self
 
-    def set_accel_status_to_int2(self, enable = True):
+    def _per_axis(self, func):
         """!
-        Sends the accelerometer's data ready signal to interrupt two.
-
-        @param bool enable: Enable or disable the accelerometer status to the interrupt pin
+        Build an IsmData by applying func to each axis index. Not to be used outside this module
         """
-        if enable != True and enable != False:
-            return
-        
-        route = self._pin_int2_route_get()
+        data = IsmData()
+        if self.count == 0:
+            data.xData = data.yData = data.zData = None
+            return data
 
-        route.int_ctrl &= ~self.kInt2CtrlMaskInt2DrdyXl
-        route.int_ctrl |= (enable << self.kInt2CtrlShiftInt2DrdyXl)
+        data.xData, data.yData, data.zData = [func(i) for i in range(3)]
+        return data
 
-        self._pin_int2_route_set(route)
-    
-    def set_gyro_status_to_int1(self, enable = True):
+    def mean(self):
         """!
-        Sends the gyroscope's data ready signal to interrupt one.
-
-        @param bool enable: Enable or disable the gyroscope status to the interrupt pin
+        @return **IsmData** The mean of each axis
         """
-        if enable != True and enable != False:
-            return
-        
-        route = self._pin_int1_route_get()
+        return self._per_axis(lambda i: self._mean[i])
 
-        route.int_ctrl &= ~self.kInt1CtrlMaskInt1DrdyG
-        route.int_ctrl |= (enable << self.kInt1CtrlShiftInt1DrdyG)
+    def variance(self, sample = False):
+        """!
+        @param bool sample: Return the unbiased sample variance instead of the population variance
 
-        self._pin_int1_route_set(route)
+        @return **IsmData** The variance of each axis
+        """
+        ddof = 1 if sample else 0
+        if self.count <= ddof:
+            return self._per_axis(lambda i: 0.0)
 
-    def set_gyro_status_to_int2(self, enable = True):
+        return self._per_axis(lambda i: self._m2[i] / (self.count - ddof))
+
+    def std_dev(self, sample = False):
         """!
-        Sends the gyroscope's data ready signal to interrupt two.
+        @param bool sample: Use the unbiased sample variance
 
-        @param bool enable: Enable or disable the gyroscope status to the interrupt pin
+        @return **IsmData** The standard deviation of each axis
         """
-        if enable != True and enable != False:
-            return
-        
-        route = self._pin_int2_route_get()
+        var = self.variance(sample)
+        return self._per_axis(lambda i: math.sqrt([var.xData, var.yData, var.zData][i]))
 
-        route.int_ctrl &= ~self.kInt2CtrlMaskInt2DrdyG
-        route.int_ctrl |= (enable << self.kInt2CtrlShiftInt2DrdyG)
+    def rms(self):
+        """!
+        @return **IsmData** The root mean square of each axis
+        """
+        return self._per_axis(lambda i: math.sqrt(self._mean[i] ** 2 + self._m2[i] / self.count))
 
-        self._pin_int2_route_set(route)
+    def minimum(self):
+        """!
+        @return **IsmData** The smallest value seen on each axis
+        """
+        return self._per_axis(lambda i: self._min[i])
 
-    def set_data_ready_mode(self, val):
+    def maximum(self):
         """!
-        Sets how the data ready signal is latched i.e. only return zero after interface reading
-        OR is pulsed.
+        @return **IsmData** The largest value seen on each axis
+        """
+        return self._per_axis(lambda i: self._max[i])
 
-        @param int val: The data ready mode.
+    def peak_to_peak(self):
+        """!
+        @return **IsmData** The difference between the largest and smallest value of each axis
+        """
+        return self._per_axis(lambda i: self._max[i] - self._min[i])
 
-        Possible values:
-            - kDataReadyPulsed
-            - kDataReadyLatched
+    def crest_factor(self):
+        """!
+        @return **IsmData** The ratio of peak magnitude to RMS of each axis, `None` where the RMS is zero
         """
-        if val < self.kDataReadyPulsed or val > self.kDataReadyLatched:
-            return
+        rms = self.rms()
+        rmsVals = [rms.xData, rms.yData, rms.zData]
 
-        regVal = self._i2c.readByte(self.address, self.kRegCntrBdr1)
+        def crest(i):
+            if rmsVals[i] == 0:
+                return None
+            return max(abs(self._min[i]), abs(self._max[i])) / rmsVals[i]
 
-        regVal &= ~self.kCntrBdr1ShiftDatareadyPulsed
-        regVal |= (val << self.kCntrBdr1ShiftDatareadyPulsed)
+        return self._per_axis(crest)
 
-        self._i2c.writeByte(self.address, self.kRegCntrBdr1, regVal)
-    
-    def set_hub_odr(self, rate):
+class IsmWindowedStats:
+    """!
+    Tumbling or sliding window statistics built from IsmStats accumulators
+
+    The window is split into panes. With one pane the window tumbles; with several panes the
+    window slides forward one pane at a time. Only one accumulator per pane is kept, never the
+    samples themselves.
+    """
+    def __init__(self, window, panes = 1):
         """!
-        Sets the output data rate for the sensor hub.
+        Constructor
 
-        @param int rate: The output data rate
+        @param int window: Number of samples in the window
+        @param int panes: Number of panes the window is split into. 1 gives a tumbling window,
+            more gives a sliding window that advances by window / panes samples. Must divide
+            the window
+        """
+        if panes < 1 or window < panes:
+            raise ValueError("window must hold at least one sample per pane")
+        if window % panes:
+            raise ValueError("window must be a multiple of panes")
+
+        self.window = window
+        self.panes = panes
+        self._paneSize = window // panes
+        self._done = []
+        self._current = IsmStats()
+
+    def reset(self):
+        """!
+        Discard all panes
+        """
+        self._done = []
+        self._current = IsmStats()
 
-        Possible values:
-            - kShOdr104Hz
-            - kShOdr52Hz
-            - kShOdr26Hz
-            - kShOdr13Hz
+    def update(self, data):
+        """!
+        Add a sample or a block of samples
+
+        @param data: Any sample data accepted by IsmStats.update()
+
+        @return **list of IsmStats** The statistics of every window completed by this block, oldest first
         """
-        if rate < self.kShOdr104Hz or rate > self.kShOdr13Hz:
-            return
-        
-        self._mem_bank_set(self.kSensorHubBank)
+        rows = _as_rows(data)
+        completed = []
 
-        regVal = self._i2c.readByte(self.address, self.kRegSlv0Config)
+        start = 0
+        while start < len(rows):
+            take = min(self._paneSize - self._current.count, len(rows) - start)
+            self._current.update(rows[start:start + take])
+            start += take
 
-        regVal &= ~self.kSlv0ConfigMaskShubOdr
-        regVal |= (rate << self.kSlv0ConfigShiftShubOdr)
+            if self._current.count == self._paneSize:
+                self._done.append(self._current)
+                if len(self._done) > self.panes:
+                    self._done.pop(0)
+                self._current = IsmStats()
 
-        self._i2c.writeByte(self.address, self.kRegSlv0Config, regVal)
+                if len(self._done) == self.panes:
+                    completed.append(self._merge_panes(self._done))
 
-        self._mem_bank_set(self.kUserBank)
+        return completed
+
+    def _merge_panes(self, panes):
+        """!
+        Merge a list of pane accumulators. Not to be used outside this module
+        """
+        stats = IsmStats()
+        for pane in panes:
+            stats.merge(pane)
+        return stats
 
+    def result(self):
+        """!
+        Get the statistics of the most recent window on demand, including the pane in progress
 
-    def set_hub_sensor_read(self, sensor, address, subAddress, lenData):
+        @return **IsmStats** The statistics of the latest window
+        """
+        panes = self._done[-(self.panes - 1):] if self.panes > 1 else []
+        if self._current.count == 0 and self._done:
+            panes = self._done[-self.panes:]
+            return self._merge_panes(panes)
+
+        return self._merge_panes(panes + [self._current])
+
+class IsmBatchReader:
+    """!
+    Batch counter driven FIFO acquisition: reads exactly one fixed-size batch of FIFO words
+    each time the batch counter reaches its threshold
+
+    The threshold is chosen from the batch data rate of the trigger sensor and the target
+    read rate, and every read goes into the same preallocated buffer, so downstream buffers
+    can be fixed-size. Set up the FIFO batch data rates and mode before calling start().
+    """
+    def __init__(self, device, target_rate = 50.0, trigger = QwiicISM330DHCX.kCounterTrigXl):
         """!
-        Sets the general sensor hub settings, which sensor and their I2C address and register
-        to read.
+        Constructor
 
-        @param int sensor: The sensor to read from
-        @param int address: The I2C address of the sensor
-        @param int subAddress: The register address of the sensor
-        @param int lenData: The length of data to read from the sensor
+        @param QwiicISM330DHCX device: The device to read
+        @param float target_rate: The number of batches to read per second
+        @param int trigger: The sensor the batch counter counts, kCounterTrigXl or kCounterTrigGyro
         """
-        if sensor < 0 or sensor > 3:
-            return
-        
-        if sensor == 0:
-            slvAddReg = self.kRegSlv0Add
-            slvSubaddReg = self.kRegSlv0Subadd
-            slvConfigReg = self.kRegSlv0Config
-        elif sensor == 1:
-            slvAddReg = self.kRegSlv1Addr
-            slvSubaddReg = self.kRegSlv1Subadd
-            slvConfigReg = self.kRegSlv1Config
-        elif sensor == 2:
-            slvAddReg = self.kRegSlv2Addr
-            slvSubaddReg = self.kRegSlv2Subadd
-            slvConfigReg = self.kRegSlv2Config
-        elif sensor == 3:
-            slvAddReg = self.kRegSlv3Addr
-            slvSubaddReg = self.kRegSlv3Subadd
-            slvConfigReg = self.kRegSlv3Config
-        
-        
-        self._mem_bank_set(self.kSensorHubBank)
-        
-        # TODO: okay to use slave0 vals for all of this masking since bit pos are the same for all 3 slaves. 
-        #       the vendor API explicitly has a different function for each slave, so we might want to switch to that way,
-        #       but it creates a lot of duplicated code
-        slvAddVal = (address >> 1) << self.kSlv0AddShiftSlave0
-        slvAddVal |= self.kSlv0AddMaskRw0 
+        self.device = device
+        self.target_rate = target_rate
+        self.trigger = trigger
 
-        self._i2c.writeByte(self.address, slvAddReg, slvAddVal)
+        self.threshold = 0 # trigger sensor samples per batch
+        self.words = 0 # FIFO words per batch
+        self.period = None # seconds per batch
+        self._buf = None
+        self._ready = False # batch counter flag seen but its batch not read yet
 
-        self._i2c.writeByte(self.address, slvSubaddReg, subAddress)
+    def start(self, int_pin = None):
+        """!
+        Compute the batch size, program the batch counter and allocate the batch buffer
 
-        slvConfigRead = self._i2c.readByte(self.address, slvConfigReg)
+        @param int int_pin: Route the batch counter flag to interrupt 1 or 2, or `None` to poll
 
-        slvConfigRead &= ~self.kSlv0ConfigMaskSlave0Numop
-        slvConfigRead |= (lenData << self.kSlv0ConfigShiftSlave0Numop)
+        @return **int** The number of FIFO words per batch
 
-        self._i2c.writeByte(self.address, slvConfigReg, slvConfigRead)
+        @raise ValueError: If the trigger sensor isn't batched, or a batch holding whole periods
+            of every stream wouldn't fit the batch counter or half the FIFO
+        """
+        D = QwiicISM330DHCX
+        dev = self.device
+
+        with dev._lock:
+            regs = dev._read_block(D.kRegFifoCtrl3, 2)
+            xlHz = D.kXlBdrHz[(regs[0] & D.kFifoCtrl3MaskBdrXl) >> D.kFifoCtrl3ShiftBdrXl]
+            gyHz = D.kGyroBdrHz[(regs[0] & D.kFifoCtrl3MaskBdrGy) >> D.kFifoCtrl3ShiftBdrGy]
+            tempHz = [0, 1.6, 12.5, 52][(regs[1] & D.kFifoCtrl4MaskOdrTBatch) >> D.kFifoCtrl4ShiftOdrTBatch]
+            tsDec = {D.kDec1: 1, D.kDec8: 8, D.kDec32: 32}.get((regs[1] & D.kFifoCtrl4MaskOdrTsBatch) >> D.kFifoCtrl4ShiftOdrTsBatch)
+
+            trigHz = xlHz if self.trigger == D.kCounterTrigXl else gyHz
+            if trigHz == 0:
+                raise ValueError("the trigger sensor isn't batched in the FIFO")
+
+            # The batch data rates are all the same base rate times a power of 2, so each stream
+            # gives a power of 2 words per trigger sample. A timestamp word comes every tsDec
+            # samples of the fastest sensor
+            def ratio(hz):
+                return 2.0 ** round(math.log(hz / trigHz, 2)) if hz else 0.0
+
+            ratios = [ratio(xlHz), ratio(gyHz), ratio(tempHz)]
+            if tsDec is not None:
+                ratios.append(max(ratios[:2]) / tsDec)
+            perSample = sum(ratios)
+
+            # A threshold that's a multiple of the slowest stream's period in trigger samples
+            # makes every batch the same whole number of words. Keep a batch to half the FIFO
+            # so one can be read while the next is collected
+            granule = int(max([1.0] + [1 / val for val in ratios if val]))
+            limit = min(D.kCntBdrThMax, int(D.kFifoCapacity // 2 / perSample)) // granule * granule
+            if granule > limit:
+                raise ValueError("a batch of the slowest stream needs %d trigger samples, more than "
+                                 "the batch counter or half the FIFO can hold; batch it at a higher "
+                                 "rate or lower the trigger rate" % granule)
+
+            threshold = int(round(trigHz / self.target_rate / granule)) * granule
+            threshold = max(granule, min(threshold, limit))
+
+            with dev.transaction():
+                dev.set_batch_counter_trigger(self.trigger)
+                if not dev.set_batch_counter_threshold(threshold):
+                    raise ValueError("batch counter threshold %d is out of range" % threshold)
+                if int_pin == 1:
+                    dev.set_batch_counter_int1()
+                elif int_pin == 2:
+                    dev.set_batch_counter_int2()
+
+            self.threshold = threshold
+            self.words = int(round(threshold * perSample))
+            self.period = threshold / trigHz
+            self._buf = bytearray(self.words * D.kFifoWordSize)
+            self._ready = False
+
+            dev.reset_batch_counter()
+            dev.get_fifo_status() # clear a stale flag
+
+        return self.words
+
+    def read(self, wait = True, timeout = 1.0):
+        """!
+        Read one batch. After an interrupt, call with wait set to `False`
 
-        self._mem_bank_set(self.kUserBank)
+        The returned data shares the batch buffer, so it's overwritten by the next read.
 
-    def set_hub_sensor_write(self, address, subAddress, data):
+        @param bool wait: Poll the batch counter flag until a batch is ready
+        @param float timeout: The maximum time to wait in seconds
+
+        @return The structured FIFO words of the batch (see QwiicISM330DHCX.read_fifo()), the
+            raw bytes if NumPy isn't installed, or `None` if no batch was ready
+        """
+        dev = self.device
+        deadline = _monotonic() + timeout
+        pollInterval = max(self.period / 20, 0.0001)
+
+        while True:
+            level, status = dev.get_fifo_status()
+
+            # Reading FIFO_STATUS2 clears the flag, so remember it until the batch is complete
+            if status & dev.kFifoStatus2MaskCounterBdrIa:
+                self._ready = True
+            if (self._ready or not wait) and level >= self.words:
+                break
+            if not wait or _monotonic() >= deadline:
+                return None
+            time.sleep(pollInterval)
+
+        self._ready = False
+        raw, words = dev.read_fifo(self.words, self._buf)
+
+        return raw if words is None else words
+
+class IsmWatermarkTuner:
+    """!
+    Adaptive FIFO watermark controller
+
+    After each FIFO read, the controller looks at the fill level, the overrun and full flags
+    and the host's wake-up latency (measured from how far the fill level got past the
+    watermark, or given directly). It keeps the watermark as high as possible, to read the
+    most samples per transaction, while leaving room for the worst recent latency plus a
+    safety margin of the FIFO capacity. An overrun or a full FIFO halves the watermark
+    straight away and doubles the latency allowance; otherwise the watermark grows by at
+    most a quarter per read and the latency allowance decays slowly. Only FIFO_OVR_IA
+    counts as an overrun, since a full FIFO that was read in time hasn't lost samples.
+
+    Optionally the timestamp decimation is retuned too, so that a read holds a few
+    timestamps rather than one per batch.
+    """
+    kTsDecimations = [(QwiicISM330DHCX.kDec32, 32), (QwiicISM330DHCX.kDec8, 8), (QwiicISM330DHCX.kDec1, 1)]
+
+    def __init__(self, device, margin = 0.25, min_watermark = 8, max_watermark = 511,
+                 tune_timestamp_dec = False, decay = 0.99):
         """!
-        Gives settings to the 6DoF to write to an external sensor.
+        Constructor
 
-        @param int address: The I2C address of the sensor
-        @param int subAddress: The register address of the sensor
-        @param int data: The single byte data to write to the sensor
+        @param QwiicISM330DHCX device: The device to tune
+        @param float margin: The fraction of the FIFO capacity always kept free (0 - 1)
+        @param int min_watermark: The lowest watermark to use
+        @param int max_watermark: The highest watermark to use
+        @param bool tune_timestamp_dec: Also retune the timestamp decimation, if timestamps are batched
+        @param float decay: The factor the latency allowance decays by on each read
         """
-        
-        if data < 0 or data > 255:
-            return
-        
-        self._mem_bank_set(self.kSensorHubBank)
+        self.device = device
+        self.margin = margin
+        self.min_watermark = min_watermark
+        self.max_watermark = max_watermark
+        self.tune_timestamp_dec = tune_timestamp_dec
+        self.decay = decay
+
+        self.watermark = None
+        self.latency = 0.0 # the latency allowance in seconds
+        self.word_rate = 0.0 # FIFO words per second
+        self.batch_rate = 0.0 # batch events per second at the fastest batch data rate
+
+        self.reads = 0
+        self.words = 0
+        self.overruns = 0
+        self.retunes = 0
+
+    def start(self, watermark = None):
+        """!
+        Compute the FIFO word rate from the batch settings and set the initial watermark.
+        Call again after changing the batch data rates
 
-        slv0AddVal = (address >> 1) << self.kSlv0AddShiftSlave0
-        slv0AddVal &= ~self.kSlv0AddMaskRw0
+        @param int watermark: The initial watermark. Defaults to the lowest one
 
-        self._i2c.writeByte(self.address, self.kRegSlv0Add, slv0AddVal)
+        @return **int** The watermark
+        """
+        D = QwiicISM330DHCX
+        with self.device._lock:
+            regs = self.device._read_block(D.kRegFifoCtrl3, 2)
 
-        self._i2c.writeByte(self.address, self.kRegSlv0Subadd, subAddress)
+        xlHz = D.kXlBdrHz[(regs[0] & D.kFifoCtrl3MaskBdrXl) >> D.kFifoCtrl3ShiftBdrXl]
+        gyHz = D.kGyroBdrHz[(regs[0] & D.kFifoCtrl3MaskBdrGy) >> D.kFifoCtrl3ShiftBdrGy]
+        tempHz = [0, 1.6, 12.5, 52][(regs[1] & D.kFifoCtrl4MaskOdrTBatch) >> D.kFifoCtrl4ShiftOdrTBatch]
+        self._tsDec = (regs[1] & D.kFifoCtrl4MaskOdrTsBatch) >> D.kFifoCtrl4ShiftOdrTsBatch
 
-        self._i2c.writeByte(self.address, self.kRegDatawriteSlv0, data)
+        self.batch_rate = max(xlHz, gyHz)
+        self._sensorRate = xlHz + gyHz + tempHz
+        self.word_rate = self._sensorRate + self._timestamp_rate(self._tsDec)
 
-        self._mem_bank_set(self.kUserBank)
+        self.watermark = None
+        self._set_watermark(self.min_watermark if watermark is None else watermark)
 
-    def set_number_hub_sensors(self, highestSlave):
-        """!
-        Sets the number of sensors that the sensor hub will read from.
+        return self.watermark
 
-        @param int highestSlave: The highest sensor number to read from (0-3)
+    def _timestamp_rate(self, dec):
+        """!
+        The rate of TIMESTAMP words for a decimation setting. Not to be used outside this class
+        """
+        for val, factor in self.kTsDecimations:
+            if val == dec:
+                return self.batch_rate / factor
+        return 0.0
 
-        For example, if highest slave is set to 2, the sensor hub will read from sensors 0, 1, and 2.
+    def _set_watermark(self, val):
+        """!
+        Clamp and write the watermark. Not to be used outside this class
         """
-        if highestSlave < 0 or highestSlave > 3:
-            return
-        
-        self._mem_bank_set(self.kSensorHubBank)
+        val = int(max(self.min_watermark, min(val, self.max_watermark)))
+        if val != self.watermark:
+            self.device.set_fifo_watermark(val)
+            self.watermark = val
+            self.retunes += 1
 
-        masterConfig = self._i2c.readByte(self.address, self.kRegMasterConfig)
+    def update(self, level, status, latency = None):
+        """!
+        Retune after a FIFO read
 
-        masterConfig &= ~self.kMasterConfigMaskAuxSensOn
-        masterConfig |= (highestSlave << self.kMasterConfigShiftAuxSensOn)
+        @param int level: The FIFO fill level found at the read, in words
+        @param int status: The FIFO_STATUS2 value found at the read
+        @param float latency: The host wake-up latency in seconds. Defaults to the time the fill
+            level took to get past the watermark
 
-        self._i2c.writeByte(self.address, self.kRegMasterConfig, masterConfig)
+        @return **int** The watermark
+        """
+        D = QwiicISM330DHCX
+        self.reads += 1
+        self.words += level
 
-        self._mem_bank_set(self.kUserBank)
+        if latency is None and self.word_rate > 0 and level > self.watermark:
+            latency = (level - self.watermark) / self.word_rate
 
-    def enable_sensor_i2c(self, enable = True):
-        """!
-        Enables the 6DoF as an I2C sensor controller
+        self.latency *= self.decay
+        if latency is not None and latency > self.latency:
+            self.latency = latency
 
-        @param bool enable: Enable or disable the sensor I2C controller
-        """
+        usable = D.kFifoCapacity * (1.0 - self.margin)
 
-        if enable != 1 and enable != 0:
-            return
+        if status & (D.kFifoStatus2MaskOvrIa | D.kFifoStatus2MaskFullIa):
+            if status & D.kFifoStatus2MaskOvrIa:
+                self.overruns += 1
+            self.latency = max(self.latency * 2, usable / (2 * self.word_rate) if self.word_rate else 0)
+            self._set_watermark(self.watermark // 2)
+        else:
+            target = usable - self.word_rate * self.latency
+            if target < self.watermark:
+                self._set_watermark(target)
+            else:
+                self._set_watermark(min(target, self.watermark + max(1, self.watermark // 4)))
 
-        self._mem_bank_set(self.kSensorHubBank)
+        if self.tune_timestamp_dec and self._tsDec != D.kNoDecimation:
+            self._tune_timestamp_dec()
 
-        masterConfig = self._i2c.readByte(self.address, self.kRegMasterConfig)
+        return self.watermark
 
-        masterConfig &= ~self.kMasterConfigMaskMasterOn
-        masterConfig |= (enable << self.kMasterConfigShiftMasterOn)
+    def _tune_timestamp_dec(self):
+        """!
+        Pick the largest timestamp decimation that still gives a few timestamps per read.
+        Not to be used outside this class
+        """
+        if self.word_rate <= 0:
+            return
 
-        self._i2c.writeByte(self.address, self.kRegMasterConfig, masterConfig)
+        batchesPerRead = self.watermark * self.batch_rate / self.word_rate
+        for val, factor in self.kTsDecimations:
+            if batchesPerRead >= 4 * factor or factor == 1:
+                break
 
-        self._mem_bank_set(self.kUserBank)
+        if val != self._tsDec:
+            self.device.set_fifo_timestamp_dec(val)
+            self._tsDec = val
+            self.word_rate = self._sensorRate + self._timestamp_rate(val)
 
-    def read_peripheral_sensor(self, len):
+    def read(self, buf = None):
         """!
-        Read external sensor data from the sensor hub
+        Read every unread FIFO word and retune
 
-        @param int len: The number of bytes to read from the sensor
+        @param bytearray buf: A buffer to read into, see QwiicISM330DHCX.read_fifo()
 
-        @return **list** The data read from the sensor
+        @return **tuple** The values returned by QwiicISM330DHCX.read_fifo()
         """
+        level, status = self.device.get_fifo_status()
+        data = self.device.read_fifo(level, buf)
 
-        self._mem_bank_set(self.kSensorHubBank)
-
-        data = list(self._i2c.readBytes(self.address, self.kRegSensorHub1, len))
-
-        self._mem_bank_set(self.kUserBank)
+        self.update(level, status)
 
         return data
 
-    def _sh_status_get(self): 
+    def samples_per_read(self):
         """!
-        Read the sensor hub source register
+        Get the mean number of FIFO words per read
 
-        @return **int** The status of the sensor hub
+        @return **float** The mean words per read
         """
+        return self.words / self.reads if self.reads else 0.0
+
+def _rate_fraction(rate):
+    """!
+    Convert a rate in Hz to an exact fraction, so that rates such as 12.5 Hz plan exactly
+
+    @param rate: The rate in Hz
+
+    @return **Fraction** The rate
+    """
+    from fractions import Fraction
+    return Fraction(rate).limit_denominator(1000)
+
+class IsmReadScheduler:
+    """!
+    Multi-rate read scheduler for the accelerometer, gyroscope, temperature and sensor hub
+
+    Each stream is read at its own rate. The scheduler computes a plan over the hyperperiod
+    (the least common multiple of the stream periods), merging reads that fall within
+    `tolerance` seconds of each other into one tick. At each tick the due accelerometer,
+    gyroscope and temperature outputs are read in one block, since their registers are
+    contiguous (OUT_TEMP 0x20 - 0x21, gyroscope 0x22 - 0x27, accelerometer 0x28 - 0x2D). The
+    sensor hub is read from its own memory bank.
+
+    The slip of each tick behind its planned time is recorded. Ticks more than a hyperperiod
+    tick behind are skipped and counted as missed rather than read in a burst.
+    """
+    kStreams = ("temp", "gyro", "accel", "hub")
+    kStreamRegs = {"temp": (QwiicISM330DHCX.kRegOutTempL, 2),
+                   "gyro": (QwiicISM330DHCX.kRegOutXLG, 6),
+                   "accel": (QwiicISM330DHCX.kRegOutXLA, 6)}
+    kMaxPlanTicks = 100000
+
+    def __init__(self, device, rates, hub_length = 6, tolerance = None):
+        """!
+        Constructor
 
-        self._mem_bank_set(self.kSensorHubBank)
-
-        status = self._i2c.readByte(self.address, self.kRegStatusMaster)
+        @param QwiicISM330DHCX device: The device to read
+        @param dict rates: Rate in Hz of each stream to read, keyed by "accel", "gyro", "temp" or "hub"
+        @param int hub_length: The number of sensor hub bytes to read
+        @param float tolerance: Reads closer together than this many seconds are merged.
+            Defaults to half the period of the fastest stream
+        """
+        for name in rates:
+            if name not in self.kStreams or rates[name] <= 0:
+                raise ValueError("invalid stream or rate: %s" % name)
 
-        self._mem_bank_set(self.kUserBank)
+        self.device = device
+        self.rates = dict(rates)
+        self.hub_length = hub_length
 
-        return status
+        if tolerance is None:
+            tolerance = 0.5 / max(rates.values())
+        self.tolerance = tolerance
 
+        self.hyperperiod, self.plan = self._make_plan()
+        self.reset_stats()
 
-    def get_hub_status(self):
+    def _make_plan(self):
         """!
-        Checks whether communication with the external sensor has concluded.
+        Build the tick list for one hyperperiod. Not to be used outside this class
 
-        @return **bool** Whether communication has ended or not
+        @return **tuple** The hyperperiod in seconds, followed by a list of
+            (offset in seconds, tuple of due streams) in time order
         """
-        status = self._sh_status_get()
+        # The period of a rate p/q Hz is q/p seconds; the LCM of fractions is the LCM of the
+        # numerators over the GCD of the denominators
+        num, den = 1, 0
+        for rate in self.rates.values():
+            r = _rate_fraction(rate)
+            num = num * r.denominator // math.gcd(num, r.denominator)
+            den = math.gcd(den, r.numerator)
+        hyperperiod = num / den
+
+        events = []
+        for name, rate in self.rates.items():
+            count = int(round(hyperperiod * rate))
+            if count * len(self.rates) > self.kMaxPlanTicks:
+                raise ValueError("the stream rates have too long a hyperperiod")
+            events += [(k * hyperperiod / count, name) for k in range(count)]
+        events.sort()
+
+        plan = []
+        for offset, name in events:
+            if plan and offset - plan[-1][0] <= self.tolerance:
+                if name not in plan[-1][1]:
+                    plan[-1][1].append(name)
+            else:
+                plan.append((offset, [name]))
 
-        if status & self.kStatusMasterMaskSensHubEndop:
-            return True
-        
-        return False
-    
-    def get_external_sensor_nack(self, sensor):
+        return (hyperperiod, [(offset, tuple(n for n in self.kStreams if n in names))
+                              for offset, names in plan])
+
+    def reset_stats(self):
         """!
-        Get the NACK status of the external sensor
+        Reset the slip statistics and restart the schedule from now
+        """
+        self.ticks = 0
+        self.missed = 0
+        self.late = 0 # ticks that slipped by more than the tolerance
+        self.slip_total = 0.0
+        self.slip_max = 0.0
+        self.reads = 0 # bus transactions
+
+        self._start = None
+        self._index = 0
+        self._cycle = 0
+
+    def mean_slip(self):
+        """!
+        Get the mean slip of the ticks behind their planned times
 
-        @param int sensor: The sensor to check
+        @return **float** The mean slip in seconds
         """
-        status = self._sh_status_get()
-        
-        if sensor == 0:
-            return status & self.kStatusMasterMaskSlave0Nack
-        elif sensor == 1:
-            return status & self.kStatusMasterMaskSlave1Nack
-        elif sensor == 2:
-            return status & self.kStatusMasterMaskSlave2Nack
-        elif sensor == 3:
-            return status & self.kStatusMasterMaskSlave3Nack
-        
-        return False
+        return self.slip_total / self.ticks if self.ticks else 0.0
 
-    def read_mmc_magnetometer(self, len):
+    def _due_time(self):
         """!
-        Read data from the MMC magnetometer
-
-        @param int len: The number of bytes to read from the magnetometer
+        The planned time of the next tick. Not to be used outside this class
+        """
+        return self._start + self._cycle * self.hyperperiod + self.plan[self._index][0]
 
-        @return **list** The data read from the magnetometer
+    def _advance(self):
+        """!
+        Move on to the next tick of the plan. Not to be used outside this class
         """
-        return self.read_peripheral_sensor(len)
-    
-    def set_hub_write_mode(self, config):
+        self._index += 1
+        if self._index == len(self.plan):
+            self._index = 0
+            self._cycle += 1
+
+    def _read(self, streams):
         """!
-        Sets how often the 6DoF should write to the external sensor: once per cycle i.e. output
-        data rate, or just once.
+        Read the due streams, coalescing the output registers into one block.
+        Not to be used outside this class
 
-        @param int config: The write mode
+        @param tuple streams: The due streams
 
-        Possible values:
-            - kHubWriteModeSingle
-            - kHubWriteModeCycle
+        @return **dict** The data of each stream
         """
-        if config not in [self.kHubWriteModeSingle, self.kHubWriteModeCycle]:
-            return
-        
-        self._mem_bank_set(self.kSensorHubBank)
+        dev = self.device
+        out = {}
+
+        regs = [self.kStreamRegs[name] for name in streams if name in self.kStreamRegs]
+        if regs:
+            first = regs[0][0]
+            last = regs[-1][0] + regs[-1][1]
+            block = dev._read_block(first, last - first)
+            self.reads += 1
+
+            for name in streams:
+                if name not in self.kStreamRegs:
+                    continue
+                reg, length = self.kStreamRegs[name]
+                vals = [block[i] | (block[i + 1] << 8) for i in range(reg - first, reg - first + length, 2)]
+                vals = [val if val < 32768 else val - 65536 for val in vals]
+
+                if name == "temp":
+                    out[name] = vals[0]
+                else:
+                    data = IsmData()
+                    data.xData, data.yData, data.zData = vals
+                    out[name] = data
 
-        masterConfig = self._i2c.readByte(self.address, self.kRegMasterConfig)
-        masterConfig &= ~self.kMasterConfigMaskWriteOnce
-        masterConfig |= (config << self.kMasterConfigShiftWriteOnce)
-        self._i2c.writeByte(self.address, self.kRegMasterConfig, masterConfig)
+        if "hub" in streams:
+            out["hub"] = dev.read_peripheral_sensor(self.hub_length)
+            self.reads += 1
 
-        self._mem_bank_set(self.kUserBank)
+        return out
 
-    def set_hub_pass_through(self, enable = True):
+    def step(self):
         """!
-        Allows the primary I2C data lines to communicate through the auxiliary I2C lines.
+        Wait for the next tick and read the streams due at it
 
-        @param bool enable: Enable or disable the pass through
+        @return **tuple** The planned time of the tick (on the _monotonic() clock), followed by a
+            dict of the raw data of each due stream: IsmData for "accel" and "gyro", an int for
+            "temp" and a list of bytes for "hub"
         """
+        if self._start is None:
+            self._start = _monotonic()
 
-        self._mem_bank_set(self.kSensorHubBank)
+        due = self._due_time()
+        now = _monotonic()
 
-        masterConfig = self._i2c.readByte(self.address, self.kRegMasterConfig)
-        masterConfig &= ~self.kMasterConfigShiftPassThroughMode
-        masterConfig |= (enable << self.kMasterConfigShiftPassThroughMode)
-        self._i2c.writeByte(self.address, self.kRegMasterConfig, masterConfig)
+        # Skip ticks that are already a whole tick behind instead of reading them in a burst
+        while now - due > self.tolerance * 2:
+            self.missed += 1
+            self._advance()
+            due = self._due_time()
 
-        self._mem_bank_set(self.kUserBank)
+        if due > now:
+            time.sleep(due - now)
 
-    def set_hub_fifo_batching(self, enable = True):
-        """!
-        Sets sensor hub FIFO batching
+        slip = max(0.0, _monotonic() - due)
+        self.ticks += 1
+        self.slip_total += slip
+        self.slip_max = max(self.slip_max, slip)
+        if slip > self.tolerance:
+            self.late += 1
 
-        @param bool enable: Enable or disable the FIFO batching
-        """
-        if enable != 1 and enable != 0:
-            return
+        streams = self.plan[self._index][1]
+        self._advance()
 
-        self._mem_bank_set(self.kSensorHubBank)
+        with self.device._lock:
+            data = self._read(streams)
 
-        slv0Config = self._i2c.readByte(self.address, self.kRegSlv0Config)
+        return (due, data)
 
-        slv0Config &= ~self.kSlv0ConfigMaskBatchExtSens0En
-        slv0Config |= (enable << self.kSlv0ConfigShiftBatchExtSens0En)
+    def run(self, callback, duration = None):
+        """!
+        Run the schedule, passing each tick's data to a callback
 
-        self._i2c.writeByte(self.address, self.kRegSlv0Config, slv0Config)
+        @param callback: Called with the values returned by step(). Return `False` to stop
+        @param float duration: Stop after this many seconds, or run until the callback stops it
+        """
+        end = None if duration is None else _monotonic() + duration
+        while end is None or _monotonic() < end:
+            if callback(*self.step()) is False:
+                break
+
+class IsmSynchronizer:
+    """!
+    Time alignment of several devices and a time-ordered merge of their sample streams
+
+    Each device's timestamp counter is mapped onto the host's _monotonic() clock by a line,
+    host time = offset + slope * counter, fitted to paired readings of the counter and the host
+    clock (see update()) with exponential forgetting so it follows oscillator drift. Readings
+    are bracketed by host clock reads and taken at their midpoint, so the fit averages out bus
+    latency. The initial slope comes from the device's INTERNAL_FREQ_FINE trim.
+
+    Counter values are extended past the 32-bit wrap (about 30 hours) by taking the value
+    nearest the latest one seen for the device, from update() or push().
+
+    Blocks of samples with counter timestamps (e.g. from QwiicISM330DHCX.decode_fifo()) are
+    pushed per device and merged in aligned time order with a k-way heap over the blocks, which
+    emits runs of consecutive samples from one device as array slices. Requires NumPy.
+    """
+    kCounterWrap = 1 << 32
+
+    def __init__(self, devices, forgetting = 0.99):
+        """!
+        Constructor
 
-        self._mem_bank_set(self.kUserBank)
+        @param list devices: The QwiicISM330DHCX devices to align
+        @param float forgetting: The weight kept by past clock readings at each new one (0 - 1)
+        """
+        self.devices = list(devices)
+        self.forgetting = forgetting
 
+        self._queues = [[] for dev in self.devices] # pending (times, samples, position) blocks
+        self._latest = [None for dev in self.devices]
+        self._heap = []
+        self.reset_timestamps()
 
-    def set_hub_pull_ups(self, enable = True):
+    def reset_timestamps(self):
         """!
-        Enables/Disables internal pullups on SDX/SCX lines
-
-        @param bool enable: Enable or disable the pullups
+        Reset every device's timestamp counter, back to back, and restart the clock fits
         """
-        if enable != 1 and enable != 0:
-            return
-        
-        self._mem_bank_set(self.kSensorHubBank)
+        self._nominal = [dev.get_timestamp_resolution() for dev in self.devices]
+        self._fits = []
+        self._reference = [] # latest unwrapped counter value seen per device
 
-        masterConfig = self._i2c.readByte(self.address, self.kRegMasterConfig)
-        masterConfig &= ~self.kMasterConfigMaskShubPuEn
-        masterConfig |= (enable << self.kMasterConfigShiftShubPuEn)
-        self._i2c.writeByte(self.address, self.kRegMasterConfig, masterConfig)
+        for dev, lsb in zip(self.devices, self._nominal):
+            before = _monotonic()
+            dev.reset_timestamp()
+            after = _monotonic()
 
-        self._mem_bank_set(self.kUserBank)
+            # Weighted sums of (counter seconds, host seconds) relative to the reset
+            self._fits.append({"origin": (before + after) / 2, "w": 0.0, "x": 0.0, "y": 0.0,
+                               "xx": 0.0, "xy": 0.0, "slope": lsb, "offset": (before + after) / 2})
+            self._reference.append(0)
 
-    def reset_sensor_hub(self):
+    def _unwrapped(self, index, ticks):
         """!
-        Resets all settings in the "Master Config" register
-        """
-        self._mem_bank_set(self.kSensorHubBank)
+        Extend counter values past the 32-bit wrap, to the values nearest the device's latest
+        one. Not to be used outside this class
 
-        masterConfig = self._i2c.readByte(self.address, self.kRegMasterConfig)
-        masterConfig |= self.kMasterConfigMaskRstMasterRegs
-        self._i2c.writeByte(self.address, self.kRegMasterConfig, masterConfig)
-        masterConfig &= ~self.kMasterConfigMaskRstMasterRegs
-        self._i2c.writeByte(self.address, self.kRegMasterConfig, masterConfig)
+        @param int index: The device's position in the device list
+        @param ticks: An array of counter values
 
-        self._mem_bank_set(self.kUserBank)
+        @return **ndarray** The unwrapped values as int64
+        """
+        np = _numpy()
+        ticks = np.asarray(ticks, dtype = np.int64)
+        ref = self._reference[index]
+        wraps = np.floor_divide(ref - ticks + self.kCounterWrap // 2, self.kCounterWrap)
+        return ticks + wraps * self.kCounterWrap
 
+    def update(self):
+        """!
+        Read every device's counter with the host clock and refine the clock fits
+        """
+        for index, dev in enumerate(self.devices):
+            before = _monotonic()
+            ticks = dev.get_timestamp()
+            after = _monotonic()
+
+            fit = self._fits[index]
+            ticks = int(self._unwrapped(index, ticks))
+            self._reference[index] = max(self._reference[index], ticks)
+            x = ticks * self._nominal[index]
+            y = (before + after) / 2 - fit["origin"]
+
+            f = self.forgetting
+            fit["w"] = fit["w"] * f + 1
+            fit["x"] = fit["x"] * f + x
+            fit["y"] = fit["y"] * f + y
+            fit["xx"] = fit["xx"] * f + x * x
+            fit["xy"] = fit["xy"] * f + x * y
+
+            meanX = fit["x"] / fit["w"]
+            meanY = fit["y"] / fit["w"]
+            var = fit["xx"] / fit["w"] - meanX * meanX
+
+            # Until the readings span some time, keep the trimmed nominal slope
+            if var > 1e-6:
+                scale = (fit["xy"] / fit["w"] - meanX * meanY) / var
+            else:
+                scale = 1.0
+            fit["slope"] = self._nominal[index] * scale
+            fit["offset"] = fit["origin"] + meanY - scale * meanX
 
-    # Self Test Functions
-    def setAccelSelfTest(self, val):
+    def offset(self, index):
         """!
-        Linear acceleration sensor self-test enable.
+        Get a device's clock offset
 
-        @param int val: Change the values of st_xl in reg CTRL5_C
+        @param int index: The device's position in the device list
 
-        Possible values:
-            - kSelfTestDisable
-            - kSelfTestPositive
-            - kSelfTestNegative
+        @return **float** The host time at which the device's counter was 0
         """
-        if val not in [self.kSelfTestDisable, self.kSelfTestPositive, self.kSelfTestNegative]:
-            return
-        
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl5C)
+        return self._fits[index]["offset"]
 
-        regVal &= ~self.kCtrl5CMaskStXl
-        regVal |= (val << self.kCtrl5CShiftStXl)
+    def drift(self, index):
+        """!
+        Get a device's clock drift relative to its trimmed nominal rate
 
-        self._i2c.writeByte(self.address, self.kRegCtrl5C, regVal)
+        @param int index: The device's position in the device list
 
-    def setGyroSelfTest(self, val):
+        @return **float** The drift in parts per million
+        """
+        return (self._fits[index]["slope"] / self._nominal[index] - 1) * 1e6
+
+    def to_time(self, index, ticks):
         """!
-        Angular rate sensor self-test enable
+        Convert counter values of a device to aligned host time
 
-        @param int val: Change the values of st_g in reg CTRL5_C
+        @param int index: The device's position in the device list
+        @param ticks: A counter value or an array of them, as read from the device. Negative
+            values (unknown) become NaN
 
-        Possible values:
-            - kSelfTestDisable
-            - kSelfTestPositive
-            - kSelfTestNegative
+        @return The aligned times in seconds on the _monotonic() clock
         """
-        if val not in [self.kSelfTestDisable, self.kSelfTestPositive, self.kSelfTestNegative]:
+        np = _numpy()
+        fit = self._fits[index]
+        ticks = np.asarray(ticks, dtype = np.int64)
+
+        return np.where(ticks >= 0, fit["offset"] + fit["slope"] * self._unwrapped(index, ticks), np.nan)
+
+    def push(self, index, ticks, samples):
+        """!
+        Queue a block of a device's samples for merging. Samples without a known time are dropped
+
+        @param int index: The device's position in the device list
+        @param ticks: The counter timestamp of each sample, in time order
+        @param samples: The samples, one row each
+        """
+        import heapq
+        np = _numpy()
+        ticks = np.asarray(ticks, dtype = np.int64)
+        known = ticks >= 0
+        ticks, samples = ticks[known], samples[known]
+        if len(ticks) == 0:
             return
-        
-        regVal = self._i2c.readByte(self.address, self.kRegCtrl5C)
 
-        regVal &= ~self.kCtrl5CMaskStG
-        regVal |= (val << self.kCtrl5CShiftStG)
+        # Each value is unwrapped against the device's latest one, which holds across a wrap
+        # inside the block too as long as the block spans less than half the counter range
+        ticks = self._unwrapped(index, ticks)
+        self._reference[index] = max(self._reference[index], int(ticks[-1]))
 
-        self._i2c.writeByte(self.address, self.kRegCtrl5C, regVal)
+        fit = self._fits[index]
+        times = fit["offset"] + fit["slope"] * ticks
 
-    # Status Checking Functions
+        queue = self._queues[index]
+        queue.append([times, samples, 0])
+        self._latest[index] = times[-1]
 
-    def check_status(self):
+        if len(queue) == 1:
+            heapq.heappush(self._heap, (times[0], index))
+
+    def pop(self, flush = False):
         """!
-        Checks if data is ready for both the acclerometer and the gyroscope
+        Get the merged samples that can no longer be preceded by a sample still to be pushed,
+        i.e. those up to the oldest latest time pushed by any device
 
-        @return **bool** If data is ready for both sensors
+        @param bool flush: Return everything queued, e.g. at the end of a run
+
+        @return **list of tuple** Runs of consecutive samples from one device, in time order,
+            each as (aligned times, device index, sample rows) with the arrays sliced from the
+            pushed blocks
         """
-        status = self._i2c.readByte(self.address, self.kRegStatus)
+        import heapq
+        np = _numpy()
 
-        if status & self.kStatusMaskXlda and status & self.kStatusMaskGda:
-            return True
-        
-        return False
-    
-    def check_accel_status(self):
+        if flush:
+            horizon = float("inf")
+        elif any(latest is None for latest in self._latest):
+            return []
+        else:
+            horizon = min(self._latest)
+
+        out = []
+        heap = self._heap
+        while heap and heap[0][0] <= horizon:
+            t, index = heapq.heappop(heap)
+            queue = self._queues[index]
+            block = queue[0]
+            times, samples, pos = block
+
+            # Emit this device's run of samples up to the next device's head
+            limit = min(horizon, heap[0][0]) if heap else horizon
+            end = max(pos + 1, int(np.searchsorted(times, limit, side = "right")))
+            out.append((times[pos:end], index, samples[pos:end]))
+
+            if end < len(times):
+                block[2] = end
+                heapq.heappush(heap, (times[end], index))
+            else:
+                queue.pop(0)
+                if queue:
+                    heapq.heappush(heap, (queue[0][0][queue[0][2]], index))
+
+        return out
+
+class _ResampleStream:
+    """!
+    The per-sensor state of IsmResampler. Not to be used outside this module
+    """
+    def __init__(self, period):
+        self.period = period
+        self.times = None # retained tail, seconds
+        self.values = None
+        self.wrap = 0 # counter wraps seen
+        self.lastTick = -1
+        self.runCount = 0 # samples so far sharing lastTick
+
+    def push(self, ticks, values, lsb):
         """!
-        Checks if data is ready for the accelerometer
+        Append samples with counter times, spreading samples that share a counter value one
+        batch period apart and dropping any that don't advance in time
+        """
+        np = _numpy()
+        ticks = np.asarray(ticks, dtype = np.int64)
+        known = ticks >= 0
+        ticks = ticks[known]
+        values = np.asarray(values, dtype = np.float64)[known]
+        if len(ticks) == 0:
+            return
 
-        @return **bool** If data is ready for the accelerometer
+        # Unwrap the 32-bit counter
+        prev = np.concatenate(([self.lastTick if self.lastTick >= 0 else ticks[0]], ticks[:-1]))
+        wraps = np.cumsum(ticks < prev - IsmSynchronizer.kCounterWrap // 2)
+        unwrapped = ticks + (self.wrap + wraps) * IsmSynchronizer.kCounterWrap
+
+        # Position of each sample within its run of equal counter values, continuing a run
+        # carried over from the previous block
+        index = np.arange(len(ticks))
+        starts = np.concatenate(([ticks[0] != self.lastTick], ticks[1:] != ticks[:-1]))
+        runStart = np.maximum.accumulate(np.where(starts, index, 0))
+        position = index - runStart
+        if not starts[0]:
+            position[runStart == 0] += self.runCount
+
+        times = unwrapped * lsb
+        if self.period:
+            times = times + position * self.period
+
+        self.wrap += int(wraps[-1])
+        self.lastTick = int(ticks[-1])
+        self.runCount = int(position[-1]) + 1
+
+        if self.times is not None:
+            times = np.concatenate((self.times, times))
+            values = np.concatenate((self.values, values))
+        ahead = np.concatenate(([True], times[1:] > np.maximum.accumulate(times)[:-1]))
+        self.times = times[ahead]
+        self.values = values[ahead]
+
+    def interpolate(self, grid, cubic):
+        """!
+        Interpolate the retained samples at the grid times
+        """
+        np = _numpy()
+        t, v = self.times, self.values
+        last = len(t) - 1
+
+        i = np.clip(np.searchsorted(t, grid, side = "right") - 1, 0, last - 1)
+        u = ((grid - t[i]) / (t[i + 1] - t[i]))[:, None]
+        p1, p2 = v[i], v[i + 1]
+        if not cubic:
+            return p1 + (p2 - p1) * u
+
+        # Catmull-Rom, with the end samples repeated at the edges of the retained data
+        p0 = v[np.maximum(i - 1, 0)]
+        p3 = v[np.minimum(i + 2, last)]
+        return p1 + 0.5 * u * (p2 - p0 + u * (2 * p0 - 5 * p1 + 4 * p2 - p3 +
+                                              u * (3 * (p1 - p2) + p3 - p0)))
+
+    def trim(self, time, keep):
+        """!
+        Drop samples no longer needed to interpolate from the given time on
+        """
+        np = _numpy()
+        i = max(0, int(np.searchsorted(self.times, time, side = "right")) - keep)
+        self.times = self.times[i:]
+        self.values = self.values[i:]
+
+class IsmResampler:
+    """!
+    Resamples accelerometer and gyroscope FIFO data, batched at different rates, onto one
+    uniform time grid of 6-channel rows (accelerometer x, y, z then gyroscope x, y, z)
+
+    Push each block decoded by QwiicISM330DHCX.decode_fifo() as it's read. Grid points are
+    emitted once both sensors have samples past them, so a block's output may wait for the
+    next block, and only the few samples the interpolation still needs are kept between
+    blocks. Samples need timestamps, so enable the timestamp counter and
+    set_fifo_timestamp_dec(). Samples that share a TIMESTAMP word (a decimation above 1) are
+    spread one batch period apart. Values stay in raw units, as floats. Requires NumPy.
+    """
+    kLinear = 0
+    kCubic = 1
+
+    def __init__(self, rate, method = kLinear, accel_rate = None, gyro_rate = None,
+                 resolution = QwiicISM330DHCX.kTimestampLsb):
+        """!
+        Constructor
+
+        @param float rate: The output rate in Hz
+        @param int method: The interpolation, kLinear or kCubic
+        @param float accel_rate: The accelerometer batch data rate in Hz, see kXlBdrHz
+        @param float gyro_rate: The gyroscope batch data rate in Hz, see kGyroBdrHz
+        @param float resolution: The timestamp resolution in seconds, see get_timestamp_resolution()
         """
-        status = self._i2c.readByte(self.address, self.kRegStatus)
+        self.rate = float(rate)
+        self.method = method
+        self.accel_rate = accel_rate
+        self.gyro_rate = gyro_rate
+        self.resolution = resolution
 
-        if status & self.kStatusMaskXlda:
-            return True
-        
-        return False
-    
-    def check_gyro_status(self):
+        self._keep = 2 if method == self.kCubic else 1 # samples needed before a grid point
+        self.reset()
+
+    def push(self, data):
         """!
-        Checks if data is ready for the gyroscope
+        Add a decoded FIFO block and resample as far as both sensors' data allows
+
+        @param IsmFifoData data: The block, from decode_fifo()
+
+        @return **tuple** (times, rows): the grid times in seconds on the timestamp counter's
+            timeline and an Nx6 float64 array, both empty if no grid point is complete yet
         """
-        status = self._i2c.readByte(self.address, self.kRegStatus)
+        self._streams[0].push(data.accelTime, data.accel, self.resolution)
+        self._streams[1].push(data.gyroTime, data.gyro, self.resolution)
+        return self._resample()
 
-        if status & self.kStatusMaskGda:
-            return True
-        
-        return False
-    
-    def check_temp_status(self):
+    def _resample(self):
         """!
-        Checks if data is ready for the temperature sensor
+        Emit the grid points covered by both sensors. Not to be used outside this class
         """
-        status = self._i2c.readByte(self.address, self.kRegStatus)
+        np = _numpy()
+        streams = self._streams
+        empty = (np.zeros(0), np.zeros((0, 6)))
+        if any(s.times is None or len(s.times) < 2 for s in streams):
+            return empty
 
-        if status & self.kStatusMaskTda:
-            return True
-        
-        return False
+        # Cubic interpolation needs one more sample on each side of a grid point
+        lookahead = 2 if self.method == self.kCubic else 1
+        if any(len(s.times) <= lookahead for s in streams):
+            return empty
+
+        if self._start is None:
+            self._start = max(s.times[self._keep - 1] for s in streams)
+        end = min(s.times[-lookahead] for s in streams)
+
+        last = int(math.floor((end - self._start) * self.rate))
+        if last < self._next:
+            return empty
+
+        grid = self._start + np.arange(self._next, last + 1) / self.rate
+        self._next = last + 1
+
+        cubic = self.method == self.kCubic
+        rows = np.hstack([s.interpolate(grid, cubic) for s in streams])
+
+        nextTime = self._start + self._next / self.rate
+        for s in streams:
+            s.trim(nextTime, self._keep)
+
+        return grid, rows
+
+    def reset(self):
+        """!
+        Start over, e.g. after the FIFO or the timestamp counter was reset
+        """
+        self._streams = [_ResampleStream(1.0 / self.accel_rate if self.accel_rate else None),
+                         _ResampleStream(1.0 / self.gyro_rate if self.gyro_rate else None)]
+        self._start = None # time of grid point 0
+        self._next = 0 # index of the next grid point to emit
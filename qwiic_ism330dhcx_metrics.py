@@ -0,0 +1,162 @@
+#-------------------------------------------------------------------------------
+# qwiic_ism330dhcx_metrics.py
+#
+# Prometheus metrics endpoint for the SparkFun Qwiic ISM330DHCX, available here:
+# https://www.sparkfun.com/products/19764
+#-------------------------------------------------------------------------------
+# Written by SparkFun Electronics, December 2024
+#
+# This python library supports the SparkFun Electroncis Qwiic ecosystem
+#
+# More information on Qwiic is at https://www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#===============================================================================
+# Copyright (c) 2023 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#===============================================================================
+
+"""!
+qwiic_ism330dhcx_metrics
+============
+Renders the acquisition health metrics of [SparkFun Qwiic ISM330DHCX](https://www.sparkfun.com/products/19764)
+devices in the Prometheus text format and serves them over HTTP. Needs threads and
+http.server, so it isn't available on MicroPython or CircuitPython.
+
+Collect the metrics with QwiicISM330DHCX.enable_metrics(registry = IsmMetricsRegistry.shared).
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+class IsmMetricsRegistry:
+    """!
+    Collects the metrics of several devices and renders them in the Prometheus text format,
+    optionally serving them over HTTP
+    """
+    kHelp = {
+        "bus_reads_total": ("counter", "Bus read transfers"),
+        "bus_writes_total": ("counter", "Bus write transfers"),
+        "bus_errors_total": ("counter", "Failed bus transfers"),
+        "bus_retries_total": ("counter", "Retried bus transfers"),
+        "bank_switches_total": ("counter", "Memory bank switches"),
+        "samples_total": ("counter", "Samples read"),
+        "sample_rate_hz": ("gauge", "Achieved sample rate"),
+        "odr_hz": ("gauge", "Configured output data rate"),
+        "fifo_level": ("gauge", "FIFO fill level in words at the last status read"),
+        "fifo_overruns_total": ("counter", "Times the FIFO filled or overran"),
+        "read_latency_seconds": ("summary", "Bus read latency, quantiles over the recent reads"),
+    }
+    kPrefix = "ism330dhcx_"
+
+    def __init__(self):
+        self._metrics = []
+        self._server = None
+
+    def register(self, metrics):
+        """!
+        Add a device's metrics
+
+        @param IsmMetrics metrics: The metrics
+        """
+        if metrics not in self._metrics:
+            self._metrics = self._metrics + [metrics]
+
+    def unregister(self, metrics):
+        """!
+        Remove a device's metrics
+
+        @param IsmMetrics metrics: The metrics
+        """
+        self._metrics = [m for m in self._metrics if m is not metrics]
+
+    def render(self):
+        """!
+        Render every registered device's metrics
+
+        @return **str** The metrics in the Prometheus text exposition format
+        """
+        byName = {}
+        order = []
+        for metrics in self._metrics:
+            device = 'device="%s"' % metrics.name
+            for name, labels, value in metrics.samples():
+                # The _sum and _count series of a summary belong to its family
+                family = name
+                if name not in self.kHelp:
+                    family = name.rsplit("_", 1)[0]
+                if family not in byName:
+                    byName[family] = []
+                    order.append(family)
+                labels = device + ("," + labels if labels else "")
+                byName[family].append("%s%s{%s} %s" % (self.kPrefix, name, labels, repr(float(value))))
+
+        lines = []
+        for name in order:
+            kind, text = self.kHelp[name]
+            lines.append("# HELP %s%s %s" % (self.kPrefix, name, text))
+            lines.append("# TYPE %s%s %s" % (self.kPrefix, name, kind))
+            lines += byName[name]
+
+        return "\n".join(lines) + "\n"
+
+    def serve_http(self, port = 9330, host = "127.0.0.1"):
+        """!
+        Serve the metrics at /metrics over HTTP from a background thread
+
+        @param int port: The port to listen on, 0 for any
+        @param str host: The address to listen on
+
+        @return **tuple** The address and port being served
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.stop_http()
+        self._server = HTTPServer((host, port), Handler)
+        thread = threading.Thread(target = self._server.serve_forever, daemon = True)
+        thread.start()
+
+        return self._server.server_address
+
+    def stop_http(self):
+        """!
+        Stop serving the metrics over HTTP
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+IsmMetricsRegistry.shared = IsmMetricsRegistry()
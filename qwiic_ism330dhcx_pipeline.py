@@ -0,0 +1,535 @@
+#-------------------------------------------------------------------------------
+# qwiic_ism330dhcx_pipeline.py
+#
+# Processing pipeline for the SparkFun Qwiic ISM330DHCX, available here:
+# https://www.sparkfun.com/products/19764
+#-------------------------------------------------------------------------------
+# Written by SparkFun Electronics, December 2024
+#
+# This python library supports the SparkFun Electroncis Qwiic ecosystem
+#
+# More information on Qwiic is at https://www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#===============================================================================
+# Copyright (c) 2023 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#===============================================================================
+
+"""!
+qwiic_ism330dhcx_pipeline
+============
+Processing pipeline for [SparkFun Qwiic ISM330DHCX](https://www.sparkfun.com/products/19764)
+data: a source reading the device in blocks, a chain of stages (unit conversion, calibration,
+decimation, statistics, custom functions, sinks) and a runner that gives each stage its own
+thread. Needs NumPy and threads, so it isn't available on MicroPython or CircuitPython.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from qwiic_ism330dhcx import IsmStats, _monotonic, _numpy
+
+class IsmPipelineSource:
+    """!
+    Reads a device for IsmPipeline in blocks of 6-channel rows: raw accelerometer x, y, z then
+    raw gyroscope x, y, z, as float64
+
+    FIFO reads drain the FIFO in one burst per block and pair accelerometer and gyroscope
+    samples in order, which needs equal batch data rates, or resample them with an
+    IsmResampler. Direct reads wait for each sample and fetch both sensors' output registers in
+    one 12-byte read, so they cost a status poll and a transfer per sample and are only meant
+    for low data rates; use the FIFO above a few hundred Hz. Requires NumPy.
+    """
+    def __init__(self, device, fifo = False, block_size = 32, resampler = None):
+        """!
+        Constructor
+
+        @param QwiicISM330DHCX device: The device to read
+        @param bool fifo: Read the FIFO instead of the output registers
+        @param int block_size: The number of samples per block for direct reads
+        @param IsmResampler resampler: Resample FIFO data instead of pairing it
+        """
+        self.device = device
+        self.fifo = fifo
+        self.block_size = block_size
+        self.resampler = resampler
+
+        self._accel = None # unpaired FIFO samples carried to the next read
+        self._gyro = None
+
+    def read(self):
+        """!
+        Read the next block
+
+        @return **ndarray** An Nx6 block, possibly empty, or `None` if no data arrived in time
+        """
+        np = _numpy()
+        dev = self.device
+
+        if not self.fifo:
+            rows = np.empty((self.block_size, 6))
+            count = 0
+            while count < self.block_size and dev.wait_for_data():
+                # The gyroscope outputs are followed by the accelerometer outputs
+                with dev._lock:
+                    regs = dev._read_block(dev.kRegOutXLG, 12)
+                sample = np.frombuffer(bytes(regs), dtype = "<i2")
+                rows[count, :3] = sample[3:]
+                rows[count, 3:] = sample[:3]
+                count += 1
+
+            if dev._metrics is not None:
+                dev._metrics.count_samples(True, count)
+                dev._metrics.count_samples(False, count)
+            return rows[:count] if count else None
+
+        with dev._lock:
+            buf, words = dev.read_fifo()
+            if words is None:
+                return np.zeros((0, 6))
+            data = dev.decode_fifo(words)
+
+        if self.resampler is not None:
+            return self.resampler.push(data)[1]
+
+        accel, gyro = data.accel, data.gyro
+        if self._accel is not None:
+            accel = np.concatenate((self._accel, accel))
+            gyro = np.concatenate((self._gyro, gyro))
+
+        count = min(len(accel), len(gyro))
+        self._accel, self._gyro = accel[count:], gyro[count:]
+        return np.hstack((accel[:count], gyro[:count])).astype(np.float64)
+
+class IsmPipelineStage:
+    """!
+    A step of an IsmPipeline. Subclasses override process() and, if they hold samples back
+    between blocks, flush()
+
+    A stage sees its blocks in order from one thread, unless it runs with several workers,
+    which is only safe for stages that keep no state between blocks.
+    """
+    def __init__(self, name = None, workers = 1):
+        """!
+        Constructor
+
+        @param str name: The name the stage's counters are reported under
+        @param int workers: The number of blocks processed concurrently on a thread pool
+        """
+        self.name = name or type(self).__name__
+        self.workers = workers
+        self._counterLock = threading.Lock() # workers of a thread pool update the counters concurrently
+        self.reset_counters()
+
+    def process(self, block):
+        """!
+        Process a block
+
+        @param ndarray block: The block, an NxC array
+
+        @return **ndarray** The block to pass on, or `None` to pass nothing on
+        """
+        return block
+
+    def flush(self):
+        """!
+        Called when the pipeline stops
+
+        @return **ndarray** Any samples held back, or `None`
+        """
+        return None
+
+    def reset_counters(self):
+        """!
+        Clear the throughput and latency counters
+        """
+        with self._counterLock:
+            self._reset_counters()
+
+    def _reset_counters(self):
+        """!
+        reset_counters() with the counter lock held. Not to be used outside this module
+        """
+        self.blocks = 0
+        self.rows = 0
+        self.busy = 0.0 # seconds spent in process()
+        self.latency = 0.0 # seconds from the block's source read to the end of process()
+        self.max_latency = 0.0
+        self._latencySum = 0.0
+        self._first = None
+        self._last = None
+
+    def _account(self, rows, start, end, readTime):
+        """!
+        Record one processed block. Not to be used outside this module
+        """
+        with self._counterLock:
+            if self._first is None or start < self._first:
+                self._first = start
+            if self._last is None or end > self._last:
+                self._last = end
+            self.blocks += 1
+            self.rows += rows
+            self.busy += end - start
+            self.latency = end - readTime
+            self.max_latency = max(self.max_latency, self.latency)
+            self._latencySum += self.latency
+
+    def counters(self):
+        """!
+        Get the stage's counters
+
+        @return **dict** blocks and rows processed, throughput in rows per second, busy time and
+            utilization (above 1 when several workers overlap), and the last, mean and largest
+            latency in seconds
+        """
+        with self._counterLock:
+            elapsed = (self._last - self._first) if self.blocks else 0.0
+            return {"blocks": self.blocks, "rows": self.rows,
+                    "throughput": self.rows / elapsed if elapsed > 0 else 0.0,
+                    "busy": self.busy, "utilization": self.busy / elapsed if elapsed > 0 else 0.0,
+                    "latency": self.latency, "max_latency": self.max_latency,
+                    "mean_latency": self._latencySum / self.blocks if self.blocks else 0.0}
+
+class IsmUnitStage(IsmPipelineStage):
+    """!
+    Converts raw 6-channel rows to mg and mdps using the device's full scale settings
+    """
+    def __init__(self, device, name = None, workers = 1):
+        """!
+        Constructor
+
+        @param QwiicISM330DHCX device: The device the samples come from, with its full scales set
+        @param str name: The name the stage's counters are reported under
+        @param int workers: The number of blocks processed concurrently on a thread pool
+        """
+        IsmPipelineStage.__init__(self, name, workers)
+
+        accel = {
+            device.kXlFs2g: device.convert_2g_to_mg,
+            device.kXlFs4g: device.convert_4g_to_mg,
+            device.kXlFs8g: device.convert_8g_to_mg,
+            device.kXlFs16g: device.convert_16g_to_mg
+        }
+        gyro = {
+            device.kGyroFs125dps: device.convert_125dps_to_mdps,
+            device.kGyroFs250dps: device.convert_250dps_to_mdps,
+            device.kGyroFs500dps: device.convert_500dps_to_mdps,
+            device.kGyroFs1000dps: device.convert_1000dps_to_mdps,
+            device.kGyroFs2000dps: device.convert_2000dps_to_mdps,
+            device.kGyroFs4000dps: device.convert_4000dps_to_mdps
+        }
+        xl = accel[device.get_accel_full_scale()](1.0)
+        gy = gyro[device.get_gyro_full_scale()](1.0)
+        self.scale = _numpy().array([xl, xl, xl, gy, gy, gy])
+
+    def process(self, block):
+        return block * self.scale
+
+class IsmCalibrationStage(IsmPipelineStage):
+    """!
+    Applies a bias and a correction matrix: out = (block - bias) x matrix transposed
+    """
+    def __init__(self, bias = None, matrix = None, name = None, workers = 1):
+        """!
+        Constructor
+
+        @param bias: The per-channel bias, or `None` for none
+        @param matrix: The CxC correction matrix (scale, cross-axis and misalignment), or `None`
+        @param str name: The name the stage's counters are reported under
+        @param int workers: The number of blocks processed concurrently on a thread pool
+        """
+        IsmPipelineStage.__init__(self, name, workers)
+
+        np = _numpy()
+        self.bias = None if bias is None else np.asarray(bias, dtype = np.float64)
+        self.matrix = None if matrix is None else np.asarray(matrix, dtype = np.float64).T
+
+    def process(self, block):
+        if self.bias is not None:
+            block = block - self.bias
+        if self.matrix is not None:
+            block = block.dot(self.matrix)
+        return block
+
+class IsmDecimateStage(IsmPipelineStage):
+    """!
+    Averages each run of factor rows into one, carrying leftover rows to the next block
+    """
+    def __init__(self, factor, name = None):
+        """!
+        Constructor
+
+        @param int factor: The number of rows averaged into each output row
+        @param str name: The name the stage's counters are reported under
+        """
+        IsmPipelineStage.__init__(self, name)
+        self.factor = factor
+        self._carry = None
+
+    def process(self, block):
+        np = _numpy()
+        if self._carry is not None:
+            block = np.concatenate((self._carry, block))
+
+        count = len(block) // self.factor * self.factor
+        self._carry = block[count:]
+        if count == 0:
+            return None
+        return block[:count].reshape(-1, self.factor, block.shape[1]).mean(axis = 1)
+
+class IsmFunctionStage(IsmPipelineStage):
+    """!
+    Applies a function to each block, e.g. a sensor fusion filter
+    """
+    def __init__(self, func, name = None, workers = 1):
+        """!
+        Constructor
+
+        @param func: Called with each block, returns the block to pass on or `None`
+        @param str name: The name the stage's counters are reported under
+        @param int workers: The number of blocks processed concurrently on a thread pool. Only
+            use more than one if func keeps no state between blocks
+        """
+        IsmPipelineStage.__init__(self, name or getattr(func, "__name__", None), workers)
+        self.func = func
+
+    def process(self, block):
+        return self.func(block)
+
+class IsmStatsStage(IsmPipelineStage):
+    """!
+    Accumulates IsmStats of 6-channel rows and passes the blocks on unchanged
+    """
+    def __init__(self, name = None):
+        """!
+        Constructor
+
+        @param str name: The name the stage's counters are reported under
+        """
+        IsmPipelineStage.__init__(self, name)
+        self.accel = IsmStats()
+        self.gyro = IsmStats()
+
+    def process(self, block):
+        self.accel.update(block[:, :3])
+        self.gyro.update(block[:, 3:6])
+        return block
+
+class IsmSinkStage(IsmPipelineStage):
+    """!
+    Ends a pipeline by handing each block to a function, or by keeping the blocks
+    """
+    def __init__(self, func = None, name = None):
+        """!
+        Constructor
+
+        @param func: Called with each block, or `None` to append the blocks to self.blocks_out
+        @param str name: The name the stage's counters are reported under
+        """
+        IsmPipelineStage.__init__(self, name)
+        self.func = func
+        self.blocks_out = []
+
+    def process(self, block):
+        if self.func is None:
+            self.blocks_out.append(block)
+        else:
+            self.func(block)
+        return None
+
+class IsmPipeline:
+    """!
+    Runs an IsmPipelineSource through a chain of IsmPipelineStage objects
+
+    run() does everything on the calling thread. start() runs the source and each stage on
+    its own thread, connected by bounded queues: when a stage falls behind its input queue
+    fills and the stages before it block, down to the source, so the backlog builds up in
+    the device's FIFO rather than in memory. Stages with several workers process that many
+    blocks at a time on a thread pool and pass them on in order.
+    """
+    def __init__(self, source, stages, queue_size = 4):
+        """!
+        Constructor
+
+        @param IsmPipelineSource source: The source of the blocks
+        @param list stages: The stages, in order
+        @param int queue_size: The number of blocks each queue between threads can hold
+        """
+        self.source = source
+        self.stages = list(stages)
+        self.queue_size = queue_size
+
+        self._threads = []
+        self._running = False
+        self._error = None
+
+    def _run_stage(self, stage, readTime, block):
+        """!
+        Process a block and record the stage's counters. Not to be used outside this class
+        """
+        start = _monotonic()
+        out = stage.process(block)
+        stage._account(len(block), start, _monotonic(), readTime)
+        return out
+
+    def _push(self, readTime, block, first = 0):
+        """!
+        Pass a block through the stages on the calling thread. Not to be used outside this class
+        """
+        for stage in self.stages[first:]:
+            if block is None or len(block) == 0:
+                return
+            block = self._run_stage(stage, readTime, block)
+
+    def _flush(self, first = 0):
+        """!
+        Flush the stages in order, passing what each holds back through the rest. Not to be
+        used outside this class
+        """
+        for i in range(first, len(self.stages)):
+            block = self.stages[i].flush()
+            if block is not None:
+                self._push(_monotonic(), block, i + 1)
+
+    def run(self, blocks = None, duration = None):
+        """!
+        Run the pipeline on the calling thread, then flush it
+
+        @param int blocks: The number of source reads, or `None` for no limit
+        @param float duration: The run time in seconds, or `None` for no limit
+        """
+        deadline = None if duration is None else _monotonic() + duration
+        count = 0
+        while (blocks is None or count < blocks) and (deadline is None or _monotonic() < deadline):
+            readTime = _monotonic()
+            block = self.source.read()
+            count += 1
+            if block is not None:
+                self._push(readTime, block)
+
+        self._flush()
+
+    def start(self):
+        """!
+        Start the source and every stage on their own threads
+        """
+        self._running = True
+        self._error = None
+        queues = [queue.Queue(self.queue_size) for stage in self.stages]
+
+        self._threads = [threading.Thread(target = self._source_loop, args = (queues[0],), daemon = True)]
+        for i, stage in enumerate(self.stages):
+            out = queues[i + 1] if i + 1 < len(queues) else None
+            self._threads.append(threading.Thread(target = self._stage_loop, daemon = True,
+                                                  args = (stage, queues[i], out)))
+        for thread in self._threads:
+            thread.start()
+
+    def _source_loop(self, out):
+        """!
+        Read blocks until stopped. Not to be used outside this class
+        """
+        try:
+            while self._running:
+                readTime = _monotonic()
+                block = self.source.read()
+                if block is not None and len(block):
+                    out.put((readTime, block))
+        except Exception as e:
+            self._error = e
+            self._running = False
+        finally:
+            out.put(None)
+
+    def _stage_loop(self, stage, inQueue, outQueue):
+        """!
+        Process blocks until the end marker arrives. Not to be used outside this class
+        """
+        pool = None
+        if stage.workers > 1:
+            pool = ThreadPoolExecutor(stage.workers)
+
+        done = False
+        try:
+            while not done:
+                # Take up to one block per worker, without waiting for more than the first
+                items = [inQueue.get()]
+                while items[-1] is not None and len(items) < stage.workers:
+                    try:
+                        items.append(inQueue.get_nowait())
+                    except queue.Empty:
+                        break
+                if items[-1] is None:
+                    items.pop()
+                    done = True
+
+                if pool is not None and len(items) > 1:
+                    futures = [pool.submit(self._run_stage, stage, t, b) for t, b in items]
+                    results = [(t, f.result()) for (t, b), f in zip(items, futures)]
+                else:
+                    results = [(t, self._run_stage(stage, t, b)) for t, b in items]
+
+                if outQueue is not None:
+                    for readTime, block in results:
+                        if block is not None and len(block):
+                            outQueue.put((readTime, block))
+
+            block = stage.flush()
+            if outQueue is not None and block is not None and len(block):
+                outQueue.put((_monotonic(), block))
+        except Exception as e:
+            self._error = e
+            self._running = False
+            # Keep draining until the end marker, unless it already came, so the threads
+            # upstream don't block forever
+            while not done:
+                done = inQueue.get() is None
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            if outQueue is not None:
+                outQueue.put(None)
+
+    def stop(self, timeout = None):
+        """!
+        Stop the source, let the stages finish the blocks already read and flush, then wait for
+        the threads to end. Re-raises any error raised on a pipeline thread
+
+        @param float timeout: The maximum time to wait for each thread in seconds, or `None`
+        """
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def counters(self):
+        """!
+        Get every stage's counters
+
+        @return **dict** The IsmPipelineStage.counters() of each stage, keyed by stage name
+        """
+        return dict((stage.name, stage.counters()) for stage in self.stages)
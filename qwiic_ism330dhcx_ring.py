@@ -0,0 +1,298 @@
+#-------------------------------------------------------------------------------
+# qwiic_ism330dhcx_ring.py
+#
+# Shared memory sample ring for the SparkFun Qwiic ISM330DHCX, available here:
+# https://www.sparkfun.com/products/19764
+#-------------------------------------------------------------------------------
+# Written by SparkFun Electronics, December 2024
+#
+# This python library supports the SparkFun Electroncis Qwiic ecosystem
+#
+# More information on Qwiic is at https://www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#===============================================================================
+# Copyright (c) 2023 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#===============================================================================
+
+"""!
+qwiic_ism330dhcx_ring
+============
+Shared memory sample ring for the [SparkFun Qwiic ISM330DHCX](https://www.sparkfun.com/products/19764)
+driver, for handing FIFO data from the process that owns the device to other processes on
+the same host without copying. Requires NumPy and multiprocessing.shared_memory, so it isn't
+available on MicroPython or CircuitPython.
+"""
+
+import sys
+import time
+
+from qwiic_ism330dhcx import _monotonic, _numpy
+
+# SharedMemory takes track = False from Python 3.13
+_kShmTrackArg = sys.version_info >= (3, 13)
+
+# Shared memory ring layout. The header is 8 uint64 words (magic, slot count, rows per
+# slot, columns, write sequence, slot size) followed by the dtype string, NUL padded to 16
+# bytes. Each slot holds its sequence number, its row count and a float64 timestamp,
+# followed by the data
+_kRingMagic = 0x49534D52494E4701
+_kRingHeaderSize = 128
+_kRingDtypeOffset = 64
+_kRingDtypeSize = 16
+_kRingSlotHeaderSize = 24
+
+class IsmRingPublisher:
+    """!
+    Publishes sample blocks into a multiprocessing.shared_memory ring for IsmRingSubscriber
+
+    Blocks are numbered from 1 as they are published. A slot is invalidated before it's
+    overwritten and its sequence number written last, so subscribers can tell a complete block
+    from one being overwritten. Requires NumPy.
+
+    Typically each FIFO read is published, e.g. publish(device.decode_fifo(words).accel).
+    """
+    def __init__(self, name = None, slots = 64, rows = 512, columns = 3, dtype = "<i2"):
+        """!
+        Constructor. Creates the shared memory block
+
+        @param str name: The shared memory name, or `None` for a generated one (see `name`)
+        @param int slots: The number of blocks the ring holds
+        @param int rows: The maximum number of rows in a block
+        @param int columns: The number of columns in a block
+        @param str dtype: The NumPy type of the samples. Structured, void and object types
+            aren't supported
+
+        @raise ValueError: If the type can't be stored in the ring header
+        """
+        from multiprocessing import shared_memory
+        np = _numpy()
+
+        self.slots = slots
+        self.rows = rows
+        self.columns = columns
+        self.dtype = np.dtype(dtype)
+
+        # Subscribers rebuild the type from its string, which only describes simple types
+        dtypeStr = self.dtype.str.encode()
+        if self.dtype.kind in "OV":
+            raise ValueError("the ring only holds simple sample types, not %s" % self.dtype)
+        if len(dtypeStr) > _kRingDtypeSize:
+            raise ValueError("the ring header holds type strings of up to %d bytes" % _kRingDtypeSize)
+
+        dataSize = rows * columns * self.dtype.itemsize
+        self._slotSize = (_kRingSlotHeaderSize + dataSize + 7) // 8 * 8
+
+        self._shm = shared_memory.SharedMemory(name = name, create = True,
+                                               size = _kRingHeaderSize + slots * self._slotSize)
+        self.name = self._shm.name
+
+        self._header = np.ndarray((8,), dtype = "<u8", buffer = self._shm.buf)
+        self._header[:6] = [0, slots, rows, columns, 0, self._slotSize]
+        self._shm.buf[_kRingDtypeOffset:_kRingDtypeOffset + len(dtypeStr)] = dtypeStr
+        self._header[0] = _kRingMagic # marks the header complete
+
+        self._slotHeaders = []
+        self._slotData = []
+        for i in range(slots):
+            offset = _kRingHeaderSize + i * self._slotSize
+            self._slotHeaders.append(np.ndarray((3,), dtype = "<u8", buffer = self._shm.buf, offset = offset))
+            self._slotData.append(np.ndarray((rows, columns), dtype = self.dtype, buffer = self._shm.buf,
+                                             offset = offset + _kRingSlotHeaderSize))
+
+        self.seq = 0
+
+    def publish(self, block, timestamp = None):
+        """!
+        Publish a block of samples
+
+        @param block: An array of up to `rows` rows of `columns` values
+        @param float timestamp: The time of the block, defaults to now on the _monotonic() clock
+
+        @return **int** The block's sequence number
+        """
+        count = len(block)
+        if count > self.rows:
+            raise ValueError("block has %d rows, the ring holds %d" % (count, self.rows))
+
+        if timestamp is None:
+            timestamp = _monotonic()
+
+        self.seq += 1
+        slot = (self.seq - 1) % self.slots
+        header = self._slotHeaders[slot]
+
+        header[0] = 0 # invalid while being written
+        self._slotData[slot][:count] = block
+        header[1] = count
+        header[2:3].view("<f8")[0] = timestamp
+        header[0] = self.seq
+        self._header[4] = self.seq
+
+        return self.seq
+
+    def close(self, unlink = True):
+        """!
+        Detach from the shared memory, and free it unless subscribers still need it
+
+        @param bool unlink: Free the shared memory block
+        """
+        if self._header is None:
+            return # already closed
+
+        self._header = None
+        self._slotHeaders = []
+        self._slotData = []
+        self._shm.close()
+        if unlink:
+            # A subscriber in this process that attached without track=False unregistered
+            # the block from the tracker shared with this publisher, see
+            # _attach_shared_memory(). Registering again is harmless otherwise, and keeps
+            # unlink() from unregistering a block the tracker doesn't know about
+            if not _kShmTrackArg:
+                from multiprocessing import resource_tracker
+                resource_tracker.register(self._shm._name, "shared_memory")
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass # already freed, e.g. by another process's resource tracker
+
+def _attach_shared_memory(name):
+    """!
+    Attach to an existing shared memory block without leaving it registered with the
+    resource tracker, which would free the block when this process exits. Not to be used
+    outside this module
+
+    @param str name: The shared memory name
+
+    @return **SharedMemory** The attached block
+    """
+    from multiprocessing import shared_memory
+
+    if _kShmTrackArg:
+        return shared_memory.SharedMemory(name = name, track = False)
+
+    # Before Python 3.13 attaching always registers the block, so unregister just this one
+    from multiprocessing import resource_tracker
+    shm = shared_memory.SharedMemory(name = name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+class IsmRingSubscriber:
+    """!
+    Reads the blocks published by an IsmRingPublisher in another process, without copying
+
+    The returned arrays are views into the shared memory, so the publisher overwrites them once
+    it laps the ring. Call valid() after using a block to check that it wasn't overwritten in
+    the meantime. If the subscriber falls more than a ring behind, it skips to the oldest
+    block still in the ring and counts the blocks lost in `lapped`.
+    """
+    def __init__(self, name, latest = True):
+        """!
+        Constructor. Attaches to the shared memory block
+
+        @param str name: The name of the publisher's shared memory
+        @param bool latest: Start from the next block published, otherwise from the oldest in the ring
+        """
+        np = _numpy()
+
+        self._shm = _attach_shared_memory(name)
+        self._header = np.ndarray((8,), dtype = "<u8", buffer = self._shm.buf)
+        if int(self._header[0]) != _kRingMagic:
+            raise ValueError("%s isn't a sample ring" % name)
+
+        self.slots, self.rows, self.columns = [int(val) for val in self._header[1:4]]
+        slotSize = int(self._header[5])
+        dtypeStr = bytes(self._shm.buf[_kRingDtypeOffset:_kRingDtypeOffset + _kRingDtypeSize])
+        self.dtype = np.dtype(dtypeStr.rstrip(b"\0").decode())
+
+        self._slotHeaders = []
+        self._slotData = []
+        for i in range(self.slots):
+            offset = _kRingHeaderSize + i * slotSize
+            self._slotHeaders.append(np.ndarray((3,), dtype = "<u8", buffer = self._shm.buf, offset = offset))
+            self._slotData.append(np.ndarray((self.rows, self.columns), dtype = self.dtype,
+                                             buffer = self._shm.buf, offset = offset + _kRingSlotHeaderSize))
+
+        written = int(self._header[4])
+        self.next = written + 1 if latest else max(1, written - self.slots + 1)
+        self.lapped = 0
+        self.received = 0
+
+    def read(self, timeout = 0):
+        """!
+        Get the next block
+
+        @param float timeout: The time to wait for a block in seconds
+
+        @return **tuple** The sequence number, the timestamp and a view of the block's rows, or
+            `None` if no block arrived in time
+        """
+        deadline = _monotonic() + timeout
+        while True:
+            written = int(self._header[4])
+
+            if written - self.next >= self.slots:
+                oldest = written - self.slots + 1
+                self.lapped += oldest - self.next
+                self.next = oldest
+
+            if written >= self.next:
+                slot = (self.next - 1) % self.slots
+                header = self._slotHeaders[slot]
+                count = int(header[1])
+                timestamp = float(header[2:3].view("<f8")[0])
+
+                # The sequence number is checked after copying the header, since the publisher
+                # invalidates it before touching the rest of the slot
+                if int(header[0]) == self.next:
+                    seq = self.next
+                    self.next += 1
+                    self.received += 1
+                    return (seq, timestamp, self._slotData[slot][:count])
+
+                # Overwritten while we looked, so we were lapped
+                self.lapped += 1
+                self.next += 1
+                continue
+
+            if _monotonic() >= deadline:
+                return None
+            time.sleep(0.0005)
+
+    def valid(self, seq):
+        """!
+        Checks that a block returned by read() hasn't been overwritten since
+
+        @param int seq: The block's sequence number
+
+        @return **bool** `True` if the block's view still holds that block
+        """
+        return int(self._slotHeaders[(seq - 1) % self.slots][0]) == seq
+
+    def close(self):
+        """!
+        Detach from the shared memory. Views returned by read() must not be used afterwards
+        """
+        self._header = None
+        self._slotHeaders = []
+        self._slotData = []
+        self._shm.close()
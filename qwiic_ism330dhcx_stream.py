@@ -0,0 +1,493 @@
+#-------------------------------------------------------------------------------
+# qwiic_ism330dhcx_stream.py
+#
+# Socket streaming server for the SparkFun Qwiic ISM330DHCX, available here:
+# https://www.sparkfun.com/products/19764
+#-------------------------------------------------------------------------------
+# Written by SparkFun Electronics, December 2024
+#
+# This python library supports the SparkFun Electroncis Qwiic ecosystem
+#
+# More information on Qwiic is at https://www.sparkfun.com/qwiic
+#
+# Do you like this library? Help support SparkFun. Buy a board!
+#===============================================================================
+# Copyright (c) 2023 SparkFun Electronics
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#===============================================================================
+
+"""!
+qwiic_ism330dhcx_stream
+============
+Streams FIFO data from a [SparkFun Qwiic ISM330DHCX](https://www.sparkfun.com/products/19764)
+to local subscribers over a UNIX-domain or localhost TCP socket. Requires NumPy and sockets,
+so it isn't available on MicroPython or CircuitPython.
+
+Run `python -m qwiic_ism330dhcx_stream serve --help` for the command line server.
+"""
+
+import argparse
+import os
+import selectors
+import socket
+import stat
+import struct
+import sys
+
+from qwiic_ism330dhcx import QwiicISM330DHCX, IsmConfig, _AVAILABLE_I2C_ADDRESS, _monotonic, _numpy
+
+def _remove_socket(path):
+    """!
+    Remove a UNIX-domain socket file, leaving any other kind of file alone. Not to be used
+    outside this module
+
+    @param str path: The socket path
+
+    @return **bool** `False` if something other than a socket is at the path
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return True
+
+    if not stat.S_ISSOCK(mode):
+        return False
+
+    os.unlink(path)
+    return True
+
+class _StreamSubscriber:
+    # A connected client of IsmStreamServer and its queue of frames waiting to be sent
+    def __init__(self, sock, peer):
+        self.sock = sock
+        self.peer = peer
+        self.queue = []
+        self.pending = None # memoryview of the unsent part of the frame being sent
+        self.frames = 0
+        self.dropped = 0
+
+class IsmStreamServer:
+    """!
+    Streams FIFO data from one device to any number of local subscribers over a UNIX-domain
+    or localhost TCP socket, so several processes can share the device
+
+    Every frame is a little endian uint32 length, counting the type byte and the payload,
+    then a type byte and the payload:
+        - kFrameConfig: accelerometer and gyroscope full scale codes (2 x uint8), their output
+          data rates in Hz (2 x float32), then the user bank registers 0x07 - 0x19. Sent to
+          each subscriber first, and to every subscriber when a new one connects after the
+          configuration has changed, or when refresh_config() finds it has
+        - kFrameAccel, kFrameGyro, kFrameTemp: a block of samples. A uint32 sequence number
+          (per stream), the host time of the read (float64), the sample count N (uint32),
+          then N x 3 (N for temperature) int16 raw samples and N int64 device timestamps
+          (-1 when not known, see QwiicISM330DHCX.decode_fifo())
+
+    Each subscriber has its own bounded queue. When a subscriber doesn't keep up, new sample
+    frames for it are dropped and counted instead of holding up the device or other
+    subscribers. Configuration frames are never dropped.
+    The FIFO should be set up to batch the sensors; requires NumPy.
+    """
+    kFrameConfig = 1
+    kFrameAccel = 2
+    kFrameGyro = 3
+    kFrameTemp = 4
+
+    def __init__(self, device, path = None, host = "127.0.0.1", port = 0, queue_frames = 64,
+                 poll_interval = 0.01):
+        """!
+        Constructor. Opens the listening socket
+
+        @param QwiicISM330DHCX device: The device to stream
+        @param str path: The UNIX-domain socket path, or `None` to use TCP
+        @param str host: The TCP address to listen on
+        @param int port: The TCP port to listen on, 0 for any (see `address`)
+        @param int queue_frames: The number of frames queued per subscriber before dropping
+        @param float poll_interval: The time between FIFO reads in seconds
+        """
+        self.device = device
+        self.path = path
+        self.queue_frames = queue_frames
+        self.poll_interval = poll_interval
+
+        if path is not None:
+            # Only a socket left behind by an earlier server is removed
+            if not _remove_socket(path):
+                raise ValueError("%s exists and is not a socket" % path)
+            self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._listener.bind(path)
+        else:
+            self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._listener.bind((host, port))
+        self.address = self._listener.getsockname()
+
+        self._listener.listen(8)
+        self._listener.setblocking(False)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+
+        self.subscribers = []
+        self.frames = 0
+        self.dropped = 0
+        self.overruns = 0
+        self._seq = {self.kFrameAccel: 0, self.kFrameGyro: 0, self.kFrameTemp: 0}
+        self._config = self.config_frame()
+        self._nextRead = _monotonic()
+
+    def config_frame(self):
+        """!
+        Build a configuration frame from the device's current settings
+
+        @return **bytes** The frame
+        """
+        D = QwiicISM330DHCX
+        dev = self.device
+        with dev._lock:
+            regs = bytes(dev._read_block(D.kRegFifoCtrl1, D.kRegCtrl10C - D.kRegFifoCtrl1 + 1))
+            dev._sync_config_cache()
+
+        xlHz = D.kXlOdrHz[dev._odrAccel] if dev._odrAccel is not None else 0
+        gyHz = D.kGyroOdrHz[dev._odrGyro] if dev._odrGyro is not None else 0
+        payload = struct.pack("<BBff", dev._fullScaleAccel, dev._fullScaleGyro, xlHz, gyHz) + regs
+
+        return self._frame(self.kFrameConfig, payload)
+
+    def refresh_config(self):
+        """!
+        Read the device's settings again and send every subscriber a new configuration frame
+        if they have changed. Call it after reconfiguring the device while streaming
+
+        @return **bool** `True` if the configuration changed
+        """
+        frame = self.config_frame()
+        if frame == self._config:
+            return False
+
+        self._config = frame
+        self._broadcast(frame, always = True)
+
+        return True
+
+    def _frame(self, kind, payload):
+        """!
+        Add the length and type to a payload. Not to be used outside this class
+        """
+        return struct.pack("<IB", len(payload) + 1, kind) + payload
+
+    def _block_frame(self, kind, hostTime, samples, times):
+        """!
+        Build a sample block frame. Not to be used outside this class
+        """
+        self._seq[kind] += 1
+        header = struct.pack("<IdI", self._seq[kind], hostTime, len(samples))
+
+        return self._frame(kind, header + samples.astype("<i2").tobytes() + times.astype("<i8").tobytes())
+
+    def _broadcast(self, frame, always = False):
+        """!
+        Queue a frame for every subscriber, dropping it for those whose queue is full.
+        Not to be used outside this class
+
+        @param bytes frame: The frame
+        @param bool always: Queue the frame even when a queue is full, for configuration frames
+            that subscribers need to interpret the samples after them
+        """
+        self.frames += 1
+        for sub in self.subscribers:
+            if not always and len(sub.queue) >= self.queue_frames:
+                sub.dropped += 1
+                self.dropped += 1
+                continue
+            sub.queue.append(frame)
+            if sub.pending is None:
+                self._selector.modify(sub.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, sub)
+
+    def _accept(self):
+        """!
+        Accept a new subscriber and queue the configuration frame for it. Not to be used outside this class
+        """
+        sock, peer = self._listener.accept()
+        sock.setblocking(False)
+
+        # The configuration may have changed since the last subscriber connected
+        self.refresh_config()
+
+        sub = _StreamSubscriber(sock, peer)
+        sub.queue.append(self._config)
+        self.subscribers.append(sub)
+        self._selector.register(sock, selectors.EVENT_READ | selectors.EVENT_WRITE, sub)
+
+    def _drop_subscriber(self, sub):
+        """!
+        Disconnect a subscriber. Not to be used outside this class
+        """
+        self._selector.unregister(sub.sock)
+        sub.sock.close()
+        self.subscribers.remove(sub)
+
+    def _flush(self, sub):
+        """!
+        Send as much of a subscriber's queue as its socket takes. Not to be used outside this class
+        """
+        while True:
+            if sub.pending is None:
+                if not sub.queue:
+                    self._selector.modify(sub.sock, selectors.EVENT_READ, sub)
+                    return
+                sub.pending = memoryview(sub.queue.pop(0))
+
+            try:
+                sent = sub.sock.send(sub.pending)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                self._drop_subscriber(sub)
+                return
+
+            sub.pending = sub.pending[sent:]
+            if len(sub.pending) == 0:
+                sub.pending = None
+                sub.frames += 1
+
+    def _acquire(self):
+        """!
+        Read the FIFO and broadcast the new samples. Not to be used outside this class
+        """
+        dev = self.device
+
+        level, status = dev.get_fifo_status()
+        # FIFO_OVR_LATCHED stays set until FIFO_STATUS2 is read, so only FIFO_OVR_IA, which
+        # clears once the FIFO is read, counts each overrun once
+        if status & dev.kFifoStatus2MaskOvrIa:
+            self.overruns += 1
+        if level == 0:
+            return
+
+        hostTime = _monotonic()
+        data = dev.decode_fifo(dev.read_fifo(level)[1])
+
+        for kind, samples, times in ((self.kFrameAccel, data.accel, data.accelTime),
+                                     (self.kFrameGyro, data.gyro, data.gyroTime),
+                                     (self.kFrameTemp, data.temp, data.tempTime)):
+            if len(samples):
+                self._broadcast(self._block_frame(kind, hostTime, samples, times))
+
+    def poll(self):
+        """!
+        Serve the sockets until the next FIFO read is due, then read the FIFO
+        """
+        timeout = max(0.0, self._nextRead - _monotonic())
+        for key, mask in self._selector.select(timeout):
+            if key.fileobj is self._listener:
+                self._accept()
+                continue
+
+            sub = key.data
+            if mask & selectors.EVENT_READ:
+                try:
+                    closed = not sub.sock.recv(4096) # subscribers don't send anything
+                except (BlockingIOError, InterruptedError):
+                    closed = False
+                except OSError:
+                    closed = True
+                if closed:
+                    self._drop_subscriber(sub)
+                    continue
+
+            if mask & selectors.EVENT_WRITE:
+                self._flush(sub)
+
+        if _monotonic() >= self._nextRead:
+            self._nextRead += self.poll_interval
+            if self._nextRead < _monotonic():
+                self._nextRead = _monotonic() + self.poll_interval
+            self._acquire()
+
+    def serve(self, duration = None):
+        """!
+        Serve subscribers
+
+        @param float duration: Stop after this many seconds, or serve until interrupted
+        """
+        end = None if duration is None else _monotonic() + duration
+        while end is None or _monotonic() < end:
+            self.poll()
+
+    def close(self):
+        """!
+        Disconnect every subscriber and close the listening socket
+        """
+        for sub in list(self.subscribers):
+            self._drop_subscriber(sub)
+        self._selector.close()
+        self._listener.close()
+
+        if self.path is not None:
+            _remove_socket(self.path)
+
+class IsmStreamClient:
+    """!
+    Receives the frames sent by IsmStreamServer. Requires NumPy
+    """
+    def __init__(self, path = None, host = "127.0.0.1", port = None, timeout = None):
+        """!
+        Constructor. Connects to the server
+
+        @param str path: The server's UNIX-domain socket path, or `None` to use TCP
+        @param str host: The server's TCP address
+        @param int port: The server's TCP port
+        @param float timeout: The socket timeout in seconds, or `None` to block
+        """
+        if path is not None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(path)
+        else:
+            self._sock = socket.create_connection((host, port), timeout)
+
+    def _recv(self, length):
+        """!
+        Receive exactly length bytes. Not to be used outside this class
+        """
+        buf = bytearray(length)
+        view = memoryview(buf)
+        got = 0
+        while got < length:
+            count = self._sock.recv_into(view[got:])
+            if count == 0:
+                raise EOFError("the server closed the connection")
+            got += count
+        return buf
+
+    def read(self):
+        """!
+        Receive the next frame
+
+        @return **tuple** The frame type followed by its decoded payload. For kFrameConfig a
+            dict with the keys accel_full_scale, gyro_full_scale, accel_odr_hz, gyro_odr_hz and
+            registers (keyed by address); for sample blocks a tuple of the sequence number, host
+            time, raw samples and device timestamps
+        """
+        np = _numpy()
+
+        length, kind = struct.unpack("<IB", bytes(self._recv(5)))
+        payload = self._recv(length - 1)
+
+        if kind == IsmStreamServer.kFrameConfig:
+            xlFs, gyFs, xlHz, gyHz = struct.unpack_from("<BBff", payload)
+            regs = payload[10:]
+            return (kind, {"accel_full_scale": xlFs, "gyro_full_scale": gyFs,
+                           "accel_odr_hz": xlHz, "gyro_odr_hz": gyHz,
+                           "registers": dict((QwiicISM330DHCX.kRegFifoCtrl1 + i, regs[i]) for i in range(len(regs)))})
+
+        seq, hostTime, count = struct.unpack_from("<IdI", payload)
+        columns = 1 if kind == IsmStreamServer.kFrameTemp else 3
+        samples = np.frombuffer(payload, dtype = "<i2", count = count * columns, offset = 16)
+        times = np.frombuffer(payload, dtype = "<i8", count = count, offset = 16 + count * columns * 2)
+        if columns == 3:
+            samples = samples.reshape(count, 3)
+
+        return (kind, (seq, hostTime, samples, times))
+
+    def close(self):
+        """!
+        Disconnect from the server
+        """
+        self._sock.close()
+
+def _odr_code(rates, hz):
+    """!
+    The slowest output data rate code at or above a rate
+
+    @param list rates: The rates in Hz, indexed by code
+    @param float hz: The requested rate
+
+    @return **int** The code
+    """
+    for code in range(1, 11):
+        if rates[code] >= hz:
+            return code
+    return 10
+
+def _main(argv):
+    """!
+    Command line entry point: `python -m qwiic_ism330dhcx_stream serve`
+
+    @param list argv: The command line arguments
+
+    @return **int** The exit status
+    """
+    parser = argparse.ArgumentParser(prog = "python -m qwiic_ism330dhcx_stream")
+    commands = parser.add_subparsers(dest = "command")
+
+    serve = commands.add_parser("serve", help = "stream FIFO data to local subscribers")
+    serve.add_argument("--unix", metavar = "PATH", help = "listen on a UNIX-domain socket")
+    serve.add_argument("--host", default = "127.0.0.1", help = "TCP address to listen on")
+    serve.add_argument("--port", type = int, default = 5330, help = "TCP port to listen on")
+    serve.add_argument("--address", type = lambda val: int(val, 0), default = _AVAILABLE_I2C_ADDRESS[0],
+                       help = "I2C address of the device")
+    serve.add_argument("--rate", type = float, default = 104, help = "accelerometer and gyroscope rate in Hz")
+    serve.add_argument("--accel-fs", type = int, default = QwiicISM330DHCX.kXlFs4g,
+                       help = "accelerometer full scale code")
+    serve.add_argument("--gyro-fs", type = int, default = QwiicISM330DHCX.kGyroFs500dps,
+                       help = "gyroscope full scale code")
+    serve.add_argument("--queue", type = int, default = 64, help = "frames queued per subscriber before dropping")
+    serve.add_argument("--poll", type = float, default = 0.01, help = "seconds between FIFO reads")
+
+    args = parser.parse_args(argv)
+    if args.command != "serve":
+        parser.print_help()
+        return 1
+
+    D = QwiicISM330DHCX
+    device = D(args.address)
+    if device.is_connected() == False:
+        print("The device isn't connected to the system. Please check your connection", file = sys.stderr)
+        return 1
+
+    xlOdr = _odr_code(D.kXlOdrHz, args.rate)
+    gyOdr = _odr_code(D.kGyroOdrHz, args.rate)
+    config = IsmConfig(accel_odr = xlOdr, accel_full_scale = args.accel_fs,
+                       gyro_odr = gyOdr, gyro_full_scale = args.gyro_fs,
+                       block_data_update = True, device_config = True, timestamp = True,
+                       fifo_mode = D.kStreamMode, accel_fifo_batch = xlOdr, gyro_fifo_batch = gyOdr,
+                       temp_fifo_batch = D.kTempBatchedAt1Hz6, fifo_timestamp_dec = D.kDec1)
+
+    device.begin()
+    if device.reset_and_wait(config = config) is None:
+        print("The device didn't come back after the reset", file = sys.stderr)
+        return 1
+
+    server = IsmStreamServer(device, path = args.unix, host = args.host, port = args.port,
+                             queue_frames = args.queue, poll_interval = args.poll)
+    print("Serving on %s" % (server.address,))
+
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
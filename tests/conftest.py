@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# The driver is a single module at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# qwiic_ism330dhcx imports the qwiic_i2c driver at module level, even though these tests only
+# use the fake transports
+pytest.importorskip("qwiic_i2c")
+
+import qwiic_ism330dhcx
+
+
+@pytest.fixture
+def spi():
+    """Fake spidev backed by a set of fake registers"""
+    return qwiic_ism330dhcx.IsmFakeSpiDev()
+
+
+@pytest.fixture
+def regs(spi):
+    """The fake register banks: regs[bank][address]"""
+    return spi.regs.banks
+
+
+@pytest.fixture
+def device(spi):
+    """A device on the fake SPI transport, connected and in the user bank"""
+    dev = qwiic_ism330dhcx.QwiicISM330DHCX(i2c_driver=qwiic_ism330dhcx.IsmSpiTransport(spi=spi))
+    assert dev.begin()
+    return dev
@@ -0,0 +1,94 @@
+import struct
+
+import pytest
+
+from qwiic_ism330dhcx import IsmBatchReader, QwiicISM330DHCX as D
+
+np = pytest.importorskip("numpy")
+
+
+def fifo_word(tag, x, y, z):
+    return struct.pack("<Bhhh", tag << D.kFifoTagShift, x, y, z)
+
+
+def batch_rates(regs, xl, gy, temp = 0):
+    regs[0][D.kRegFifoCtrl3] = (gy << D.kFifoCtrl3ShiftBdrGy) | (xl << D.kFifoCtrl3ShiftBdrXl)
+    regs[0][D.kRegFifoCtrl4] = temp << D.kFifoCtrl4ShiftOdrTBatch
+
+
+def test_batch_counter_threshold(device, regs):
+    assert device.set_batch_counter_threshold(1234)
+
+    assert device.get_batch_counter_threshold() == 1234
+    assert regs[0][D.kRegCntrBdr2] == 1234 & 0xFF
+
+    assert not device.set_batch_counter_threshold(D.kCntBdrThMax + 1)
+    assert device.get_batch_counter_threshold() == 1234
+
+
+def test_batch_reader_sizes_batches(device, regs):
+    batch_rates(regs, D.kXlBatchedAt833Hz, D.kGyroBatchedAt833Hz)
+    reader = IsmBatchReader(device, target_rate=50)
+
+    assert reader.start() == 2 * reader.threshold
+    assert reader.threshold == 17
+    assert device.get_batch_counter_threshold() == reader.threshold
+
+
+def test_batch_reader_counts_slow_streams(device, regs):
+    # One temperature word every 16 accelerometer samples: the threshold must be a multiple
+    # of 16 for every batch to hold the same number of words
+    batch_rates(regs, D.kXlBatchedAt833Hz, D.kGyroBatchedAt833Hz, D.kTempBatchedAt52Hz)
+    reader = IsmBatchReader(device, target_rate=50)
+
+    words = reader.start()
+
+    assert reader.threshold % 16 == 0
+    assert words == reader.threshold * 2 + reader.threshold // 16
+
+
+@pytest.mark.parametrize("gyro, temp", [
+    # 4096 accelerometer samples per temperature word, beyond the 11-bit threshold
+    (D.kGyroNotBatched, D.kTempBatchedAt1Hz6),
+    # 512 accelerometer samples per gyroscope sample, more words than half the FIFO
+    (D.kGyroBatchedAt12Hz5, D.kTempNotBatched),
+])
+def test_batch_reader_rejects_streams_too_slow(device, regs, gyro, temp):
+    batch_rates(regs, D.kXlBatchedAt6667Hz, gyro, temp)
+    reader = IsmBatchReader(device, target_rate=50)
+
+    with pytest.raises(ValueError):
+        reader.start()
+
+    assert device.get_batch_counter_threshold() == 0
+    assert reader.words == 0
+
+
+def test_batch_reader_requires_trigger_batching(device):
+    with pytest.raises(ValueError):
+        IsmBatchReader(device).start()
+
+
+def test_batch_reader_reads_one_batch(device, regs, spi):
+    batch_rates(regs, D.kXlBatchedAt833Hz, D.kGyroBatchedAt833Hz)
+    reader = IsmBatchReader(device, target_rate=50)
+    words = reader.start()
+
+    spi.regs.fifo = [fifo_word(D.kFifoTagAccel if i % 2 else D.kFifoTagGyro, i, 0, 0) for i in range(words + 6)]
+    batch = reader.read(wait=False)
+
+    assert len(batch) == words
+    assert batch["x"].tolist() == list(range(words))
+    assert len(spi.regs.fifo) == 6
+
+
+def test_batch_reader_latches_counter_flag(device, regs):
+    batch_rates(regs, D.kXlBatchedAt833Hz, D.kGyroBatchedAt833Hz)
+    reader = IsmBatchReader(device, target_rate=50)
+    words = reader.start()
+
+    # The flag is cleared by the status read that sees it, before the batch is all in the FIFO
+    statuses = iter([(words - 2, D.kFifoStatus2MaskCounterBdrIa), (words, 0)])
+    device.get_fifo_status = lambda: next(statuses)
+
+    assert reader.read(timeout=1.0) is not None
@@ -0,0 +1,59 @@
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+kDesired = {
+    D.kRegCtrl1XL: (D.kXlOdr104Hz << D.kCtrl1XlShiftOdr) | (D.kXlFs4g << D.kCtrl1XlShiftFs),
+    D.kRegCtrl2G: D.kGyroOdr104Hz << D.kCtrl2GShiftOdr,
+}
+
+
+def test_cold_start_resets_and_writes(device, regs):
+    # A setting outside the configuration is lost to the reset
+    regs[0][D.kRegCtrl10C] |= D.kCtrl10CMaskTimestampEn
+
+    assert device.begin(config=kDesired)
+
+    assert regs[0][D.kRegCtrl1XL] == kDesired[D.kRegCtrl1XL]
+    assert regs[0][D.kRegCtrl2G] == kDesired[D.kRegCtrl2G]
+    assert not regs[0][D.kRegCtrl10C] & D.kCtrl10CMaskTimestampEn
+    assert device.get_accel_full_scale() == D.kXlFs4g
+
+
+def test_warm_start_skips_reset_and_writes(device, regs, spi):
+    assert device.begin(config=kDesired)
+
+    # A restarted process finds the device already configured
+    regs[0][D.kRegCtrl10C] |= D.kCtrl10CMaskTimestampEn
+    other = D(i2c_driver=device._i2c)
+    writes = []
+    write = spi.regs.write
+    spi.regs.write = lambda reg, data: (writes.append(reg), write(reg, data))
+
+    assert other.begin(config=kDesired)
+
+    # Only bank selection, no reset or configuration writes
+    assert set(writes) <= {D.kRegFuncCfgAccess}
+    assert regs[0][D.kRegCtrl10C] & D.kCtrl10CMaskTimestampEn
+    assert other.get_accel_full_scale() == D.kXlFs4g
+
+
+def test_without_reset_writes_only_differences(device, regs):
+    assert device.begin(config=kDesired)
+    regs[0][D.kRegCtrl10C] |= D.kCtrl10CMaskTimestampEn
+
+    changed = dict(kDesired)
+    changed[D.kRegCtrl1XL] = D.kXlOdr208Hz << D.kCtrl1XlShiftOdr
+    assert device.begin(config=changed, reset=False)
+
+    assert regs[0][D.kRegCtrl1XL] == changed[D.kRegCtrl1XL]
+    assert regs[0][D.kRegCtrl10C] & D.kCtrl10CMaskTimestampEn
+
+
+def test_ignores_self_clearing_bits(device, regs):
+    desired = {D.kRegCntrBdr1: D.kCntrBdr1MaskRstCounterBdr | 0x01}
+    assert device.begin(config=desired)
+    assert regs[0][D.kRegCntrBdr1] == 0x01
+
+    # RST_COUNTER_BDR reads back as zero, which mustn't count as a mismatch
+    regs[0][D.kRegCtrl10C] |= D.kCtrl10CMaskTimestampEn
+    assert device.begin(config=desired)
+    assert regs[0][D.kRegCtrl10C] & D.kCtrl10CMaskTimestampEn
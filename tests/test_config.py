@@ -0,0 +1,85 @@
+import pytest
+
+from qwiic_ism330dhcx import IsmConfig, QwiicISM330DHCX as D
+
+
+def test_apply_writes_fields(device, regs):
+    config = IsmConfig(accel_odr=D.kXlOdr104Hz, accel_full_scale=D.kXlFs4g, block_data_update=1)
+    config.apply(device)
+
+    assert regs[0][D.kRegCtrl1XL] == (D.kXlOdr104Hz << D.kCtrl1XlShiftOdr) | (D.kXlFs4g << D.kCtrl1XlShiftFs)
+    assert regs[0][D.kRegCtrl3C] & D.kCtrl3CMaskBdu
+    assert device.get_accel_full_scale() == D.kXlFs4g
+
+
+def test_apply_with_baseline_skips_unchanged(device, spi):
+    config = IsmConfig(accel_odr=D.kXlOdr104Hz, gyro_odr=D.kGyroOdr104Hz)
+    final = config.apply(device)
+
+    transfers = spi.transfers
+    assert config.apply(device, final) == final
+    assert spi.transfers == transfers
+
+
+def test_replace_keeps_other_fields():
+    config = IsmConfig(accel_odr=D.kXlOdr104Hz, accel_full_scale=D.kXlFs4g)
+    changed = config.replace(accel_full_scale=D.kXlFs8g)
+
+    assert changed.accel_odr == D.kXlOdr104Hz
+    assert changed.accel_full_scale == D.kXlFs8g
+    assert config.accel_full_scale == D.kXlFs4g
+
+
+def test_interrupts_enable_untouched_without_routing(device, regs):
+    regs[0][D.kRegTapCfg2] |= D.kTapCfg2MaskInterruptsEnable
+
+    IsmConfig(accel_odr=D.kXlOdr104Hz).apply(device)
+
+    assert regs[0][D.kRegTapCfg2] & D.kTapCfg2MaskInterruptsEnable
+
+
+def test_interrupts_enable_follows_routing(device, regs):
+    IsmConfig(int1_fifo_threshold=1).apply(device)
+    assert regs[0][D.kRegInt1Ctrl] & D.kInt1CtrlMaskInt1FifoTh
+    assert regs[0][D.kRegTapCfg2] & D.kTapCfg2MaskInterruptsEnable
+
+    IsmConfig(int1_fifo_threshold=0).apply(device)
+    assert not regs[0][D.kRegTapCfg2] & D.kTapCfg2MaskInterruptsEnable
+
+
+def test_begin_warm_start_with_config(device, regs):
+    config = IsmConfig(accel_odr=D.kXlOdr104Hz, accel_full_scale=D.kXlFs4g)
+    assert device.begin(config=config)
+
+    # A second process finds the device already configured and doesn't reset it, which
+    # would clear this setting
+    regs[0][D.kRegCtrl10C] |= D.kCtrl10CMaskTimestampEn
+    other = D(i2c_driver=device._i2c)
+    assert other.begin(config=config)
+
+    assert regs[0][D.kRegCtrl10C] & D.kCtrl10CMaskTimestampEn
+    assert other.get_accel_full_scale() == D.kXlFs4g
+
+
+def test_invalid_field_raises(device):
+    with pytest.raises(ValueError):
+        IsmConfig(accel_odr=99).apply(device)
+
+
+def test_fsm_odr_minimum(device):
+    D = device
+    embedded = {D.kRegFsmEnableA: 0x01, D.kRegEmbFuncOdrCfgB: 3 << D.kEmbFuncOdrShiftFsmOdr}
+
+    IsmConfig(accel_odr=D.kXlOdr104Hz, gyro_odr=D.kGyroOdrOff).validate(device, embedded)
+    with pytest.raises(ValueError):
+        IsmConfig(accel_odr=D.kXlOdr12Hz5).validate(device, embedded)
+    with pytest.raises(ValueError):
+        IsmConfig(gyro_odr=D.kGyroOdr26Hz).validate(device, embedded)
+
+    # Without the FSM enabled any rate goes
+    IsmConfig(accel_odr=D.kXlOdr12Hz5).validate(device, {})
+
+
+def test_unknown_field_raises():
+    with pytest.raises(TypeError):
+        IsmConfig(accel_rate=1)
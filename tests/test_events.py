@@ -0,0 +1,52 @@
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+
+def test_thresholds_and_durations(device, regs):
+    device.set_wake_up_threshold(20)
+    device.set_free_fall_threshold(D.kFfThs312mg)
+    device.set_tap_threshold(1, 2, 3)
+    device.set_tap_timing(2, 1, 7)
+
+    assert regs[0][D.kRegWakeUpThs] & D.kWakeUpThsMaskWkThs == 20
+    assert regs[0][D.kRegFreeFall] & D.kFreeFallMaskFfThs == D.kFfThs312mg
+    assert (regs[0][D.kRegTapCfg1] & D.kTapCfg1MaskTapThsX) >> D.kTapCfg1ShiftTapThsX == 1
+    assert (regs[0][D.kRegTapCfg2] & D.kTapCfg2MaskTapThsY) >> D.kTapCfg2ShiftTapThsY == 2
+    assert (regs[0][D.kRegTapThs6d] & D.kTapThs6dMaskTapThsZ) >> D.kTapThs6dShiftTapThsZ == 3
+    assert regs[0][D.kRegIntDur2] == (7 << D.kIntDur2ShiftDur) | (1 << D.kIntDur2ShiftQuiet) | (2 << D.kIntDur2ShiftShock)
+
+
+def test_out_of_range_values_ignored(device, regs):
+    device.set_wake_up_threshold(64)
+    device.set_tap_threshold(1, 32, 1)
+
+    assert regs[0][D.kRegWakeUpThs] == 0
+    assert regs[0][D.kRegTapCfg1] == 0
+
+
+def test_event_routing_enables_interrupts(device, regs):
+    device.set_wake_up_int1()
+    device.set_free_fall_int2()
+
+    assert regs[0][D.kRegMd1Cfg] & D.kMd1CfgMaskInt1Wu
+    assert regs[0][D.kRegMd2Cfg] & D.kMd2CfgMaskInt2Ff
+    assert regs[0][D.kRegTapCfg2] & D.kTapCfg2MaskInterruptsEnable
+
+    device.set_wake_up_int1(False)
+    assert not regs[0][D.kRegMd1Cfg] & D.kMd1CfgMaskInt1Wu
+
+
+def test_event_sources_decoded(device, regs):
+    regs[0][D.kRegWakeUpSrc] = D.kWakeUpSrcMaskWuIa | D.kWakeUpSrcMaskFfIa
+    regs[0][D.kRegTapSrc] = D.kTapSrcMaskDoubleTap
+    regs[0][D.kRegD6dSrc] = D.kD6dSrcMaskD6dIa | D.kD6dZh
+
+    events = device.get_event_sources()
+
+    assert events.wakeUp and events.freeFall and events.doubleTap and events.sixD
+    assert not events.singleTap and not events.sleepChange
+    assert events.orientation == D.kD6dZh
+    assert events.any()
+
+
+def test_quiet_device_has_no_events(device):
+    assert not device.get_event_sources().any()
@@ -0,0 +1,85 @@
+import struct
+
+import pytest
+
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+
+def fifo_word(tag, x, y, z):
+    return struct.pack("<Bhhh", tag << D.kFifoTagShift, x, y, z)
+
+
+def test_set_and_get_field(device, regs):
+    device.set_field("CTRL1_XL.ODR", D.kXlOdr104Hz)
+
+    assert regs[0][D.kRegCtrl1XL] >> D.kCtrl1XlShiftOdr == D.kXlOdr104Hz
+    assert device.get_field("CTRL1_XL.ODR") == D.kXlOdr104Hz
+
+
+def test_update_fields_syncs_cache(device, regs):
+    device.update_fields({"CTRL1_XL.ODR": D.kXlOdr104Hz, "CTRL1_XL.FS": D.kXlFs4g,
+                          "CTRL3_C.BDU": 1, "SLV0_SUBADD.VALUE": 0x55})
+
+    assert device._odrAccel == D.kXlOdr104Hz
+    assert device._fullScaleAccel == D.kXlFs4g
+    assert regs[0][D.kRegCtrl3C] & D.kCtrl3CMaskBdu
+    assert regs[1][D.kRegSlv0Subadd] == 0x55
+    assert device._bankSel == D.kUserBank
+
+
+def test_field_views(device, regs):
+    device.fields.CTRL10_C.TIMESTAMP_EN = 1
+
+    assert regs[0][D.kRegCtrl10C] & D.kCtrl10CMaskTimestampEn
+    assert device.fields.CTRL10_C.TIMESTAMP_EN == 1
+    with pytest.raises(AttributeError):
+        device.fields.CTRL1_XL.NOPE
+
+
+@pytest.mark.parametrize("name, val", [
+    ("CTRL1_XL.ODR", 16),
+    ("STATUS_REG.XLDA", 1),
+    ("CTRL3_C.IF_INC", 0),
+    ("FOO.BAR", 1),
+])
+def test_invalid_writes_raise(device, name, val):
+    with pytest.raises(ValueError):
+        device.set_field(name, val)
+
+
+@pytest.mark.parametrize("name", sorted(D.kDriverStateFields))
+def test_driver_state_fields_refused(device, regs, name):
+    before = [bytes(bank) for bank in regs]
+
+    with pytest.raises(ValueError):
+        device.update_fields({name: 1})
+
+    assert [bytes(bank) for bank in regs] == before
+
+
+def test_update_fields_checks_before_writing(device, regs):
+    with pytest.raises(ValueError):
+        device.update_fields({"CTRL1_XL.ODR": D.kXlOdr104Hz, "CTRL3_C.SW_RESET": 1})
+
+    assert regs[0][D.kRegCtrl1XL] == 0
+
+
+def test_auto_increment_stays_set(device, regs):
+    with pytest.raises(ValueError, match="read-only"):
+        device.fields.CTRL3_C.IF_INC = 0
+
+    assert regs[0][D.kRegCtrl3C] & D.kCtrl3CMaskIfInc
+    assert device.get_field("CTRL3_C.IF_INC") == 1
+    assert "IF_INC=1" in device.dump_registers()
+
+
+def test_bypass_forgets_timestamp(device, spi):
+    pytest.importorskip("numpy")
+
+    spi.regs.fifo = [struct.pack("<BIH", D.kFifoTagTimestamp << D.kFifoTagShift, 1000, 0)]
+    device.decode_fifo(device.read_fifo()[1])
+
+    device.set_fifo_mode(D.kBypassMode)
+
+    spi.regs.fifo = [fifo_word(D.kFifoTagAccel, 0, 0, 0)]
+    assert device.decode_fifo(device.read_fifo()[1]).accelTime.tolist() == [-1]
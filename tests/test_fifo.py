@@ -0,0 +1,83 @@
+import struct
+
+import pytest
+
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+np = pytest.importorskip("numpy")
+
+
+def fifo_word(tag, x, y, z):
+    return struct.pack("<Bhhh", tag << D.kFifoTagShift, x, y, z)
+
+
+def test_read_fifo_structured_view(device, spi):
+    spi.regs.fifo = [fifo_word(D.kFifoTagAccel, 1, -2, 3), fifo_word(D.kFifoTagGyro, 4, 5, -6)]
+
+    raw, words = device.read_fifo()
+
+    assert len(raw) == 2 * D.kFifoWordSize
+    assert words["x"].tolist() == [1, 4]
+    assert words["z"].tolist() == [3, -6]
+    # The structured array is a view of the raw bytes
+    raw[1] = 9
+    assert words["x"][0] == 9
+
+
+def test_read_fifo_into_buffer(device, spi):
+    spi.regs.fifo = [fifo_word(D.kFifoTagAccel, i, 0, 0) for i in range(3)]
+    buf = bytearray(10 * D.kFifoWordSize)
+
+    raw, words = device.read_fifo(3, buf)
+
+    assert raw is buf
+    assert words["x"].tolist() == [0, 1, 2]
+    with pytest.raises(ValueError):
+        device.read_fifo(11, buf)
+
+
+def test_split_fifo(device, spi):
+    spi.regs.fifo = [
+        fifo_word(D.kFifoTagAccel, 1, 2, 3),
+        fifo_word(D.kFifoTagGyro, 4, 5, 6),
+        fifo_word(D.kFifoTagTemp, 7, 0, 0),
+        fifo_word(D.kFifoTagAccel, 8, 9, 10),
+    ]
+
+    accel, gyro, other = device.split_fifo(device.read_fifo()[1])
+
+    assert accel.tolist() == [[1, 2, 3], [8, 9, 10]]
+    assert gyro.tolist() == [[4, 5, 6]]
+    assert len(other) == 1
+
+
+def test_temp_and_timestamp_batching(device, regs):
+    device.set_temp_fifo_batch_set(D.kTempBatchedAt52Hz)
+    device.set_fifo_timestamp_dec(D.kDec8)
+
+    assert regs[0][D.kRegFifoCtrl4] == (D.kTempBatchedAt52Hz << D.kFifoCtrl4ShiftOdrTBatch) | \
+        (D.kDec8 << D.kFifoCtrl4ShiftOdrTsBatch)
+
+
+def test_decode_fifo_carries_timestamps(device, spi):
+    spi.regs.fifo = [
+        fifo_word(D.kFifoTagAccel, 1, 2, 3),
+        struct.pack("<BIH", D.kFifoTagTimestamp << D.kFifoTagShift, 1000, 0),
+        fifo_word(D.kFifoTagGyro, 4, 5, 6),
+        fifo_word(D.kFifoTagTemp, 400, 0, 0),
+        fifo_word(D.kFifoTagAccel, 7, 8, 9),
+    ]
+
+    data = device.decode_fifo(device.read_fifo()[1])
+
+    assert data.accel.tolist() == [[1, 2, 3], [7, 8, 9]]
+    assert data.accelTime.tolist() == [-1, 1000]
+    assert data.gyroTime.tolist() == [1000]
+    assert data.temp.tolist() == [400]
+    assert data.tempTime.tolist() == [1000]
+    assert data.timestamps.tolist() == [1000]
+
+    # The last timestamp carries over to the next read
+    spi.regs.fifo = [fifo_word(D.kFifoTagGyro, 0, 0, 0)]
+    assert device.decode_fifo(device.read_fifo()[1]).gyroTime.tolist() == [1000]
+
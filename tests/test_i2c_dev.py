@@ -0,0 +1,61 @@
+import pytest
+
+import qwiic_ism330dhcx
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+
+@pytest.fixture
+def backend():
+    return qwiic_ism330dhcx.IsmFakeI2cDev()
+
+
+@pytest.fixture
+def transport(backend):
+    return qwiic_ism330dhcx.IsmI2cDevTransport(bus=1, backend=backend)
+
+
+def test_i2c_dev_device(backend, transport):
+    dev = D(i2c_driver=transport)
+
+    assert backend.path == "/dev/i2c-1"
+    assert dev.begin()
+    assert dev.get_id() == D.kDevId
+    dev.set_accel_full_scale(D.kXlFs4g)
+    assert backend.regs.banks[0][D.kRegCtrl1XL] == D.kXlFs4g << D.kCtrl1XlShiftFs
+
+
+def test_read_is_one_combined_transfer(backend, transport):
+    backend.regs.banks[0][D.kRegOutXLA:D.kRegOutXLA + 6] = bytes([1, 2, 3, 4, 5, 6])
+
+    assert list(transport.read_block(0x6B, D.kRegOutXLA, 6)) == [1, 2, 3, 4, 5, 6]
+    assert backend.transfers == 1
+
+
+def test_read_block_into_buffer(backend, transport):
+    backend.regs.fifo = [bytes([D.kFifoTagAccel << D.kFifoTagShift, i, 0, 0, 0, 0, 0]) for i in range(10)]
+    buf = bytearray(70)
+
+    assert transport.read_block_into(0x6B, D.kRegFifoDataOutTag, buf) is buf
+    assert [buf[7 * i + 1] for i in range(10)] == list(range(10))
+
+
+def test_long_reads_are_split(backend, transport):
+    transport.kMaxTransfer = 7 * 30
+    backend.regs.fifo = [bytes([D.kFifoTagAccel << D.kFifoTagShift, i, 0, 0, 0, 0, 0]) for i in range(100)]
+
+    data = transport.read_block(0x6B, D.kRegFifoDataOutTag, 7 * 100)
+
+    assert [data[7 * i + 1] for i in range(100)] == list(range(100))
+    assert backend.transfers == 4
+
+
+def test_wrong_address_not_connected(transport):
+    assert transport.isDeviceConnected(0x6B)
+    assert not transport.isDeviceConnected(0x6A)
+
+
+def test_close(backend, transport):
+    transport.close()
+    transport.close()
+
+    assert backend.path is None
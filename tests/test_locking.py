@@ -0,0 +1,72 @@
+import threading
+
+import qwiic_ism330dhcx
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+
+def test_bus_lock_shared_per_driver(spi):
+    transport = qwiic_ism330dhcx.IsmSpiTransport(spi=spi)
+    first = D(i2c_driver=transport)
+    second = D(0x6A, i2c_driver=transport)
+    other = D(i2c_driver=qwiic_ism330dhcx.IsmSpiTransport(spi=qwiic_ism330dhcx.IsmFakeSpiDev()))
+
+    assert first._busLock is second._busLock
+    assert first._busLock is not other._busLock
+    assert first._lock is not second._lock
+
+
+def test_reads_never_see_another_bank(device, spi):
+    fake = spi.regs
+    wrongBank = []
+    read = fake.read
+
+    def checked_read(reg, length):
+        if reg == D.kRegOutXLA and fake._bank != D.kUserBank:
+            wrongBank.append(fake._bank)
+        return read(reg, length)
+
+    fake.read = checked_read
+
+    def reader():
+        for i in range(200):
+            device.get_raw_accel()
+
+    def writer():
+        for i in range(100):
+            device.set_hub_odr(i % 4)
+            device.set_int_notification(D.kAllIntLatched if i % 2 else D.kAllIntPulsed)
+
+    threads = [threading.Thread(target=reader), threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not wrongBank
+
+
+def test_bus_methods_wait_for_device_lock(device):
+    done = threading.Event()
+
+    def reader():
+        device.get_id()
+        done.set()
+
+    with device._lock:
+        thread = threading.Thread(target=reader)
+        thread.start()
+        assert not done.wait(0.05)
+
+    assert done.wait(1.0)
+    thread.join()
+
+
+def test_pure_helpers_not_locked(device):
+    result = []
+    with device._lock:
+        thread = threading.Thread(target=lambda: result.append(device.convert_2g_to_mg(1000)))
+        thread.start()
+        thread.join(1.0)
+
+        # The conversion ran while another thread held the device lock
+        assert len(result) == 1
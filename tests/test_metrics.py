@@ -0,0 +1,70 @@
+from urllib.request import urlopen
+
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+from qwiic_ism330dhcx_metrics import IsmMetricsRegistry
+
+
+def test_counts_transfers(device):
+    metrics = device.enable_metrics()
+    assert device.enable_metrics() is metrics
+
+    device.get_id()
+    device.set_accel_full_scale(D.kXlFs4g)
+
+    assert metrics.reads == 2
+    assert metrics.writes == 1
+    assert metrics.latency_percentiles((50,))[0] >= 0
+    assert metrics.name == "0x6b"
+
+
+def test_counts_bank_switches(device):
+    metrics = device.enable_metrics()
+
+    device.set_hub_odr(D.kShOdr26Hz)
+
+    assert metrics.bank_switches == 2
+
+
+def test_overruns_counted_on_transitions(device):
+    metrics = device.enable_metrics()
+
+    for overrun in (True, True, False, True):
+        metrics.update_fifo(100, overrun)
+
+    assert metrics.fifo_overruns == 2
+    assert metrics.fifo_level == 100
+
+
+def test_not_registered_by_default(device):
+    metrics = device.enable_metrics()
+
+    assert metrics not in IsmMetricsRegistry.shared._metrics
+
+
+def test_render_summary_family(device):
+    registry = IsmMetricsRegistry()
+    device.enable_metrics("imu", registry)
+    device.get_id()
+
+    text = registry.render()
+
+    assert text.count("# TYPE ism330dhcx_read_latency_seconds summary") == 1
+    assert 'ism330dhcx_read_latency_seconds_count{device="imu"} 1.0' in text
+    assert 'ism330dhcx_bus_reads_total{device="imu"} 1.0' in text
+    assert 'ism330dhcx_samples_total{device="imu",sensor="accel"} 0.0' in text
+    assert "# TYPE ism330dhcx_read_latency_seconds_sum" not in text
+
+
+def test_serve_http(device):
+    registry = IsmMetricsRegistry()
+    metrics = device.enable_metrics(registry=registry)
+    host, port = registry.serve_http(port=0)
+
+    try:
+        body = urlopen("http://%s:%d/metrics" % (host, port), timeout=2).read().decode()
+    finally:
+        registry.stop_http()
+
+    assert "ism330dhcx_bus_reads_total" in body
+    registry.unregister(metrics)
+    assert registry.render() == "\n"
@@ -0,0 +1,111 @@
+import struct
+import time
+
+import pytest
+
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+from qwiic_ism330dhcx_pipeline import (IsmCalibrationStage, IsmDecimateStage, IsmFunctionStage,
+                                       IsmPipeline, IsmPipelineSource, IsmPipelineStage, IsmSinkStage,
+                                       IsmStatsStage, IsmUnitStage)
+
+np = pytest.importorskip("numpy")
+
+
+class ListSource:
+    """Hands out the given blocks, then nothing"""
+    def __init__(self, blocks):
+        self.blocks = list(blocks)
+
+    def read(self):
+        return self.blocks.pop(0) if self.blocks else None
+
+
+def fifo_word(tag, x, y, z):
+    return struct.pack("<Bhhh", tag << D.kFifoTagShift, x, y, z)
+
+
+def test_fifo_source_pairs_samples(device, spi):
+    spi.regs.fifo = [fifo_word(D.kFifoTagAccel, 1, 2, 3), fifo_word(D.kFifoTagGyro, 4, 5, 6),
+                     fifo_word(D.kFifoTagAccel, 7, 8, 9)]
+    source = IsmPipelineSource(device, fifo=True)
+
+    assert source.read().tolist() == [[1, 2, 3, 4, 5, 6]]
+
+    # The unpaired accelerometer sample waits for its gyroscope sample
+    spi.regs.fifo = [fifo_word(D.kFifoTagGyro, 10, 11, 12)]
+    assert source.read().tolist() == [[7, 8, 9, 10, 11, 12]]
+    assert source.read().shape == (0, 6)
+
+
+def test_direct_source_reads_blocks(device, regs):
+    regs[0][D.kRegStatus] = D.kStatusMaskXlda | D.kStatusMaskGda
+    regs[0][D.kRegOutXLG:D.kRegOutXLG + 12] = struct.pack("<6h", 4, 5, 6, 1, 2, 3)
+
+    block = IsmPipelineSource(device, block_size=3).read()
+
+    assert block.tolist() == [[1, 2, 3, 4, 5, 6]] * 3
+
+
+def test_stages():
+    block = np.arange(24, dtype=np.float64).reshape(4, 6)
+
+    calibrated = IsmCalibrationStage(bias=np.ones(6), matrix=2 * np.eye(6)).process(block)
+    assert calibrated.tolist() == (2 * (block - 1)).tolist()
+
+    decimate = IsmDecimateStage(3)
+    assert decimate.process(block).tolist() == [block[:3].mean(axis=0).tolist()]
+    assert decimate.process(block[:1]) is None
+    assert len(decimate.process(block[:1])) == 1
+
+
+def test_unit_stage_uses_full_scales(device):
+    device.set_accel_full_scale(D.kXlFs4g)
+    device.set_gyro_full_scale(D.kGyroFs500dps)
+
+    scaled = IsmUnitStage(device).process(np.ones((1, 6)))
+
+    assert scaled[0, 0] == device.convert_4g_to_mg(1)
+    assert scaled[0, 3] == device.convert_500dps_to_mdps(1)
+
+
+def test_run_chains_and_flushes():
+    blocks = [np.full((4, 6), i, dtype=np.float64) for i in range(3)]
+    stats = IsmStatsStage()
+    sink = IsmSinkStage()
+    pipeline = IsmPipeline(ListSource(blocks), [IsmDecimateStage(5), stats, sink])
+
+    pipeline.run(blocks=4)
+
+    # 12 rows decimated by 5, the last two rows are dropped on flush
+    assert len(sink.blocks_out) == 2
+    assert stats.accel.count == 2
+    counters = pipeline.counters()
+    assert counters["IsmDecimateStage"]["rows"] == 12
+    assert counters["IsmSinkStage"]["blocks"] == 2
+
+
+def test_threaded_pipeline_keeps_order():
+    blocks = [np.full((2, 6), i, dtype=np.float64) for i in range(20)]
+    sink = IsmSinkStage()
+    pipeline = IsmPipeline(ListSource(blocks), [IsmFunctionStage(lambda b: b * 2, workers=4), sink],
+                           queue_size=2)
+
+    pipeline.start()
+    deadline = time.monotonic() + 1
+    while sum(len(b) for b in sink.blocks_out) < 40 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pipeline.stop(timeout=1)
+
+    assert [b[0, 0] for b in sink.blocks_out] == [2 * i for i in range(20)]
+
+
+def test_stage_error_is_raised_by_stop():
+    class Failing(IsmPipelineStage):
+        def process(self, block):
+            raise RuntimeError("stage failed")
+
+    pipeline = IsmPipeline(ListSource([np.zeros((1, 6))] * 10), [Failing(), IsmSinkStage()], queue_size=1)
+
+    pipeline.start()
+    with pytest.raises(RuntimeError):
+        pipeline.stop(timeout=1)
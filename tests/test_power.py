@@ -0,0 +1,63 @@
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+
+def interrupts_enabled(regs):
+    return bool(regs[0][D.kRegTapCfg2] & D.kTapCfg2MaskInterruptsEnable)
+
+
+def test_enable_configures_inactivity(device, regs):
+    device.set_activity_power_management(mode=D.kInactXl12Hz5GySleep, int_pin=1)
+
+    assert interrupts_enabled(regs)
+    assert (regs[0][D.kRegTapCfg2] & D.kTapCfg2MaskInactEn) >> D.kTapCfg2ShiftInactEn == D.kInactXl12Hz5GySleep
+    assert regs[0][D.kRegMd1Cfg] & D.kMd1CfgMaskInt1SleepChange
+    assert regs[0][D.kRegCtrl6C] & D.kCtrl6CMaskXlHmMode
+
+
+def test_disable_restores_previous_settings(device, regs):
+    device.set_activity_power_management(int_pin=1)
+    device.set_activity_power_management(enable=False)
+
+    assert not interrupts_enabled(regs)
+    assert not regs[0][D.kRegTapCfg2] & D.kTapCfg2MaskInactEn
+    assert not regs[0][D.kRegMd1Cfg] & D.kMd1CfgMaskInt1SleepChange
+    assert not regs[0][D.kRegCtrl6C] & D.kCtrl6CMaskXlHmMode
+
+
+def test_disable_ignores_int_ctrl_routing(device, regs):
+    # INTERRUPTS_ENABLE doesn't gate the INT1_CTRL signals, so a FIFO threshold
+    # interrupt routed without it mustn't keep it set
+    regs[0][D.kRegInt1Ctrl] = D.kInt1CtrlMaskInt1FifoTh
+    device.set_activity_power_management()
+    device.set_activity_power_management(enable=False)
+
+    assert not interrupts_enabled(regs)
+    assert regs[0][D.kRegInt1Ctrl] & D.kInt1CtrlMaskInt1FifoTh
+
+
+def test_disable_keeps_interrupts_for_routed_basic_interrupts(device, regs):
+    device.set_activity_power_management()
+    device.set_wake_up_int2()
+    device.set_activity_power_management(enable=False)
+
+    assert interrupts_enabled(regs)
+
+
+def test_disable_keeps_interrupts_enabled_before(device, regs):
+    regs[0][D.kRegTapCfg2] |= D.kTapCfg2MaskInterruptsEnable
+    device.set_activity_power_management()
+    device.set_activity_power_management(enable=False)
+
+    assert interrupts_enabled(regs)
+
+
+def test_update_activity_state(device, regs):
+    device.set_activity_power_management()
+
+    regs[0][D.kRegWakeUpSrc] = D.kWakeUpSrcMaskSleepState
+    assert device.update_activity_state() is False
+    assert device._inactive
+
+    regs[0][D.kRegWakeUpSrc] = 0
+    assert device.update_activity_state() is True
+    assert not device._inactive
@@ -0,0 +1,92 @@
+import pytest
+
+from qwiic_ism330dhcx import IsmFifoData, IsmResampler, IsmSynchronizer, QwiicISM330DHCX as D
+
+np = pytest.importorskip("numpy")
+
+kLsb = D.kTimestampLsb
+
+
+def block(accel_ticks, gyro_ticks):
+    """Samples whose values are their counter times in seconds, on every channel"""
+    data = IsmFifoData()
+    data.accelTime = np.asarray(accel_ticks, dtype=np.int64)
+    data.gyroTime = np.asarray(gyro_ticks, dtype=np.int64)
+    data.accel = np.repeat((data.accelTime * kLsb)[:, None], 3, 1)
+    data.gyro = np.repeat((data.gyroTime * kLsb)[:, None], 3, 1)
+    return data
+
+
+def ticks(rate, count, start=0):
+    return start + np.round(np.arange(count) / rate / kLsb).astype(np.int64)
+
+
+@pytest.mark.parametrize("method", [IsmResampler.kLinear, IsmResampler.kCubic])
+def test_resamples_onto_uniform_grid(method):
+    resampler = IsmResampler(100, method)
+
+    times, rows = resampler.push(block(ticks(208, 40), ticks(104, 20)))
+
+    assert rows.shape == (len(times), 6)
+    assert len(times) > 10
+    assert np.allclose(np.diff(times), 0.01)
+    # A linear signal comes out unchanged, up to the rounding of the counter times
+    assert np.allclose(rows, times[:, None], atol=1e-5)
+
+
+def test_output_continues_across_blocks():
+    resampler = IsmResampler(100)
+    accel, gyro = ticks(208, 80), ticks(104, 40)
+
+    first = resampler.push(block(accel[:40], gyro[:20]))
+    second = resampler.push(block(accel[40:], gyro[20:]))
+    times = np.concatenate((first[0], second[0]))
+
+    assert np.allclose(np.diff(times), 0.01)
+    assert np.allclose(np.concatenate((first[1], second[1])), times[:, None])
+    # Only the samples the interpolation still needs are kept
+    assert all(len(stream.times) <= 3 for stream in resampler._streams)
+
+
+def test_waits_for_both_sensors():
+    resampler = IsmResampler(100)
+
+    times, rows = resampler.push(block(ticks(208, 40), []))
+
+    assert len(times) == 0 and rows.shape == (0, 6)
+
+
+def test_spreads_shared_timestamps():
+    # Decimated timestamps: each counter value covers four accelerometer samples
+    resampler = IsmResampler(100, accel_rate=208)
+    shared = np.repeat(ticks(52, 10), 4)
+    accelTimes = ticks(208, 40)
+
+    data = block(shared, ticks(104, 20))
+    data.accel = np.repeat((accelTimes * kLsb)[:, None], 3, 1)
+    times, rows = resampler.push(data)
+
+    assert len(times) > 10
+    assert np.allclose(rows[:, :3], times[:, None], atol=1e-4)
+
+
+def test_unwraps_counter():
+    resampler = IsmResampler(100)
+    start = IsmSynchronizer.kCounterWrap - 400
+
+    data = block(ticks(208, 40, start) % IsmSynchronizer.kCounterWrap, ticks(104, 20, start))
+    data.accel = np.repeat((ticks(208, 40, start) * kLsb)[:, None], 3, 1)
+    times, rows = resampler.push(data)
+
+    assert np.allclose(np.diff(times), 0.01)
+    assert np.allclose(rows, times[:, None], atol=1e-5)
+
+
+def test_reset_starts_over():
+    resampler = IsmResampler(100)
+    resampler.push(block(ticks(208, 40), ticks(104, 20)))
+
+    resampler.reset()
+    times, rows = resampler.push(block(ticks(208, 40, 100000), ticks(104, 20, 100000)))
+
+    assert times[0] >= 100000 * kLsb
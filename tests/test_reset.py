@@ -0,0 +1,49 @@
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+
+def test_software_reset(device, regs):
+    device.set_accel_data_rate(D.kXlOdr104Hz)
+    device.set_accel_full_scale(D.kXlFs8g)
+
+    elapsed = device.reset_and_wait()
+
+    assert elapsed is not None and elapsed < 0.1
+    assert regs[0][D.kRegCtrl1XL] == 0
+    assert device._odrAccel is None
+    assert device._fullScaleAccel == 0
+
+
+def test_boot_resets_cached_state(device, spi):
+    device.set_accel_data_rate(D.kXlOdr104Hz)
+    device.set_gyro_data_rate(D.kGyroOdr104Hz)
+    device._mem_bank_set(D.kSensorHubBank)
+
+    assert device.reset_and_wait(boot=True) is not None
+
+    assert device._odrAccel is None
+    assert device._odrGyro is None
+    assert device._bankSel == D.kUserBank
+    assert device.get_id() == D.kDevId
+    assert spi.regs._bank == D.kUserBank
+
+
+def test_config_applied_after_reset(device, regs):
+    config = {D.kRegCtrl1XL: D.kXlOdr208Hz << D.kCtrl1XlShiftOdr}
+
+    assert device.reset_and_wait(config=config) is not None
+
+    assert regs[0][D.kRegCtrl1XL] == config[D.kRegCtrl1XL]
+    assert device._odrAccel == D.kXlOdr208Hz
+
+
+def test_timeout_when_reset_never_completes(device, spi):
+    fake = spi.regs
+
+    def stuck_write(reg, data):
+        # The reset bit stays set, as if the device never finished resetting
+        for i in range(len(data)):
+            fake.banks[fake._bank][reg + i] = data[i]
+
+    fake.write = stuck_write
+
+    assert device.reset_and_wait(timeout=0.01) is None
@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from qwiic_ism330dhcx_ring import IsmRingPublisher, IsmRingSubscriber
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def publisher():
+    pub = IsmRingPublisher(slots=4, rows=8)
+    yield pub
+    pub.close()
+
+
+def test_read_published_blocks(publisher):
+    sub = IsmRingSubscriber(publisher.name, latest=False)
+    for i in range(3):
+        publisher.publish(np.full((i + 1, 3), i, dtype=np.int16), timestamp=float(i))
+
+    for i in range(3):
+        seq, timestamp, rows = sub.read()
+        assert timestamp == float(i)
+        assert rows.tolist() == [[i] * 3] * (i + 1)
+        del rows
+
+    assert sub.read() is None
+    sub.close()
+
+
+def test_latest_starts_with_next_block(publisher):
+    publisher.publish(np.zeros((1, 3)))
+    sub = IsmRingSubscriber(publisher.name)
+
+    assert sub.read() is None
+    publisher.publish(np.ones((2, 3)))
+    assert sub.read()[2].tolist() == [[1, 1, 1]] * 2
+    sub.close()
+
+
+def test_lapped_subscriber_skips_ahead(publisher):
+    sub = IsmRingSubscriber(publisher.name, latest=False)
+    for i in range(10):
+        publisher.publish(np.full((2, 3), i))
+
+    seq, timestamp, rows = sub.read()
+
+    assert sub.lapped > 0
+    assert rows.tolist() == [[seq - 1] * 3] * 2
+    assert sub.valid(seq)
+    for i in range(4):
+        publisher.publish(np.zeros((1, 3)))
+    assert not sub.valid(seq)
+
+    del rows
+    sub.close()
+
+
+def test_block_larger_than_slot_rejected(publisher):
+    with pytest.raises(ValueError):
+        publisher.publish(np.zeros((9, 3)))
+
+
+def test_subscriber_close_keeps_ring(publisher):
+    first = IsmRingSubscriber(publisher.name)
+    first.close()
+
+    # Closing a subscriber must not free the publisher's memory
+    second = IsmRingSubscriber(publisher.name)
+    publisher.publish(np.ones((1, 3)))
+    assert second.read() is not None
+    second.close()
+
+
+def test_publisher_close_twice(publisher):
+    publisher.close()
+    publisher.close()
+
+
+# Structured, void and object types, and a type string longer than the header's 16 bytes
+@pytest.mark.parametrize("dtype", [[("x", "<i2"), ("y", "<i2")], "V4", object, "M8[1000000000ns]"])
+def test_unsupported_dtypes_rejected(dtype):
+    with pytest.raises(ValueError):
+        IsmRingPublisher(slots=1, rows=1, dtype=dtype)
+
+
+def test_dtype_round_trip():
+    publisher = IsmRingPublisher(slots=2, rows=4, columns=2, dtype="<f8")
+    sub = IsmRingSubscriber(publisher.name, latest=False)
+    publisher.publish(np.array([[0.5, -1.5]]))
+
+    assert sub.dtype == np.dtype("<f8")
+    assert sub.read()[2].tolist() == [[0.5, -1.5]]
+
+    sub.close()
+    publisher.close()
+
+
+def test_subscriber_process_exit_keeps_ring(publisher):
+    # The subscriber's resource tracker must not free the ring when its process exits
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = "from qwiic_ism330dhcx_ring import IsmRingSubscriber; IsmRingSubscriber(%r).close()" % publisher.name
+    result = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert "leaked" not in result.stderr
+
+    sub = IsmRingSubscriber(publisher.name)
+    publisher.publish(np.ones((1, 3)))
+    assert sub.read() is not None
+    sub.close()
@@ -0,0 +1,66 @@
+import pytest
+
+from qwiic_ism330dhcx import IsmReadScheduler, QwiicISM330DHCX as D
+
+
+def test_plan_merges_coincident_reads(device):
+    scheduler = IsmReadScheduler(device, {"accel": 100, "gyro": 50, "temp": 12.5})
+
+    assert scheduler.hyperperiod == pytest.approx(0.08)
+    assert len(scheduler.plan) == 8
+    assert scheduler.plan[0] == (0.0, ("temp", "gyro", "accel"))
+    assert scheduler.plan[1][1] == ("accel",)
+    assert scheduler.plan[2][1] == ("gyro", "accel")
+
+
+def test_plan_uses_exact_rates(device):
+    # 12.5 Hz and 52 Hz don't share a period that a float LCM would find
+    scheduler = IsmReadScheduler(device, {"accel": 52, "temp": 12.5})
+
+    assert scheduler.hyperperiod == pytest.approx(2.0)
+    assert sum(1 for offset, streams in scheduler.plan if "temp" in streams) == 25
+
+
+def test_invalid_streams_rejected(device):
+    with pytest.raises(ValueError):
+        IsmReadScheduler(device, {"magnetometer": 10})
+    with pytest.raises(ValueError):
+        IsmReadScheduler(device, {"accel": 0})
+
+
+def test_step_reads_due_streams_in_one_block(device, regs, spi):
+    regs[0][D.kRegOutTempL:D.kRegOutTempL + 2] = bytes([0x10, 0x00])
+    regs[0][D.kRegOutXLG:D.kRegOutXLG + 6] = bytes([1, 0, 2, 0, 0xFF, 0xFF])
+    regs[0][D.kRegOutXLA:D.kRegOutXLA + 6] = bytes([4, 0, 5, 0, 6, 0])
+    scheduler = IsmReadScheduler(device, {"accel": 200, "gyro": 200, "temp": 200})
+
+    transfers = spi.transfers
+    due, data = scheduler.step()
+
+    assert spi.transfers - transfers == 1
+    assert scheduler.reads == 1
+    assert data["temp"] == 0x10
+    assert (data["gyro"].xData, data["gyro"].yData, data["gyro"].zData) == (1, 2, -1)
+    assert (data["accel"].xData, data["accel"].yData, data["accel"].zData) == (4, 5, 6)
+
+
+def test_run_keeps_to_the_plan(device):
+    scheduler = IsmReadScheduler(device, {"accel": 200, "gyro": 100})
+    seen = []
+
+    scheduler.run(lambda due, data: seen.append(sorted(data)) or len(seen) < 4)
+
+    assert seen == [["accel", "gyro"], ["accel"], ["accel", "gyro"], ["accel"]]
+    assert scheduler.ticks == 4
+
+
+def test_late_ticks_are_skipped(device):
+    scheduler = IsmReadScheduler(device, {"accel": 100})
+    scheduler.step()
+
+    # Fall 50 ms behind: the ticks in between are missed rather than read in a burst
+    scheduler._start -= 0.05
+    scheduler.step()
+
+    assert scheduler.missed >= 4
+    assert scheduler.ticks == 2
@@ -0,0 +1,73 @@
+from qwiic_ism330dhcx import IsmConfigSnapshot, QwiicISM330DHCX as D
+
+
+def test_snapshot_reads_user_bank(device, regs):
+    regs[0][D.kRegCtrl1XL] = 0x48
+    regs[0][D.kRegMd2Cfg] = 0x10
+
+    snapshot = device.snapshot_config()
+
+    assert snapshot.banks() == [D.kUserBank]
+    assert snapshot.get(D.kUserBank, D.kRegCtrl1XL) == 0x48
+    assert snapshot.get(D.kUserBank, D.kRegMd2Cfg) == 0x10
+    assert snapshot.get(D.kUserBank, D.kRegWhoAmI) is None
+
+
+def test_snapshot_other_banks_returns_to_user_bank(device, regs):
+    regs[D.kSensorHubBank][D.kRegMasterConfig] = 0x04
+
+    snapshot = device.snapshot_config(include_embedded=True, include_sensor_hub=True)
+
+    assert snapshot.banks() == [D.kUserBank, D.kSensorHubBank, D.kEmbeddedFuncBank]
+    assert snapshot.get(D.kSensorHubBank, D.kRegMasterConfig) == 0x04
+    assert device.get_id() == 0x6B
+
+
+def test_diff_and_equality(device, regs):
+    before = device.snapshot_config()
+    regs[0][D.kRegCtrl2G] = 0x40
+    after = device.snapshot_config()
+
+    assert before.diff(after) == {(D.kUserBank, D.kRegCtrl2G): (0, 0x40)}
+    assert before != after
+    assert after == device.snapshot_config()
+    assert hash(after) == hash(device.snapshot_config())
+
+
+def test_diff_reports_missing_registers():
+    one = IsmConfigSnapshot({(0, 0x10): 1})
+    two = IsmConfigSnapshot({(0, 0x10): 1, (0, 0x11): 2})
+
+    assert one.diff(two) == {(0, 0x11): (None, 2)}
+
+
+def test_restore_round_trip(device, regs):
+    regs[0][D.kRegCtrl1XL] = (D.kXlOdr104Hz << D.kCtrl1XlShiftOdr) | (D.kXlFs8g << D.kCtrl1XlShiftFs)
+    regs[0][D.kRegFifoCtrl1] = 0x20
+    profile = device.snapshot_config()
+
+    device.device_reset()
+    assert device.snapshot_config() != profile
+
+    device.restore_config(profile)
+
+    assert device.snapshot_config() == profile
+    assert device.get_accel_full_scale() == D.kXlFs8g
+
+
+def test_restore_with_baseline_writes_only_changes(device, regs, spi):
+    idle = device.snapshot_config()
+    regs[0][D.kRegCtrl1XL] = 0x60
+    regs[0][D.kRegCtrl2G] = 0x60
+    capture = device.snapshot_config()
+    device.restore_config(idle)
+
+    writes = []
+    write = spi.regs.write
+    spi.regs.write = lambda reg, data: (writes.append((reg, len(data))), write(reg, data))
+
+    device.restore_config(capture, idle)
+
+    # CTRL1_XL and CTRL2_G are adjacent, so they go out in one auto-increment write
+    assert writes == [(D.kRegCtrl1XL, 2)]
+    assert device.snapshot_config() == capture
@@ -0,0 +1,48 @@
+import qwiic_ism330dhcx
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+
+def test_spi_register_access(device, regs):
+    assert device.get_id() == D.kDevId
+
+    regs[0][D.kRegOutXLA:D.kRegOutXLA + 6] = bytes([1, 0, 2, 0, 3, 0])
+    raw = device.get_raw_accel()
+    assert (raw.xData, raw.yData, raw.zData) == (1, 2, 3)
+
+
+def test_spi_block_read_is_one_transfer(device, spi):
+    transfers = spi.transfers
+    device.get_raw_accel()
+
+    assert spi.transfers - transfers == 1
+
+
+def test_spi_long_reads_are_split(spi):
+    transport = qwiic_ism330dhcx.IsmSpiTransport(spi=spi)
+    transport.kMaxTransfer = 700
+    spi.regs.fifo = [bytes([D.kFifoTagAccel << D.kFifoTagShift, i % 256, 0, 0, 0, 0, 0]) for i in range(200)]
+
+    data = transport.read_block(0x6B, D.kRegFifoDataOutTag, 7 * 200)
+
+    assert len(data) == 7 * 200
+    assert [data[7 * i + 1] for i in range(200)] == [i % 256 for i in range(200)]
+    assert spi.transfers == 2
+
+
+def test_spi_long_writes_are_split(spi):
+    transport = qwiic_ism330dhcx.IsmSpiTransport(spi=spi)
+    transport.kMaxTransfer = 3
+
+    transport.write_block(0x6B, D.kRegFifoCtrl1, [1, 2, 3, 4, 5])
+
+    assert list(spi.regs.banks[0][D.kRegFifoCtrl1:D.kRegFifoCtrl1 + 5]) == [1, 2, 3, 4, 5]
+    assert spi.transfers == 2
+
+
+def test_spi_missing_device_not_connected():
+    spi = qwiic_ism330dhcx.IsmFakeSpiDev()
+    spi.regs.banks[0][D.kRegWhoAmI] = 0xFF
+    transport = qwiic_ism330dhcx.IsmSpiTransport(spi=spi)
+
+    assert not transport.isDeviceConnected(0x6B)
+    assert spi.mode == 3
@@ -0,0 +1,71 @@
+import math
+
+import pytest
+
+from qwiic_ism330dhcx import IsmData, IsmStats, IsmWindowedStats
+
+
+def axes(data):
+    return (data.xData, data.yData, data.zData)
+
+
+def test_mean_variance_extremes():
+    stats = IsmStats().update([(1, 10, -1), (3, 10, -3), (5, 10, -5)])
+
+    assert stats.count == 3
+    assert axes(stats.mean()) == (3, 10, -3)
+    assert axes(stats.variance()) == pytest.approx((8 / 3.0, 0, 8 / 3.0))
+    assert axes(stats.variance(sample=True)) == pytest.approx((4, 0, 4))
+    assert axes(stats.minimum()) == (1, 10, -5)
+    assert axes(stats.maximum()) == (5, 10, -1)
+    assert axes(stats.peak_to_peak()) == (4, 0, 4)
+    assert stats.rms().xData == pytest.approx(math.sqrt(35 / 3.0))
+
+
+def test_accepts_data_objects_and_triples():
+    sample = IsmData()
+    sample.xData, sample.yData, sample.zData = 2, 4, 6
+
+    stats = IsmStats().update(sample).update((4, 8, 12))
+
+    assert axes(stats.mean()) == (3, 6, 9)
+
+
+def test_merge_matches_single_pass():
+    rows = [(i, i * i, -i) for i in range(20)]
+    whole = IsmStats().update(rows)
+    merged = IsmStats().update(rows[:7]).merge(IsmStats().update(rows[7:]))
+
+    assert merged.count == whole.count
+    assert axes(merged.mean()) == pytest.approx(axes(whole.mean()))
+    assert axes(merged.variance()) == pytest.approx(axes(whole.variance()))
+    assert axes(merged.maximum()) == axes(whole.maximum())
+
+
+def test_numpy_blocks_match_rows():
+    np = pytest.importorskip("numpy")
+    rows = np.arange(60, dtype=np.int16).reshape(20, 3)
+
+    assert axes(IsmStats().update(rows).variance()) == pytest.approx(axes(IsmStats().update(rows.tolist()).variance()))
+
+
+def test_tumbling_window():
+    windows = IsmWindowedStats(4).update([(i, 0, 0) for i in range(10)])
+
+    assert [w.count for w in windows] == [4, 4]
+    assert [w.mean().xData for w in windows] == [1.5, 5.5]
+
+
+def test_sliding_window():
+    windows = IsmWindowedStats(4, panes=2).update([(i, 0, 0) for i in range(8)])
+
+    # The window advances by two samples once the first four are in
+    assert [w.mean().xData for w in windows] == [1.5, 3.5, 5.5]
+    assert all(w.count == 4 for w in windows)
+
+
+def test_window_must_divide_into_panes():
+    with pytest.raises(ValueError):
+        IsmWindowedStats(10, panes=3)
+    with pytest.raises(ValueError):
+        IsmWindowedStats(2, panes=4)
@@ -0,0 +1,150 @@
+import os
+import struct
+import threading
+
+import pytest
+
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+from qwiic_ism330dhcx_stream import IsmStreamClient, IsmStreamServer
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "ism.sock")
+
+
+def read_frames(client, frames, count):
+    try:
+        for i in range(count):
+            frames.append(client.read())
+    except Exception as err:
+        frames.append(err)
+
+
+def test_refuses_to_replace_other_files(device, socket_path):
+    with open(socket_path, "w") as other:
+        other.write("data")
+
+    with pytest.raises(ValueError):
+        IsmStreamServer(device, path=socket_path)
+
+    with open(socket_path) as other:
+        assert other.read() == "data"
+
+
+def test_replaces_stale_socket(device, socket_path):
+    stale = IsmStreamServer(device, path=socket_path)
+    stale._listener.close()
+
+    server = IsmStreamServer(device, path=socket_path)
+    server.close()
+
+    assert not os.path.exists(socket_path)
+
+
+def test_close_leaves_other_files(device, socket_path):
+    server = IsmStreamServer(device, path=socket_path)
+
+    # Something else took the path over while the server was running
+    os.unlink(socket_path)
+    with open(socket_path, "w") as other:
+        other.write("data")
+    server.close()
+
+    with open(socket_path) as other:
+        assert other.read() == "data"
+
+
+def test_streams_config_then_samples(device, spi, socket_path):
+    device.set_accel_full_scale(D.kXlFs4g)
+    server = IsmStreamServer(device, path=socket_path, poll_interval=0.005)
+    client = IsmStreamClient(path=socket_path, timeout=2)
+
+    spi.regs.fifo = [
+        struct.pack("<BIH", D.kFifoTagTimestamp << D.kFifoTagShift, 1000, 0),
+        struct.pack("<Bhhh", D.kFifoTagAccel << D.kFifoTagShift, 1, -1, 1),
+    ]
+
+    frames = []
+    thread = threading.Thread(target=read_frames, args=(client, frames, 2))
+    thread.start()
+    server.serve(0.3)
+    thread.join()
+    server.close()
+
+    kind, config = frames[0]
+    assert kind == IsmStreamServer.kFrameConfig
+    assert config["accel_full_scale"] == D.kXlFs4g
+
+    kind, (seq, hostTime, samples, times) = frames[1]
+    assert kind == IsmStreamServer.kFrameAccel
+    assert samples.tolist() == [[1, -1, 1]]
+    assert times.tolist() == [1000]
+
+
+def test_new_subscriber_gets_current_config(device, socket_path):
+    server = IsmStreamServer(device, path=socket_path)
+    device.set_accel_full_scale(D.kXlFs8g)
+
+    client = IsmStreamClient(path=socket_path, timeout=2)
+    frames = []
+    thread = threading.Thread(target=read_frames, args=(client, frames, 1))
+    thread.start()
+    server.serve(0.2)
+    thread.join()
+    server.close()
+
+    assert frames[0][1]["accel_full_scale"] == D.kXlFs8g
+
+
+def test_refresh_config(device, socket_path):
+    server = IsmStreamServer(device, path=socket_path)
+
+    assert not server.refresh_config()
+    device.set_accel_full_scale(D.kXlFs8g)
+    assert server.refresh_config()
+    server.close()
+
+
+def test_config_frames_never_dropped(device, socket_path):
+    server = IsmStreamServer(device, path=socket_path, queue_frames=2)
+    client = IsmStreamClient(path=socket_path, timeout=2)
+    server.poll()
+    sub = server.subscribers[0]
+
+    sub.queue = [b"sample"] * 2
+    server._broadcast(b"sample")
+    assert len(sub.queue) == 2 and sub.dropped == 1
+
+    device.set_accel_full_scale(D.kXlFs8g)
+    assert server.refresh_config()
+    assert sub.queue[-1] == server._config
+    assert sub.dropped == 1
+
+    client.close()
+    server.close()
+
+
+def test_overruns_counted_once(device, socket_path):
+    server = IsmStreamServer(device, path=socket_path)
+    statuses = iter([
+        (0, D.kFifoStatus2MaskOvrIa | D.kFifoStatus2MaskOvrLatched),
+        (0, D.kFifoStatus2MaskOvrLatched),
+        (0, 0),
+    ])
+    device.get_fifo_status = lambda: next(statuses)
+
+    for i in range(3):
+        server._acquire()
+
+    assert server.overruns == 1
+    server.close()
+
+
+def test_cli_requires_command(capsys):
+    from qwiic_ism330dhcx_stream import _main
+
+    assert _main([]) == 1
+    assert "serve" in capsys.readouterr().out
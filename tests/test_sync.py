@@ -0,0 +1,102 @@
+import pytest
+
+import qwiic_ism330dhcx
+from qwiic_ism330dhcx import IsmSynchronizer
+
+np = pytest.importorskip("numpy")
+
+kWrap = IsmSynchronizer.kCounterWrap
+
+
+@pytest.fixture
+def devices():
+    return [qwiic_ism330dhcx.QwiicISM330DHCX(i2c_driver=qwiic_ism330dhcx.IsmSpiTransport(spi=qwiic_ism330dhcx.IsmFakeSpiDev()))
+            for i in range(3)]
+
+
+def merged(runs):
+    times = np.concatenate([run[0] for run in runs])
+    order = np.concatenate([np.full(len(run[0]), run[1]) for run in runs])
+    samples = np.concatenate([run[2] for run in runs])
+    return times, order, samples
+
+
+def test_merge_in_time_order(devices):
+    sync = IsmSynchronizer(devices)
+    for index in range(3):
+        ticks = np.arange(0, 4000, 400) + index * 7
+        sync.push(index, ticks, np.full((len(ticks), 3), index, dtype=np.int16))
+
+    runs = sync.pop() + sync.pop(flush=True)
+    times, order, samples = merged(runs)
+
+    assert len(times) == 30
+    assert np.all(np.diff(times) >= 0)
+    assert order[:3].tolist() == [0, 1, 2]
+    assert np.all(samples[:, 0] == order)
+
+
+def test_pop_waits_for_every_device(devices):
+    sync = IsmSynchronizer(devices)
+    sync.push(0, np.arange(10), np.zeros((10, 3)))
+
+    assert sync.pop() == []
+    assert sum(len(run[0]) for run in sync.pop(flush=True)) == 10
+
+
+def test_runs_are_slices(devices):
+    sync = IsmSynchronizer(devices[:2])
+    sync.push(0, np.arange(0, 100, 10), np.arange(30).reshape(10, 3))
+    sync.push(1, np.array([1000]), np.zeros((1, 3)))
+
+    runs = sync.pop()
+
+    # Device 0 is entirely before device 1, so it comes out as one run
+    assert len(runs) == 1
+    assert runs[0][1] == 0
+    assert runs[0][2].tolist() == np.arange(30).reshape(10, 3).tolist()
+
+
+def test_push_unwraps_counter(devices):
+    sync = IsmSynchronizer(devices)
+    base = kWrap - 4000
+    runs = []
+    for block in range(4):
+        for index in range(3):
+            ticks = base + np.arange(block * 2000, (block + 1) * 2000, 400) + index * 7
+            sync.push(index, ticks % kWrap, np.stack([ticks, ticks, ticks], 1))
+        runs += sync.pop()
+    runs += sync.pop(flush=True)
+
+    times, order, samples = merged(runs)
+
+    assert len(times) == 60
+    assert np.all(np.diff(times) >= 0)
+    assert np.all(np.diff(samples[order == 0, 0]) > 0)
+
+
+def test_to_time_unwraps_and_drops_unknown(devices):
+    sync = IsmSynchronizer(devices)
+    sync.push(0, np.array([kWrap - 10]), np.zeros((1, 3)))
+
+    times = sync.to_time(0, [kWrap - 1, 0, -1])
+
+    assert times[1] > times[0]
+    assert np.isnan(times[2])
+
+
+def test_update_fits_drift(devices, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(qwiic_ism330dhcx, "_monotonic", lambda: clock[0])
+    sync = IsmSynchronizer(devices[:1])
+    lsb = sync._nominal[0]
+
+    # The device's counter runs 100 ppm fast against the host clock
+    devices[0].get_timestamp = lambda: int((clock[0] - 100.0) / lsb * (1 + 100e-6)) % kWrap
+    for step in range(50):
+        clock[0] += 0.5
+        sync.update()
+
+    assert abs(sync.drift(0) + 100) < 1
+    assert abs(sync.offset(0) - 100.0) < 1e-3
+    assert abs(float(sync.to_time(0, devices[0].get_timestamp())) - clock[0]) < 1e-3
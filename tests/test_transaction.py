@@ -0,0 +1,53 @@
+import pytest
+
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+
+def test_transaction_merges_adjacent_writes(device, spi, regs):
+    transfers = spi.transfers
+    with device.transaction():
+        device.set_accel_full_scale(D.kXlFs4g)
+        device.set_gyro_full_scale(D.kGyroFs500dps)
+
+    # One read of each register, then CTRL1_XL and CTRL2_G in one block write
+    assert spi.transfers - transfers == 3
+    assert regs[0][D.kRegCtrl1XL] == D.kXlFs4g << D.kCtrl1XlShiftFs
+    assert regs[0][D.kRegCtrl2G] == D.kGyroFs500dps << D.kCtrl2GShiftFs
+
+
+def test_transaction_reads_queued_writes(device, regs):
+    # The second read-modify-write of CTRL1_XL must see the first one's queued value
+    with device.transaction():
+        device.set_accel_data_rate(D.kXlOdr104Hz)
+        device.set_accel_full_scale(D.kXlFs4g)
+        assert regs[0][D.kRegCtrl1XL] == 0
+
+    assert regs[0][D.kRegCtrl1XL] == (D.kXlOdr104Hz << D.kCtrl1XlShiftOdr) | (D.kXlFs4g << D.kCtrl1XlShiftFs)
+
+
+def test_transaction_discarded_on_error(device, regs):
+    with pytest.raises(RuntimeError):
+        with device.transaction():
+            device.set_fifo_mode(D.kStreamMode)
+            raise RuntimeError
+
+    assert regs[0][D.kRegFifoCtrl4] == 0
+    assert device._txnDepth == 0
+
+
+def test_nested_transactions_flush_once(device, regs):
+    with device.transaction():
+        with device.transaction():
+            device.set_accel_full_scale(D.kXlFs4g)
+        assert regs[0][D.kRegCtrl1XL] == 0
+
+    assert regs[0][D.kRegCtrl1XL] == D.kXlFs4g << D.kCtrl1XlShiftFs
+
+
+def test_transaction_restores_bank(device, regs):
+    with device.transaction():
+        device.set_hub_odr(D.kShOdr26Hz)
+        device.set_accel_full_scale(D.kXlFs4g)
+
+    assert regs[D.kSensorHubBank][D.kRegSlv0Config] == D.kShOdr26Hz << D.kSlv0ConfigShiftShubOdr
+    assert device.get_id() == D.kDevId
@@ -0,0 +1,79 @@
+from qwiic_ism330dhcx import IsmWatermarkTuner, QwiicISM330DHCX as D
+
+
+def watermark(regs):
+    return regs[0][D.kRegFifoCtrl1] | ((regs[0][D.kRegFifoCtrl2] & 0x01) << 8)
+
+
+def start_tuner(device, regs, **kwargs):
+    regs[0][D.kRegFifoCtrl3] = (D.kGyroBatchedAt104Hz << D.kFifoCtrl3ShiftBdrGy) | \
+        (D.kXlBatchedAt104Hz << D.kFifoCtrl3ShiftBdrXl)
+    tuner = IsmWatermarkTuner(device, **kwargs)
+    tuner.start(64)
+    return tuner
+
+
+def test_start_computes_word_rate(device, regs):
+    tuner = start_tuner(device, regs)
+
+    assert tuner.word_rate == 208
+    assert tuner.watermark == 64
+    assert watermark(regs) == 64
+
+
+def test_grows_by_a_quarter_when_read_in_time(device, regs):
+    tuner = start_tuner(device, regs)
+
+    assert tuner.update(64, 0, latency=0) == 80
+    assert tuner.update(80, 0, latency=0) == 100
+    assert watermark(regs) == 100
+    assert tuner.overruns == 0
+
+
+def test_backs_off_for_latency(device, regs):
+    tuner = start_tuner(device, regs, margin=0.25)
+    tuner.watermark = 300
+
+    # 0.5 s of wake-up latency at 208 words/s needs 104 words of headroom
+    tuner.update(300, 0, latency=0.5)
+
+    assert tuner.watermark == int(D.kFifoCapacity * 0.75 - 104)
+
+
+def test_full_halves_without_counting_overrun(device, regs):
+    tuner = start_tuner(device, regs)
+
+    assert tuner.update(D.kFifoCapacity, D.kFifoStatus2MaskFullIa) == 32
+    assert tuner.overruns == 0
+    assert tuner.latency > 0
+
+
+def test_overrun_halves_and_counts(device, regs):
+    tuner = start_tuner(device, regs)
+
+    assert tuner.update(D.kFifoCapacity, D.kFifoStatus2MaskOvrIa | D.kFifoStatus2MaskFullIa) == 32
+    assert tuner.overruns == 1
+
+    # The latched flag alone isn't a new overrun
+    tuner.update(32, D.kFifoStatus2MaskOvrLatched, latency=0)
+    assert tuner.overruns == 1
+
+
+def test_respects_limits(device, regs):
+    tuner = start_tuner(device, regs, min_watermark=40, max_watermark=70)
+
+    assert tuner.update(D.kFifoCapacity, D.kFifoStatus2MaskOvrIa, latency=0) == 40
+    for i in range(10):
+        tuner.update(tuner.watermark, 0, latency=0)
+    assert tuner.watermark == 70
+
+
+def test_read_drains_and_updates(device, regs, spi):
+    tuner = start_tuner(device, regs)
+    spi.regs.fifo = [bytes(7)] * 70
+
+    raw = tuner.read()[0]
+
+    assert len(raw) == 70 * D.kFifoWordSize
+    assert tuner.reads == 1
+    assert tuner.samples_per_read() == 70
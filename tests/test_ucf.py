@@ -0,0 +1,98 @@
+import pytest
+
+from qwiic_ism330dhcx import QwiicISM330DHCX as D
+
+# Enables an FSM program in the embedded functions bank, then sets the accelerometer rate
+kProgram = [
+    "-- a test program",
+    "Ac 01 80",
+    "Ac 04 00",
+    "Ac 05 01",
+    "Ac 46 01",
+    "Ac 47 00",
+    "Ac 5F 4B",
+    "Ac 60 15",
+    "WAIT 1",
+    "Ac 01 00",
+    "Ac 10 28",
+]
+
+
+def test_load_writes_program(device, regs):
+    assert device.load_ucf(kProgram)
+
+    assert regs[2][0x46] == 0x01
+    assert regs[2][0x5F] == 0x4B
+    assert regs[0][D.kRegCtrl1XL] == 0x28
+    assert device._odrAccel == 0x28 >> D.kCtrl1XlShiftOdr
+    assert device._bankSel == D.kUserBank
+    assert device.get_program_hash() != 0
+
+
+def test_load_skipped_when_resident(device, spi):
+    device.load_ucf(kProgram)
+
+    transfers = spi.transfers
+    assert not device.load_ucf(kProgram)
+    assert spi.transfers - transfers < 10
+    assert device.load_ucf(kProgram, force=True)
+
+
+def test_state_file_survives_restart(device, spi, tmp_path):
+    stateFile = str(tmp_path / "program")
+    device.load_ucf(kProgram, state_file=stateFile)
+
+    other = D(i2c_driver=device._i2c)
+    assert other.get_program_hash(stateFile) == device.get_program_hash()
+    assert not other.load_ucf(kProgram, state_file=stateFile)
+
+
+def test_power_cycle_detected(device, regs, tmp_path):
+    stateFile = str(tmp_path / "program")
+    device.load_ucf(kProgram, state_file=stateFile)
+
+    regs[2][0x5F] = 0
+    assert D(i2c_driver=device._i2c).load_ucf(kProgram, state_file=stateFile)
+    assert regs[2][0x5F] == 0x4B
+
+
+def test_different_programs_hash_differently(device):
+    device.load_ucf(kProgram)
+    first = device.get_program_hash()
+
+    device.load_ucf(kProgram[:-3] + ["WAIT 257"] + kProgram[-2:])
+    assert device.get_program_hash() != first
+
+
+def test_reset_forgets_program(device):
+    device.load_ucf(kProgram)
+    device.device_reset()
+
+    assert device.get_program_hash() == 0
+
+
+def test_adjacent_writes_merged(device, spi):
+    writes = []
+    write = spi.regs.write
+
+    def logged_write(reg, data):
+        writes.append((spi.regs._bank, reg, len(data)))
+        write(reg, data)
+
+    spi.regs.write = logged_write
+    device.load_ucf(kProgram, force=True)
+
+    assert writes == [
+        (D.kUserBank, D.kRegFuncCfgAccess, 1),
+        (D.kEmbeddedFuncBank, 0x04, 2),
+        (D.kEmbeddedFuncBank, 0x46, 2),
+        (D.kEmbeddedFuncBank, 0x5F, 2),
+        (D.kEmbeddedFuncBank, D.kRegFuncCfgAccess, 1),
+        (D.kUserBank, D.kRegCtrl1XL, 1),
+        (D.kUserBank, D.kRegFuncCfgAccess, 1),
+    ]
+
+
+def test_bad_line_rejected(device):
+    with pytest.raises(ValueError):
+        device.load_ucf(["Ac 01"])
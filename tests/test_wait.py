@@ -0,0 +1,23 @@
+import time
+
+from qwiic_ism330dhcx import QwiicISM330DHCX
+
+
+def test_returns_polls_when_data_ready(device, regs):
+    regs[0][QwiicISM330DHCX.kRegStatus] = QwiicISM330DHCX.kStatusMaskXlda | QwiicISM330DHCX.kStatusMaskGda
+
+    assert device.wait_for_data(timeout=0.1) == 1
+
+
+def test_waits_only_for_requested_sensors(device, regs):
+    regs[0][QwiicISM330DHCX.kRegStatus] = QwiicISM330DHCX.kStatusMaskXlda
+
+    assert device.wait_for_data(timeout=0.05, sensors=QwiicISM330DHCX.kStatusMaskXlda) == 1
+    assert device.wait_for_data(timeout=0.05, sensors=QwiicISM330DHCX.kStatusMaskGda) == 0
+
+
+def test_times_out_without_data(device):
+    start = time.monotonic()
+
+    assert device.wait_for_data(timeout=0.05) == 0
+    assert time.monotonic() - start < 1.0